@@ -0,0 +1,65 @@
+import os
+from contextlib import asynccontextmanager
+from typing import Awaitable
+from typing import Callable
+from typing import List
+
+# pylint: disable=import-error
+import socketio
+from jinja2 import Environment
+from jinja2 import FileSystemLoader
+from jinja2 import select_autoescape
+from starlette.applications import Starlette
+from starlette.responses import HTMLResponse
+from starlette.routing import Mount
+from starlette.routing import Route
+from starlette.staticfiles import StaticFiles
+
+
+def create_asgi_app(
+    sio: socketio.AsyncServer,
+    app_dir: str,
+    routes: List[Route] = None,
+    on_startup: List[Callable[[], Awaitable[None]]] = None,
+    on_shutdown: List[Callable[[], Awaitable[None]]] = None,
+) -> socketio.ASGIApp:
+    """
+    Creates an ASGI application serving the same page, static files and socketio events as the Flask app of a demo.
+
+    Args:
+        sio (socketio.AsyncServer): The socketio server handling the events of the page.
+        app_dir (str): The directory of the demo app, with its "templates" and "static" directories.
+        routes (List[Route]): Additional http routes of the app, if any.
+        on_startup (List[Callable]): Coroutine functions awaited when the server starts.
+        on_shutdown (List[Callable]): Coroutine functions awaited when the server stops.
+
+    Returns:
+        socketio.ASGIApp: The application to give to an ASGI server such as uvicorn.
+    """
+    environment = Environment(
+        loader=FileSystemLoader(os.path.join(app_dir, "templates")), autoescape=select_autoescape()
+    )
+    # The templates are written for Flask, which resolves static files with url_for('static', filename=...)
+    environment.globals["url_for"] = lambda endpoint, filename: f"/{endpoint}/{filename}"
+
+    async def index(_request):
+        """Return the html."""
+        return HTMLResponse(environment.get_template("index.html").render(), headers={"Cache-Control": "no-store"})
+
+    @asynccontextmanager
+    async def lifespan(_app):
+        for startup in on_startup or []:
+            await startup()
+        yield
+        for shutdown in on_shutdown or []:
+            await shutdown()
+
+    starlette_app = Starlette(
+        routes=[
+            Route("/", index),
+            *(routes or []),
+            Mount("/static", StaticFiles(directory=os.path.join(app_dir, "static")), name="static"),
+        ],
+        lifespan=lifespan,
+    )
+    return socketio.ASGIApp(sio, other_asgi_app=starlette_app)
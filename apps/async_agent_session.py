@@ -0,0 +1,86 @@
+import os
+from copy import copy
+from typing import Any
+from typing import Dict
+from typing import Optional
+
+from neuro_san.client.streaming_input_processor import StreamingInputProcessor
+from neuro_san.interfaces.async_agent_session import AsyncAgentSession
+from neuro_san.internals.journals.origination import Origination
+from neuro_san.session.async_http_service_agent_session import AsyncHttpServiceAgentSession
+
+
+def create_async_agent_session(agent_name: str, metadata: Dict[str, str] = None) -> AsyncAgentSession:
+    """
+    Creates an asyncio session with an agent network of the neuro-san server, e.g. the one started by run.py.
+    Each request is a non-blocking HTTP call, so the session holds no connection and has nothing to close.
+
+    :param agent_name: The name of the agent network.
+    :param metadata: The metadata sent along with each request, as HTTP headers, so None values are left out.
+    :return: The agent session.
+    """
+    return AsyncHttpServiceAgentSession(
+        host=os.environ.get("NEURO_SAN_SERVER_HOST", "localhost"),
+        port=os.environ.get("NEURO_SAN_SERVER_HTTP_PORT", "8080"),
+        metadata={key: value for key, value in (metadata or {}).items() if value is not None},
+        agent_name=agent_name,
+    )
+
+
+class AsyncStreamingInputProcessor(StreamingInputProcessor):
+    """
+    A StreamingInputProcessor for an AsyncAgentSession, whose turns are awaited instead of blocking a thread.
+    """
+
+    async def async_process_once(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Same as process_once(), but awaits the chat responses of the agent session.
+
+        :param state: The state dictionary to pass around
+        :return: An updated state dictionary
+        """
+        empty: Dict[str, Any] = {}
+        user_input: str = state.get("user_input")
+        if user_input is None or user_input == self.default_input:
+            return state
+
+        sly_data: Optional[Dict[str, Any]] = state.get("sly_data", None)
+        chat_context: Dict[str, Any] = state.get("chat_context", empty)
+        last_chat_response: str = state.get("last_chat_response")
+        chat_request: Dict[str, Any] = self.formulate_chat_request(
+            user_input, sly_data, chat_context, state.get("chat_filter", empty)
+        )
+        self.reset()
+
+        returned_sly_data: Optional[Dict[str, Any]] = None
+        origin_str: str = ""
+        async for chat_response in self.session.streaming_chat(chat_request):
+            self.processor.process_message(chat_response.get("response", empty))
+
+            # Update the state if there is something to update it with
+            chat_context = self.processor.get_chat_context()
+            last_chat_response = self.processor.get_compiled_answer()
+            returned_sly_data = self.processor.get_sly_data()
+            origin_str = Origination.get_full_name_from_origin(self.processor.get_answer_origin())
+
+        # Update the sly_data if new sly_data was returned
+        if returned_sly_data is not None:
+            if sly_data is not None:
+                sly_data.update(returned_sly_data)
+            else:
+                sly_data = returned_sly_data.copy()
+
+        return_state: Dict[str, Any] = copy(state)
+        return_state.update(
+            {
+                "chat_context": chat_context,
+                "num_input": state.get("num_input", 0) + 1,
+                "last_chat_response": last_chat_response,
+                "user_input": None,
+                "sly_data": sly_data,
+                "returned_sly_data": returned_sly_data,
+                "origin_str": origin_str or "agent network",
+                "token_accounting": self.processor.get_token_accounting(),
+            }
+        )
+        return return_state
@@ -1,10 +1,22 @@
 import os
+import re
+from datetime import datetime
 
 from neuro_san.client.agent_session_factory import AgentSessionFactory
 from neuro_san.client.streaming_input_processor import StreamingInputProcessor
 
+from apps.async_agent_session import AsyncStreamingInputProcessor
+from apps.async_agent_session import create_async_agent_session
+from coded_tools.chat_context_compactor import ROLLING_SUMMARY
+from coded_tools.chat_context_compactor import ChatContextCompactor
+
 AGENT_NETWORK_NAME = "conscious_agent"
 
+# The conscious assistant thinks forever, so fold older turns into a rolling summary
+# to keep the conversation sent to the agent network bounded.
+# Policies are "none", "sliding_window", "token_budget" or "rolling_summary".
+CHAT_CONTEXT_COMPACTOR = ChatContextCompactor(policy=ROLLING_SUMMARY, max_tokens=6000, summary_max_tokens=1000)
+
 
 def set_up_conscious_assistant():
     """Configure these as needed."""
@@ -31,6 +43,25 @@ def set_up_conscious_assistant():
     return session, conscious_thread
 
 
+def set_up_async_conscious_assistant():
+    """
+    Same as set_up_conscious_assistant(), but with an asyncio session with the conscious agent of the neuro-san server.
+
+    :return: The agent session and the conversation thread state.
+    """
+    session = create_async_agent_session(AGENT_NETWORK_NAME, {"user_id": os.environ.get("USER")})
+    conscious_thread = {
+        "last_chat_response": None,
+        "prompt": "Please enter your response ('quit' to terminate):\n",
+        "timeout": 5000.0,
+        "num_input": 0,
+        "user_input": None,
+        "sly_data": None,
+        "chat_filter": {"chat_filter_type": "MAXIMAL"},
+    }
+    return session, conscious_thread
+
+
 def conscious_thinker(conscious_session, conscious_thread, thoughts):
     """
     Processes a single turn of user input within the conscious agent's session.
@@ -60,12 +91,34 @@ def conscious_thinker(conscious_session, conscious_thread, thoughts):
     )
     # Update the conversation state with this turn's input
     conscious_thread["user_input"] = thoughts
+    tokens_saved = CHAT_CONTEXT_COMPACTOR.compact(conscious_thread)
+    if tokens_saved:
+        print(f"Compacted chat context: {tokens_saved} tokens saved. {CHAT_CONTEXT_COMPACTOR.get_metrics()}")
     conscious_thread = input_processor.process_once(conscious_thread)
     # Get the agent response for this turn
     last_chat_response = conscious_thread.get("last_chat_response")
     return last_chat_response, conscious_thread
 
 
+async def async_conscious_thinker(conscious_session, conscious_thread, thoughts):
+    """
+    Same as conscious_thinker(), but awaits the asyncio session of set_up_async_conscious_assistant() instead of
+    blocking.
+
+    :param conscious_session: An asyncio session with the conscious agent.
+    :param conscious_thread: The agent's current conversation thread state.
+    :param thoughts: The user's input or query to be processed.
+    :return: The agent response to the input and the updated thread state.
+    """
+    input_processor = AsyncStreamingInputProcessor("DEFAULT", "/tmp/agent_thinking.txt", conscious_session, None)
+    conscious_thread["user_input"] = thoughts
+    tokens_saved = CHAT_CONTEXT_COMPACTOR.compact(conscious_thread)
+    if tokens_saved:
+        print(f"Compacted chat context: {tokens_saved} tokens saved. {CHAT_CONTEXT_COMPACTOR.get_metrics()}")
+    conscious_thread = await input_processor.async_process_once(conscious_thread)
+    return conscious_thread.get("last_chat_response"), conscious_thread
+
+
 def tear_down_conscious_assistant(conscious_session):
     """Tear down the assistant.
 
@@ -75,3 +128,38 @@ def tear_down_conscious_assistant(conscious_session):
     conscious_session.close()
     # client.assistants.delete(conscious_assistant_id)
     print("conscious assistant torn down.")
+
+
+def parse_thought_blocks(thoughts):
+    """
+    Separates the thoughts and the speeches in a response of the conscious agent.
+
+    Each block begins with "thought:" or "say:" and continues until the next block or the end of the string.
+
+    Parameters:
+        thoughts (str): The response returned by conscious_thinker.
+
+    Returns:
+        tuple:
+            - thoughts_to_emit (str): The timestamped thought blocks, joined by newlines.
+            - speeches_to_emit (str): The say blocks, joined by newlines.
+    """
+    thoughts_to_emit = []
+    speeches_to_emit = []
+
+    pattern = re.compile(
+        r"(?m)^(thought|say):[ \t]*(.*?)(?=^\s*(?:thought|say):|\Z)", re.S  # look-ahead  # dot = newline
+    )
+
+    for kind, raw in pattern.findall(thoughts):
+        content = raw.lstrip()  # drop the leading spaces/newline after the prefix
+        if not content:
+            continue
+
+        if kind == "thought":
+            timestamp = datetime.now().strftime("[%I:%M:%S%p]").lower()
+            thoughts_to_emit.append(f"{timestamp} thought: {content}")
+        else:  # kind == "say"
+            speeches_to_emit.append(content)
+
+    return "\n".join(thoughts_to_emit), "\n".join(speeches_to_emit)
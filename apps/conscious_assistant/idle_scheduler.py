@@ -0,0 +1,84 @@
+import asyncio
+import queue
+import time
+from typing import Any
+from typing import Dict
+from typing import Optional
+
+
+class IdleThoughtScheduler:
+    """
+    Decides how long the conscious assistant waits for the user before having an idle thought.
+
+    Each turn without user input doubles the wait (by default), up to a maximum, so that a silent user
+    costs fewer and fewer LLM calls. User input wakes the assistant up immediately and resets the wait
+    to its minimum, so that the conversation stays lively while the user is talking.
+    """
+
+    def __init__(self, min_interval_seconds: float = 1.0, max_interval_seconds: float = 300.0, backoff: float = 2.0):
+        """
+        :param min_interval_seconds: Wait after user input. Also the pace of the assistant without backoff.
+        :param max_interval_seconds: Longest wait between two idle thoughts.
+        :param backoff: Factor applied to the wait after each turn without user input.
+        """
+        self.min_interval_seconds = min_interval_seconds
+        self.max_interval_seconds = max_interval_seconds
+        self.backoff = backoff
+        self.interval_seconds = min_interval_seconds
+        self.started_at = time.monotonic()
+        self.idle_turns = 0
+        self.input_turns = 0
+
+    def wait_for_input(self, user_input_queue: queue.Queue) -> Optional[str]:
+        """
+        Blocks until the user says something or the current interval elapses.
+
+        :param user_input_queue: The queue the user inputs are put in.
+        :return: The user input, or None if the user stayed silent.
+        """
+        try:
+            user_input = user_input_queue.get(timeout=self.interval_seconds)
+        except queue.Empty:
+            self._on_silence()
+            return None
+        return self._on_input(user_input)
+
+    async def async_wait_for_input(self, user_input_queue: asyncio.Queue) -> Optional[str]:
+        """
+        Asyncio flavor of wait_for_input().
+
+        :param user_input_queue: The asyncio queue the user inputs are put in.
+        :return: The user input, or None if the user stayed silent.
+        """
+        try:
+            user_input = await asyncio.wait_for(user_input_queue.get(), timeout=self.interval_seconds)
+        except asyncio.TimeoutError:
+            self._on_silence()
+            return None
+        return self._on_input(user_input)
+
+    def _on_silence(self):
+        self.idle_turns += 1
+        self.interval_seconds = min(self.interval_seconds * self.backoff, self.max_interval_seconds)
+
+    def _on_input(self, user_input: str) -> str:
+        self.input_turns += 1
+        self.interval_seconds = self.min_interval_seconds
+        return user_input
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        :return: A dictionary with the current interval, the number of turns, and the number of LLM calls
+                saved per hour compared to thinking every min_interval_seconds.
+        """
+        elapsed_seconds = max(time.monotonic() - self.started_at, 1e-9)
+        elapsed_hours = elapsed_seconds / 3600.0
+        turns = self.idle_turns + self.input_turns
+        baseline_turns = elapsed_seconds / self.min_interval_seconds
+        return {
+            "interval_seconds": round(self.interval_seconds, 2),
+            "idle_turns": self.idle_turns,
+            "input_turns": self.input_turns,
+            "llm_calls_per_hour": round(turns / elapsed_hours, 1),
+            "llm_calls_saved_per_hour": round(max(baseline_turns - turns, 0) / elapsed_hours, 1),
+        }
@@ -0,0 +1,98 @@
+import asyncio
+import os
+from datetime import datetime
+
+# pylint: disable=import-error
+import socketio
+import uvicorn
+
+from apps.asgi_app import create_asgi_app
+from apps.conscious_assistant.conscious_assistant import async_conscious_thinker
+from apps.conscious_assistant.conscious_assistant import parse_thought_blocks
+from apps.conscious_assistant.conscious_assistant import set_up_async_conscious_assistant
+from apps.conscious_assistant.idle_scheduler import IdleThoughtScheduler
+
+os.environ["AGENT_MANIFEST_FILE"] = "registries/manifest.hocon"
+os.environ["AGENT_TOOL_PATH"] = "coded_tools"
+
+PORT = 5001
+# See interface_flask.py
+MIN_IDLE_INTERVAL_SECONDS = 1.0
+MAX_IDLE_INTERVAL_SECONDS = 300.0
+IDLE_BACKOFF = 2.0
+idle_scheduler = IdleThoughtScheduler(MIN_IDLE_INTERVAL_SECONDS, MAX_IDLE_INTERVAL_SECONDS, IDLE_BACKOFF)
+
+sio = socketio.AsyncServer(async_mode="asgi")
+# Created on startup, in the event loop of the server
+user_input_queue = None  # pylint: disable=invalid-name
+thinking_task = None  # pylint: disable=invalid-name
+
+# An asyncio session with the conscious agent of the neuro-san server, awaited on the event loop
+conscious_session, conscious_thread = set_up_async_conscious_assistant()
+
+
+async def conscious_thinking_process():
+    """Main permanent agent-calling loop."""
+    global conscious_thread  # pylint: disable=global-statement
+    thoughts = "thought: hmm, let's see now..."
+    while True:
+        thoughts, conscious_thread = await async_conscious_thinker(conscious_session, conscious_thread, thoughts)
+        print(thoughts)
+
+        # Separating thoughts and speeches
+        thoughts_to_emit, speeches_to_emit = parse_thought_blocks(thoughts)
+
+        if thoughts_to_emit:
+            await sio.emit("update_thoughts", {"data": thoughts_to_emit}, namespace="/chat")
+
+        if speeches_to_emit:
+            await sio.emit("update_speech", {"data": speeches_to_emit}, namespace="/chat")
+
+        # Wakes up as soon as the user says something, or once the idle interval elapses
+        user_input = await idle_scheduler.async_wait_for_input(user_input_queue)
+        if user_input == "exit":
+            break
+        if user_input is None:
+            print(f"Idle thought scheduler: {idle_scheduler.get_metrics()}")
+
+        timestamp = datetime.now().strftime("[%I:%M:%S%p]").lower()
+        thoughts = f"\n{timestamp} user: " + (user_input or "[Silence]")
+
+
+async def start_up():
+    """Create the user input queue in the event loop of the server."""
+    global user_input_queue  # pylint: disable=global-statement
+    user_input_queue = asyncio.Queue()
+
+
+async def clean_up():
+    """Tear things down on exit."""
+    print("Bye!")
+    if thinking_task is not None:
+        thinking_task.cancel()
+
+
+@sio.on("connect", namespace="/chat")
+async def on_connect(*_):
+    """Start background task on connect."""
+    global thinking_task  # pylint: disable=global-statement
+    if thinking_task is None:
+        thinking_task = asyncio.create_task(conscious_thinking_process())
+
+
+@sio.on("user_input", namespace="/chat")
+async def handle_user_input(_sid, json, *_):
+    """
+    Handles user input.
+
+    :param json: A json object
+    """
+    user_input = json["data"]
+    user_input_queue.put_nowait(user_input)
+    await sio.emit("update_user_input", {"data": user_input}, namespace="/chat")
+
+
+app = create_asgi_app(sio, os.path.dirname(os.path.abspath(__file__)), on_startup=[start_up], on_shutdown=[clean_up])
+
+if __name__ == "__main__":
+    uvicorn.run(app, port=PORT, log_level="info")
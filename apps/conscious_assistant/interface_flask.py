@@ -1,7 +1,6 @@
 import atexit
 import os
 import queue
-import re
 import time
 from datetime import datetime
 
@@ -12,8 +11,10 @@ from flask import render_template
 from flask_socketio import SocketIO
 
 from apps.conscious_assistant.conscious_assistant import conscious_thinker
+from apps.conscious_assistant.conscious_assistant import parse_thought_blocks
 from apps.conscious_assistant.conscious_assistant import set_up_conscious_assistant
 from apps.conscious_assistant.conscious_assistant import tear_down_conscious_assistant
+from apps.conscious_assistant.idle_scheduler import IdleThoughtScheduler
 
 os.environ["AGENT_MANIFEST_FILE"] = "registries/manifest.hocon"
 os.environ["AGENT_TOOL_PATH"] = "coded_tools"
@@ -24,6 +25,13 @@ thread_started = False  # pylint: disable=invalid-name
 
 user_input_queue = queue.Queue()
 
+# The assistant thinks again right away when the user talks, but backs off exponentially,
+# from MIN_IDLE_INTERVAL_SECONDS up to MAX_IDLE_INTERVAL_SECONDS, while the user stays silent.
+MIN_IDLE_INTERVAL_SECONDS = 1.0
+MAX_IDLE_INTERVAL_SECONDS = 300.0
+IDLE_BACKOFF = 2.0
+idle_scheduler = IdleThoughtScheduler(MIN_IDLE_INTERVAL_SECONDS, MAX_IDLE_INTERVAL_SECONDS, IDLE_BACKOFF)
+
 conscious_session, conscious_thread = set_up_conscious_assistant()
 
 
@@ -33,61 +41,27 @@ def conscious_thinking_process():
         global conscious_thread  # pylint: disable=global-statement
         thoughts = "thought: hmm, let's see now..."
         while True:
-            socketio.sleep(1)
-
             thoughts, conscious_thread = conscious_thinker(conscious_session, conscious_thread, thoughts)
             print(thoughts)
 
             # Separating thoughts and speeches
-            # Assume 'thoughts' is the string returned by conscious_thinker
-
-            thoughts_to_emit = []
-            speeches_to_emit = []
-
-            # --- 1.  Slice the input into blocks ----------------------------------------
-            #     Each block begins with  "thought:"  or  "say:"  and continues until
-            #     the next block or the end of the string.
-            pattern = re.compile(
-                r"(?m)^(thought|say):[ \t]*(.*?)(?=^\s*(?:thought|say):|\Z)", re.S  # look-ahead  # dot = newline
-            )
-
-            for kind, raw in pattern.findall(thoughts):
-                content = raw.lstrip()  # drop the leading spaces/newline after the prefix
-                if not content:
-                    continue
-
-                if kind == "thought":
-                    timestamp = datetime.now().strftime("[%I:%M:%S%p]").lower()
-                    thoughts_to_emit.append(f"{timestamp} thought: {content}")
-                else:  # kind == "say"
-                    speeches_to_emit.append(content)
-
-            # --- 2.  Emit the blocks -----------------------------------------------------
+            thoughts_to_emit, speeches_to_emit = parse_thought_blocks(thoughts)
+
             if thoughts_to_emit:
-                socketio.emit(
-                    "update_thoughts",
-                    {"data": "\n".join(thoughts_to_emit)},
-                    namespace="/chat",
-                )
+                socketio.emit("update_thoughts", {"data": thoughts_to_emit}, namespace="/chat")
 
             if speeches_to_emit:
-                socketio.emit(
-                    "update_speech",
-                    {"data": "\n".join(speeches_to_emit)},
-                    namespace="/chat",
-                )
+                socketio.emit("update_speech", {"data": speeches_to_emit}, namespace="/chat")
+
+            # Wakes up as soon as the user says something, or once the idle interval elapses
+            user_input = idle_scheduler.wait_for_input(user_input_queue)
+            if user_input == "exit":
+                break
+            if user_input is None:
+                print(f"Idle thought scheduler: {idle_scheduler.get_metrics()}")
 
             timestamp = datetime.now().strftime("[%I:%M:%S%p]").lower()
-            thoughts = f"\n{timestamp} user: " + "[Silence]"
-            try:
-                user_input = user_input_queue.get(timeout=0.1)
-                if user_input:
-                    thoughts = f"\n{timestamp} user: " + user_input
-                if user_input == "exit":
-                    break
-            except queue.Empty:
-                time.sleep(0.1)
-                continue
+            thoughts = f"\n{timestamp} user: " + (user_input or "[Silence]")
 
 
 @socketio.on("connect", namespace="/chat")
@@ -4,8 +4,19 @@ from neuro_san.client.agent_session_factory import AgentSessionFactory
 from neuro_san.client.streaming_input_processor import StreamingInputProcessor
 from pyhocon import ConfigFactory
 
+from apps.async_agent_session import AsyncStreamingInputProcessor
+from apps.async_agent_session import create_async_agent_session
+from coded_tools.chat_context_compactor import NO_COMPACTION
+from coded_tools.chat_context_compactor import ChatContextCompactor
+
 AGENT_NETWORK_NAME = "cruse_agent"
 
+# Opt-in compaction of the conversation sent to the agent network on every turn, for long-lived sessions.
+# Policies are "none", "sliding_window", "token_budget" or "rolling_summary".
+CHAT_CONTEXT_POLICY = NO_COMPACTION
+CHAT_CONTEXT_MAX_TOKENS = 8000
+CHAT_CONTEXT_COMPACTOR = ChatContextCompactor(policy=CHAT_CONTEXT_POLICY, max_tokens=CHAT_CONTEXT_MAX_TOKENS)
+
 
 def set_up_cruse_assistant(selected_agent):
     """Configure these as needed."""
@@ -35,6 +46,27 @@ def set_up_cruse_assistant(selected_agent):
     return session, cruse_state_info
 
 
+def set_up_async_cruse_assistant(selected_agent):
+    """
+    Same as set_up_cruse_assistant(), but with an asyncio session with the cruse agent of the neuro-san server.
+    The sly_data is sent to the server, so it does not hold the agent session.
+
+    :param selected_agent: The agent network the cruse assistant operates.
+    :return: The agent session and the conversation state.
+    """
+    session = create_async_agent_session(AGENT_NETWORK_NAME, {"user_id": os.environ.get("USER")})
+    cruse_state_info = {
+        "last_chat_response": None,
+        "prompt": "Please enter your response ('quit' to terminate):\n",
+        "timeout": 5000.0,
+        "num_input": 0,
+        "user_input": None,
+        "sly_data": {"selected_agent": "registries/" + selected_agent},
+        "chat_filter": {"chat_filter_type": "MAXIMAL"},
+    }
+    return session, cruse_state_info
+
+
 def cruse(cruse_session, cruse_state_info, user_input):
     """
     Processes a single turn of user input within the cruse_agent agent's session.
@@ -64,12 +96,33 @@ def cruse(cruse_session, cruse_state_info, user_input):
     )
     # Update the conversation state with this turn's input
     cruse_state_info["user_input"] = user_input
+    tokens_saved = CHAT_CONTEXT_COMPACTOR.compact(cruse_state_info)
+    if tokens_saved:
+        print(f"Compacted chat context: {tokens_saved} tokens saved. {CHAT_CONTEXT_COMPACTOR.get_metrics()}")
     cruse_state_info = input_processor.process_once(cruse_state_info)
     # Get the agent response for this turn
     last_chat_response = cruse_state_info.get("last_chat_response")
     return last_chat_response, cruse_state_info
 
 
+async def async_cruse(cruse_session, cruse_state_info, user_input):
+    """
+    Same as cruse(), but awaits the asyncio session of set_up_async_cruse_assistant() instead of blocking.
+
+    :param cruse_session: An asyncio session with the cruse_agent agent.
+    :param cruse_state_info: The agent's current conversation state.
+    :param user_input: The user's input or query to be processed.
+    :return: The agent response to the input and the updated state.
+    """
+    input_processor = AsyncStreamingInputProcessor("DEFAULT", "/tmp/agent_thinking.txt", cruse_session, None)
+    cruse_state_info["user_input"] = user_input
+    tokens_saved = CHAT_CONTEXT_COMPACTOR.compact(cruse_state_info)
+    if tokens_saved:
+        print(f"Compacted chat context: {tokens_saved} tokens saved. {CHAT_CONTEXT_COMPACTOR.get_metrics()}")
+    cruse_state_info = await input_processor.async_process_once(cruse_state_info)
+    return cruse_state_info.get("last_chat_response"), cruse_state_info
+
+
 def tear_down_cruse_assistant(cruse_session):
     """Tear down the assistant.
 
@@ -140,3 +193,34 @@ def parse_response_blocks(response: str):
         blocks.append((current_type, "\n".join(current_lines).strip()))
 
     return blocks
+
+
+def split_response_blocks(response: str):
+    """
+    Splits a response of the cruse agent into the gui and the speech to display.
+
+    Args:
+        response (str): The raw response string of the cruse agent.
+
+    Returns:
+        Tuple[str, str]: The html of the gui blocks and the text of the say blocks, joined by newlines.
+                         Either may be empty. A response without any block is all speech.
+    """
+    blocks = parse_response_blocks(response)
+
+    gui_to_emit = []
+    speeches_to_emit = []
+
+    for kind, content in blocks:
+        if not content:
+            continue
+        if kind == "gui":
+            gui_to_emit.append(content)
+        elif kind == "say":
+            speeches_to_emit.append(content)
+
+    # fallback if nothing was matched
+    if not blocks and response.strip():
+        speeches_to_emit.append(response.strip())
+
+    return "\n".join(gui_to_emit), "\n".join(speeches_to_emit)
@@ -0,0 +1,152 @@
+import json
+from hashlib import sha1
+from typing import Any
+from typing import Dict
+from typing import Optional
+
+# Rough number of characters per token, to report the savings without a tokenizer
+CHARS_PER_TOKEN = 4
+
+# Keys of a diff, which cannot be mistaken for the fields of a gui context
+CHANGED_KEY = "__changed__"
+REMOVED_KEY = "__removed__"
+
+
+def merge_gui_context(base: Any, update: Any) -> Any:
+    """
+    Merges a gui context into a previous one of the same burst. Later values win, nested dictionaries are merged.
+
+    :param base: The gui context merged so far.
+    :param update: The newer gui context.
+    :return: The merged gui context.
+    """
+    if not isinstance(base, dict) or not isinstance(update, dict):
+        return update if update else base
+    merged = dict(base)
+    for key, value in update.items():
+        merged[key] = merge_gui_context(merged.get(key), value) if isinstance(value, dict) else value
+    return merged
+
+
+def diff_gui_context(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Computes the structural difference between two gui contexts.
+
+    :param previous: The gui context the agent last saw.
+    :param current: The new gui context.
+    :return: A dictionary with a CHANGED_KEY dictionary of the new or modified values, nested dictionaries being
+            diffed recursively, and a REMOVED_KEY list of the keys that are gone. Both are omitted when empty.
+    """
+    changed = {}
+    for key, value in current.items():
+        if key not in previous:
+            changed[key] = value
+        elif isinstance(value, dict) and isinstance(previous[key], dict):
+            nested = diff_gui_context(previous[key], value)
+            if nested:
+                changed[key] = nested
+        elif value != previous[key]:
+            changed[key] = value
+    removed = [key for key in previous if key not in current]
+
+    diff = {}
+    if changed:
+        diff[CHANGED_KEY] = changed
+    if removed:
+        diff[REMOVED_KEY] = removed
+    return diff
+
+
+def apply_gui_context_diff(previous: Dict[str, Any], diff: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Rebuilds a gui context from an earlier one and the changes since, as the agent is asked to.
+
+    :param previous: The earlier gui context.
+    :param diff: The changes since, as returned by diff_gui_context().
+    :return: The new gui context.
+    """
+    current = {key: value for key, value in previous.items() if key not in diff.get(REMOVED_KEY, [])}
+    for key, value in diff.get(CHANGED_KEY, {}).items():
+        is_nested_diff = isinstance(value, dict) and (CHANGED_KEY in value or REMOVED_KEY in value)
+        if is_nested_diff and isinstance(current.get(key), dict):
+            current[key] = apply_gui_context_diff(current[key], value)
+        else:
+            current[key] = value
+    return current
+
+
+def get_gui_context_hash(gui_context: Any) -> str:
+    """
+    :param gui_context: A gui context.
+    :return: A short hash identifying the gui context.
+    """
+    return sha1(json.dumps(gui_context, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:8]
+
+
+class GuiContextTracker:
+    """
+    Keeps track of the gui context last sent to the agent of a client, so that only the changes are sent next time.
+
+    The first gui context of a conversation is sent in full along with a hash. Later ones are sent as the changes
+    since that full gui context, or as a reference to it when nothing changed, so that the agent only ever applies
+    one set of changes to one full gui context. The full gui context is sent again every full_every_n_turns turns,
+    or when the changes would not be shorter, so that the agent never depends on a gui context that compaction
+    dropped from the conversation long ago.
+    """
+
+    def __init__(self, full_every_n_turns: int = 10):
+        """
+        :param full_every_n_turns: Number of turns after which the full gui context is sent again.
+        """
+        self.full_every_n_turns = full_every_n_turns
+        # The last gui context sent in full, which the changes are relative to
+        self.last_full: Optional[Any] = None
+        self.turns_since_full = 0
+        self.full_chars = 0
+        self.sent_chars = 0
+
+    def render(self, gui_context: Any) -> str:
+        """
+        :param gui_context: The gui context of the turn, possibly empty.
+        :return: The text describing the gui context to append to the user input.
+        """
+        if not gui_context:
+            return ""
+
+        full_text = f" [gui context #{get_gui_context_hash(gui_context)}: {gui_context}]"
+        text = full_text
+        can_diff = isinstance(gui_context, dict) and isinstance(self.last_full, dict)
+        if can_diff and self.turns_since_full < self.full_every_n_turns:
+            previous_hash = get_gui_context_hash(self.last_full)
+            diff = diff_gui_context(self.last_full, gui_context)
+            if not diff:
+                text = f" [gui context unchanged since #{previous_hash}]"
+            else:
+                diff_text = (
+                    f" [gui context #{get_gui_context_hash(gui_context)}, changes since #{previous_hash}: {diff}]"
+                )
+                if len(diff_text) < len(full_text):
+                    text = diff_text
+
+        if text is full_text:
+            self.turns_since_full = 0
+            self.last_full = gui_context
+        else:
+            self.turns_since_full += 1
+        self.full_chars += len(full_text)
+        self.sent_chars += len(text)
+        return text
+
+    def reset(self):
+        """Forgets the last sent gui context, for instance when the agent session is replaced."""
+        self.last_full = None
+        self.turns_since_full = 0
+
+    def get_metrics(self) -> Dict[str, int]:
+        """
+        :return: A dictionary with the estimated tokens that sending full gui contexts would have cost,
+                the tokens actually sent, and the tokens saved.
+        """
+        full_tokens = self.full_chars // CHARS_PER_TOKEN
+        sent_tokens = self.sent_chars // CHARS_PER_TOKEN
+        return {"full_tokens": full_tokens, "sent_tokens": sent_tokens, "tokens_saved": full_tokens - sent_tokens}
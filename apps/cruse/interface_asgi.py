@@ -0,0 +1,184 @@
+import asyncio
+import os
+
+# pylint: disable=import-error
+import socketio
+import uvicorn
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from apps.asgi_app import create_asgi_app
+from apps.cruse.cruse_assistant import async_cruse
+from apps.cruse.cruse_assistant import get_available_systems
+from apps.cruse.cruse_assistant import split_response_blocks
+from apps.cruse.session_manager import GUI_CONTEXT
+from apps.cruse.session_manager import NEW_CHAT
+from apps.cruse.session_manager import USER_INPUT
+from apps.cruse.session_manager import AsyncCruseSessionManager
+from apps.cruse.session_manager import CruseClientSession
+
+os.environ["AGENT_MANIFEST_FILE"] = "registries/manifest.hocon"
+os.environ["AGENT_TOOL_PATH"] = "coded_tools"
+
+PORT = 5001
+# Connections and turns are both served by the event loop, with asyncio agent sessions on the neuro-san server,
+# so many more clients can stay connected than with Flask, and waiting for the agents holds no thread.
+MAX_CONCURRENCY = 32
+SESSION_IDLE_TIMEOUT_SECONDS = 900.0
+SESSION_SWEEP_INTERVAL_SECONDS = 60.0
+EVENT_COALESCE_SECONDS = 0.05
+
+sio = socketio.AsyncServer(async_mode="asgi", ping_timeout=360, ping_interval=25)
+
+
+async def process_turn(client: CruseClientSession, user_input: str, gui_context):
+    """
+    Calls the cruse assistant of a client with its input and emits the response back to that client only.
+
+    :param client: The session of the client.
+    :param user_input: The user input of the turn.
+    :param gui_context: The gui context of the turn.
+    """
+    # Only the changes since the gui context the agent last saw are sent
+    gui_context = client.gui_context_tracker.render(gui_context)
+    print(f"[{client.sid}] USER INPUT:{user_input}\n\nGUI CONTEXT:{gui_context}\n")
+    print(f"[{client.sid}] GUI context tokens: {client.gui_context_tracker.get_metrics()}")
+    response, client.state = await async_cruse(client.session, client.state, user_input + gui_context)
+    print(response)
+
+    gui, speech = split_response_blocks(response)
+
+    if gui:
+        await sio.emit("update_gui", {"data": gui}, namespace="/chat", to=client.sid)
+
+    if speech:
+        await sio.emit("update_speech", {"data": speech}, namespace="/chat", to=client.sid)
+
+
+async def report_turn_error(client: CruseClientSession, message: str):
+    """
+    Lets a client know that its turn failed, so that it does not wait for a response.
+
+    :param client: The session of the client.
+    :param message: The error message.
+    """
+    await sio.emit("turn_error", {"data": message}, namespace="/chat", to=client.sid)
+
+
+session_manager = AsyncCruseSessionManager(
+    process_turn,
+    get_available_systems()[0],
+    max_concurrency=MAX_CONCURRENCY,
+    idle_timeout_seconds=SESSION_IDLE_TIMEOUT_SECONDS,
+    coalesce_seconds=EVENT_COALESCE_SECONDS,
+    report_error=report_turn_error,
+)
+
+
+async def evict_idle_sessions():
+    """Periodically closes the agent sessions of idle clients."""
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_INTERVAL_SECONDS)
+        if session_manager.evict_idle():
+            print(f"Closed idle agent sessions. {session_manager.get_metrics()}")
+
+
+async def start_up():
+    """Start the idle session sweeper."""
+    # Keep a reference so that the task is not garbage collected
+    start_up.sweeper = asyncio.create_task(evict_idle_sessions())
+
+
+async def clean_up():
+    """Tear things down on exit."""
+    print("Bye!")
+    session_manager.close_all()
+
+
+@sio.on("connect", namespace="/chat")
+async def on_connect(sid, *_):
+    """Register the client."""
+    session_manager.connect(sid)
+
+
+@sio.on("disconnect", namespace="/chat")
+async def on_disconnect(sid, *_):
+    """Close the agent session of the client."""
+    session_manager.disconnect(sid)
+
+
+@sio.on("user_input", namespace="/chat")
+async def handle_user_input(sid, json, *_):
+    """
+    Handles user input.
+
+    :param sid: The socket id of the client
+    :param json: A json object
+    """
+    user_input = json["data"]
+    session_manager.post_event(sid, USER_INPUT, user_input)
+    await sio.emit("update_user_input", {"data": user_input}, namespace="/chat", to=sid)
+
+
+@sio.on("gui_context", namespace="/chat")
+async def handle_gui_context(sid, json, *_):
+    """
+    Handles gui context.
+
+    :param sid: The socket id of the client
+    :param json: A json object
+    """
+    gui_context = json["gui_context"]
+    session_manager.post_event(sid, GUI_CONTEXT, gui_context)
+    await sio.emit("gui_context_input", {"gui_context": gui_context}, namespace="/chat", to=sid)
+
+
+@sio.on("new_chat", namespace="/chat")
+async def handle_new_chat(sid, data=None):
+    """
+    Queues a reset of the client's session with the selected agent, or the first available one.
+    See handle_new_chat() in interface_flask.py.
+
+    :param sid: The socket id of the client
+    :param data: A dictionary with a "system" key, or the name of the agent
+    """
+    if isinstance(data, dict):
+        selected_agent = data.get("system")
+    elif isinstance(data, str):
+        selected_agent = data
+    else:
+        selected_agent = None
+
+    # Fallback to default system if none was provided
+    if not selected_agent:
+        available_systems = get_available_systems()
+        selected_agent = available_systems[0] if available_systems else None
+
+    if not selected_agent:
+        print("No available systems to initialize!")
+        return
+
+    session_manager.post_event(sid, NEW_CHAT, selected_agent)
+
+
+async def systems(_request):
+    """
+    Route to retrieve a list of available agent systems.
+
+    Returns:
+        Response: A JSON response containing a list of system names derived
+                  from the manifest file.
+    """
+    return JSONResponse(get_available_systems(), headers={"Cache-Control": "no-store"})
+
+
+app = create_asgi_app(
+    sio,
+    os.path.dirname(os.path.abspath(__file__)),
+    routes=[Route("/systems", systems)],
+    on_startup=[start_up],
+    on_shutdown=[clean_up],
+)
+
+if __name__ == "__main__":
+    uvicorn.run(app, port=PORT, log_level="info")
@@ -1,94 +1,108 @@
 import atexit
 import os
-import queue
 
 # pylint: disable=import-error
 import schedule
 from flask import Flask
 from flask import jsonify
 from flask import render_template
+from flask import request
 from flask_socketio import SocketIO
 
 from apps.cruse.cruse_assistant import cruse
 from apps.cruse.cruse_assistant import get_available_systems
-from apps.cruse.cruse_assistant import parse_response_blocks
-from apps.cruse.cruse_assistant import set_up_cruse_assistant
-from apps.cruse.cruse_assistant import tear_down_cruse_assistant
+from apps.cruse.cruse_assistant import split_response_blocks
+from apps.cruse.session_manager import GUI_CONTEXT
+from apps.cruse.session_manager import NEW_CHAT
+from apps.cruse.session_manager import USER_INPUT
+from apps.cruse.session_manager import CruseClientSession
+from apps.cruse.session_manager import CruseSessionManager
 
 os.environ["AGENT_MANIFEST_FILE"] = "registries/manifest.hocon"
 os.environ["AGENT_TOOL_PATH"] = "coded_tools"
 
+# Maximum number of turns, across all clients, processed at the same time
+MAX_CONCURRENCY = 8
+# Agent sessions of clients idle for longer than this are closed, and opened again on their next turn
+SESSION_IDLE_TIMEOUT_SECONDS = 900.0
+SESSION_SWEEP_INTERVAL_SECONDS = 60.0
+# Events arriving within this many seconds of the first one are merged into the same turn,
+# e.g. the user input and the gui context that the page sends together when a form is submitted.
+EVENT_COALESCE_SECONDS = 0.05
+
 app = Flask(__name__)
 app.config["SECRET_KEY"] = "secret!"
 socketio = SocketIO(app, ping_timeout=360, ping_interval=25)
 thread_started = False  # pylint: disable=invalid-name
 
-user_input_queue = queue.Queue()
-gui_context_queue = queue.Queue()
-
-cruse_session, cruse_agent_state = set_up_cruse_assistant(get_available_systems()[0])
 
+def process_turn(client: CruseClientSession, user_input: str, gui_context):
+    """
+    Calls the cruse assistant of a client with its input and emits the response back to that client only.
 
-def cruse_thinking_process():
-    """Main permanent agent-calling loop."""
-    with app.app_context():
-        global cruse_agent_state  # pylint: disable=global-statement
-        user_input = ""
+    :param client: The session of the client.
+    :param user_input: The user input of the turn.
+    :param gui_context: The gui context of the turn.
+    """
+    # Only the changes since the gui context the agent last saw are sent
+    gui_context = client.gui_context_tracker.render(gui_context)
+    print(f"[{client.sid}] USER INPUT:{user_input}\n\nGUI CONTEXT:{gui_context}\n")
+    print(f"[{client.sid}] GUI context tokens: {client.gui_context_tracker.get_metrics()}")
+    response, client.state = cruse(client.session, client.state, user_input + gui_context)
+    print(response)
 
-        while True:
-            socketio.sleep(1)
-            try:
-                gui_context = gui_context_queue.get_nowait()
-            except queue.Empty:
-                gui_context = ""
+    gui, speech = split_response_blocks(response)
 
-            if user_input or gui_context:
+    if gui:
+        socketio.emit("update_gui", {"data": gui}, namespace="/chat", to=client.sid)
 
-                print(f"USER INPUT:{user_input}\n\nGUI CONTEXT:{gui_context}\n")
-                response, cruse_agent_state = cruse(cruse_session, cruse_agent_state, user_input + str(gui_context))
-                print(response)
+    if speech:
+        socketio.emit("update_speech", {"data": speech}, namespace="/chat", to=client.sid)
 
-                blocks = parse_response_blocks(response)
 
-                gui_to_emit = []
-                speeches_to_emit = []
+def report_turn_error(client: CruseClientSession, message: str):
+    """
+    Lets a client know that its turn failed, so that it does not wait for a response.
 
-                for kind, content in blocks:
-                    if not content:
-                        continue
-                    if kind == "gui":
-                        gui_to_emit.append(content)
-                    elif kind == "say":
-                        speeches_to_emit.append(content)
+    :param client: The session of the client.
+    :param message: The error message.
+    """
+    socketio.emit("turn_error", {"data": message}, namespace="/chat", to=client.sid)
 
-                # fallback if nothing was matched
-                if not blocks and response.strip():
-                    speeches_to_emit.append(response.strip())
 
-                if gui_to_emit:
-                    socketio.emit("update_gui", {"data": "\n".join(gui_to_emit)}, namespace="/chat")
+session_manager = CruseSessionManager(
+    process_turn,
+    get_available_systems()[0],
+    max_concurrency=MAX_CONCURRENCY,
+    idle_timeout_seconds=SESSION_IDLE_TIMEOUT_SECONDS,
+    coalesce_seconds=EVENT_COALESCE_SECONDS,
+    report_error=report_turn_error,
+)
 
-                if speeches_to_emit:
-                    socketio.emit("update_speech", {"data": "\n".join(speeches_to_emit)}, namespace="/chat")
 
-            try:
-                user_input = user_input_queue.get_nowait()
-                if user_input == "exit":
-                    break
-            except queue.Empty:
-                user_input = ""
-                socketio.sleep(1)
-                continue
+def evict_idle_sessions():
+    """Periodically closes the agent sessions of idle clients."""
+    while True:
+        socketio.sleep(SESSION_SWEEP_INTERVAL_SECONDS)
+        if session_manager.evict_idle():
+            print(f"Closed idle agent sessions. {session_manager.get_metrics()}")
 
 
 @socketio.on("connect", namespace="/chat")
 def on_connect():
-    """Start background task on connect."""
+    """Register the client and start the idle session sweeper on the first connection."""
     global thread_started  # pylint: disable=global-statement
+    session_manager.connect(request.sid)
     if not thread_started:
         thread_started = True
         # let socketio manage the green-thread
-        socketio.start_background_task(cruse_thinking_process)
+        socketio.start_background_task(evict_idle_sessions)
+
+
+@socketio.on("disconnect", namespace="/chat")
+def on_disconnect(*_):
+    """Close the agent session of the client."""
+    session_manager.disconnect(request.sid)
 
 
 @app.route("/")
@@ -105,8 +119,8 @@ def handle_user_input(json, *_):
     :param json: A json object
     """
     user_input = json["data"]
-    user_input_queue.put(user_input)
-    socketio.emit("update_user_input", {"data": user_input}, namespace="/chat")
+    session_manager.post_event(request.sid, USER_INPUT, user_input)
+    socketio.emit("update_user_input", {"data": user_input}, namespace="/chat", to=request.sid)
 
 
 @socketio.on("gui_context", namespace="/chat")
@@ -117,14 +131,14 @@ def handle_gui_context(json, *_):
     :param json: A json object
     """
     gui_context = json["gui_context"]
-    gui_context_queue.put(gui_context)
-    socketio.emit("gui_context_input", {"gui_context": gui_context}, namespace="/chat")
+    session_manager.post_event(request.sid, GUI_CONTEXT, gui_context)
+    socketio.emit("gui_context_input", {"gui_context": gui_context}, namespace="/chat", to=request.sid)
 
 
 def cleanup():
     """Tear things down on exit."""
     print("Bye!")
-    tear_down_cruse_assistant(cruse_session)
+    session_manager.close_all()
     socketio.stop()
 
 
@@ -172,12 +186,12 @@ def run_scheduled_tasks():
 @socketio.on("new_chat", namespace="/chat")
 def handle_new_chat(data, *args):
     """
-    Initializes a new chat session with a selected conversational agent.
+    Initializes a new chat session of the client with a selected conversational agent.
 
-    This function resets the current Cruse assistant session and sets up a new one
-    based on the provided `data`, which can be either a dictionary (with a "system" key)
-    or a direct string specifying the agent name. If no valid agent is specified, it
-    defaults to the first available system retrieved by `get_available_systems()`.
+    This function queues a reset of the client's Cruse assistant session, based on the provided `data`,
+    which can be either a dictionary (with a "system" key) or a direct string specifying the agent name.
+    If no valid agent is specified, it defaults to the first available system retrieved by
+    `get_available_systems()`. The reset is processed in order with the other turns of the client.
 
     Parameters:
     ----------
@@ -188,21 +202,13 @@ def handle_new_chat(data, *args):
     *args : tuple
         Additional arguments (currently unused).
 
-    Side Effects:
-    ------------
-    - Tears down the existing Cruse assistant session.
-    - Sets up a new session and updates the global `cruse_session` and `cruse_agent_state`.
-    - Prints diagnostic messages to the console.
-
     Notes:
     -----
     - If no valid agent is found and no available systems are returned, the function exits early.
-    - Relies on global variables: `cruse_session`, `cruse_agent_state`.
+    - Only the session of the calling client is reset, other clients are not affected.
 
     """
     del args
-    # pylint: disable=global-statement
-    global cruse_session, cruse_agent_state
 
     if isinstance(data, dict):
         selected_agent = data.get("system")
@@ -220,12 +226,7 @@ def handle_new_chat(data, *args):
         print("No available systems to initialize!")
         return
 
-    print(f"Resetting session for new chat... Selected agent is: {selected_agent}")
-
-    tear_down_cruse_assistant(cruse_session)
-    cruse_session, cruse_agent_state = set_up_cruse_assistant(selected_agent)
-
-    print("****New chat started****")
+    session_manager.post_event(request.sid, NEW_CHAT, selected_agent)
 
 
 # Register the cleanup function
@@ -0,0 +1,426 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+from apps.cruse.cruse_assistant import set_up_async_cruse_assistant
+from apps.cruse.cruse_assistant import set_up_cruse_assistant
+from apps.cruse.cruse_assistant import tear_down_cruse_assistant
+from apps.cruse.gui_context_diff import GuiContextTracker
+from apps.cruse.gui_context_diff import merge_gui_context
+
+USER_INPUT = "user_input"
+GUI_CONTEXT = "gui_context"
+NEW_CHAT = "new_chat"
+
+
+class CruseClientSession:
+    """
+    The conversation of one connected browser with the cruse assistant.
+    """
+
+    # pylint: disable=too-many-instance-attributes,too-few-public-methods
+    def __init__(self, sid: str, selected_agent: str):
+        """
+        :param sid: The socket id of the client.
+        :param selected_agent: The agent network the cruse assistant operates.
+        """
+        self.sid = sid
+        self.selected_agent = selected_agent
+        self.session = None
+        self.state = None
+        # Gui context last sent to the agent, so that only its changes are sent next time
+        self.gui_context_tracker = GuiContextTracker()
+        # Events waiting to be processed, as (kind, payload, time.monotonic() of their arrival) tuples
+        self.events = deque()
+        # True while a worker or a task is processing the events of this client
+        self.scheduled = False
+        self.closed = False
+        self.last_active = time.monotonic()
+        self.lock = threading.Lock()
+
+
+class BaseCruseSessionManager:
+    """
+    Keeps one cruse assistant session per connected client. Subclasses process their turns.
+
+    Turns of different clients run concurrently, up to max_concurrency at a time, while the turns of a given client
+    run one after the other, in order. Events of a client arriving in a burst are merged into a single turn.
+    Agent sessions of clients that stay idle are closed, and opened again on their next turn.
+    """
+
+    # pylint: disable=too-many-instance-attributes,too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        run_turn: Callable[[CruseClientSession, str, Any], Any],
+        default_agent: str,
+        max_concurrency: int = 8,
+        idle_timeout_seconds: float = 900.0,
+        coalesce_seconds: float = 0.05,
+        report_error: Optional[Callable[[CruseClientSession, str], Any]] = None,
+    ):
+        """
+        :param run_turn: Function processing a turn, given the client, its user input and its merged gui context.
+        :param default_agent: The agent network of clients that did not select one.
+        :param max_concurrency: Maximum number of turns processed at the same time.
+        :param idle_timeout_seconds: Number of seconds after which the agent session of an idle client is closed.
+        :param coalesce_seconds: Events arriving within this many seconds of the first one are merged into one turn.
+        :param report_error: Function letting a client know that one of its turns failed, given the client and
+                an error message, so that it does not wait for a response forever.
+        """
+        self.run_turn = run_turn
+        self.report_error = report_error
+        self.default_agent = default_agent
+        self.max_concurrency = max_concurrency
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.coalesce_seconds = coalesce_seconds
+        self._clients: Dict[str, CruseClientSession] = {}
+        self._lock = threading.Lock()
+        self.turns_in_flight = 0
+        self.turns_processed = 0
+        self.evictions = 0
+
+    def connect(self, sid: str) -> CruseClientSession:
+        """
+        :param sid: The socket id of the client.
+        :return: The session of the client, created if needed.
+        """
+        with self._lock:
+            client = self._clients.get(sid)
+            if client is None:
+                client = CruseClientSession(sid, self.default_agent)
+                self._clients[sid] = client
+            return client
+
+    def disconnect(self, sid: str):
+        """
+        Forgets a client and closes its agent session, possibly once its current turn is over.
+
+        :param sid: The socket id of the client.
+        """
+        with self._lock:
+            client = self._clients.pop(sid, None)
+        if client is None:
+            return
+        with client.lock:
+            client.closed = True
+            client.events.clear()
+            if client.scheduled:
+                # The worker closes the agent session when it is done
+                return
+        self._close_agent_session(client)
+
+    def post_event(self, sid: str, kind: str, payload: Any):
+        """
+        Queues an event of a client and makes sure its events get processed.
+
+        :param sid: The socket id of the client.
+        :param kind: One of "user_input", "gui_context" or "new_chat".
+        :param payload: The user input, the gui context or the selected agent.
+        """
+        client = self.connect(sid)
+        with client.lock:
+            client.events.append((kind, payload, time.monotonic()))
+            client.last_active = time.monotonic()
+            if client.scheduled:
+                return
+            client.scheduled = True
+        self._schedule(client)
+
+    def evict_idle(self) -> int:
+        """
+        Closes the agent sessions of the clients that have been idle for longer than the idle timeout.
+
+        :return: The number of agent sessions closed.
+        """
+        now = time.monotonic()
+        with self._lock:
+            clients = list(self._clients.values())
+        evicted = 0
+        for client in clients:
+            with client.lock:
+                if client.scheduled or client.session is None:
+                    continue
+                if now - client.last_active < self.idle_timeout_seconds:
+                    continue
+                self._close_agent_session(client)
+            evicted += 1
+        with self._lock:
+            self.evictions += evicted
+        return evicted
+
+    def close_all(self):
+        """Closes all the agent sessions."""
+        with self._lock:
+            sids = list(self._clients)
+        for sid in sids:
+            self.disconnect(sid)
+
+    def get_metrics(self) -> Dict[str, int]:
+        """
+        :return: A dictionary with the number of clients, open agent sessions, turns and evictions.
+        """
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "agent_sessions": sum(1 for client in self._clients.values() if client.session is not None),
+                "turns_in_flight": self.turns_in_flight,
+                "turns_processed": self.turns_processed,
+                "evictions": self.evictions,
+                "max_concurrency": self.max_concurrency,
+            }
+
+    def _schedule(self, client: CruseClientSession):
+        """
+        Starts processing the events of a client.
+        """
+        raise NotImplementedError
+
+    def _set_up_agent_session(self, client: CruseClientSession):
+        """
+        Opens the agent session of a client with its selected agent.
+        """
+        raise NotImplementedError
+
+    def _tear_down_agent_session(self, session: Any):
+        """
+        Closes an agent session.
+        """
+        raise NotImplementedError
+
+    def _next_wait(self, client: CruseClientSession) -> Optional[float]:
+        """
+        :return: The number of seconds to wait for the rest of the burst of the next event of a client,
+                or None when there are no events left, in which case the client is no longer scheduled.
+        """
+        with client.lock:
+            if client.closed or not client.events:
+                client.scheduled = False
+                if client.closed:
+                    # Disconnected during the turn, so closing the agent session was left to us
+                    self._close_agent_session(client)
+                return None
+            # Give the rest of a burst a chance to arrive, up to coalesce_seconds after its first event.
+            # Events that arrived during the previous turn have waited long enough already.
+            return client.events[0][2] + self.coalesce_seconds - time.monotonic()
+
+    def _next_turn(self, client: CruseClientSession) -> Optional[Tuple[str, Any, Any]]:
+        """
+        :return: The next new chat event of a client as ("new_chat", selected agent, None), or its next turn as
+                ("user_input", user input, gui context), or None if the client has no events left.
+        """
+        with client.lock:
+            if client.closed or not client.events:
+                return None
+            kind, payload, _ = client.events[0]
+            if kind == NEW_CHAT:
+                client.events.popleft()
+                return NEW_CHAT, payload, None
+            user_input, gui_context = self._take_turn_events(client)
+            return USER_INPUT, user_input, gui_context
+
+    @staticmethod
+    def _take_turn_events(client: CruseClientSession) -> Tuple[str, Any]:
+        """
+        Pops the user input and gui context events up to the next new chat event and merges them.
+        An "exit" input closes the agent session, so it is a turn of its own, after the events before it.
+        Must be called with the lock of the client held.
+        """
+        user_inputs = []
+        gui_context = {}
+        while client.events and client.events[0][0] != NEW_CHAT:
+            kind, payload, _ = client.events[0]
+            if kind == USER_INPUT and payload == "exit":
+                if user_inputs or gui_context:
+                    break
+                client.events.popleft()
+                return payload, gui_context
+            client.events.popleft()
+            if kind == USER_INPUT:
+                user_inputs.append(payload)
+            else:
+                # Later values of the same fields win
+                gui_context = merge_gui_context(gui_context, payload)
+        return "\n".join(user_inputs), gui_context
+
+    def _start_turn(self, client: CruseClientSession, user_input: str, gui_context: Any) -> bool:
+        """
+        :return: True if the turn needs the agent, whose session is then open, False if there is nothing to do.
+        """
+        if user_input == "exit":
+            self._close_agent_session(client)
+            return False
+        if not user_input and not gui_context:
+            return False
+        if client.session is None:
+            self._set_up_agent_session(client)
+        with self._lock:
+            self.turns_in_flight += 1
+        return True
+
+    def _end_turn(self, client: CruseClientSession):
+        with self._lock:
+            self.turns_in_flight -= 1
+            self.turns_processed += 1
+        client.last_active = time.monotonic()
+
+    def _start_new_chat(self, client: CruseClientSession, selected_agent: str):
+        print(f"Resetting session for new chat of client {client.sid}... Selected agent is: {selected_agent}")
+        self._close_agent_session(client)
+        client.selected_agent = selected_agent
+        self._set_up_agent_session(client)
+        client.last_active = time.monotonic()
+        print("****New chat started****")
+
+    def _close_agent_session(self, client: CruseClientSession):
+        if client.session is not None:
+            self._tear_down_agent_session(client.session)
+        client.session = None
+        client.state = None
+        # A new agent session has not seen any gui context yet
+        client.gui_context_tracker.reset()
+
+
+class CruseSessionManager(BaseCruseSessionManager):
+    """
+    Processes the turns of the clients on a bounded pool of worker threads, with blocking agent sessions.
+    """
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        run_turn: Callable[[CruseClientSession, str, Any], None],
+        default_agent: str,
+        max_concurrency: int = 8,
+        idle_timeout_seconds: float = 900.0,
+        coalesce_seconds: float = 0.05,
+        report_error: Optional[Callable[[CruseClientSession, str], None]] = None,
+    ):
+        """
+        See BaseCruseSessionManager. run_turn and report_error are called on the worker threads.
+        """
+        super().__init__(
+            run_turn, default_agent, max_concurrency, idle_timeout_seconds, coalesce_seconds, report_error
+        )
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="cruse-turn")
+
+    def close_all(self):
+        """Closes all the agent sessions and stops the workers."""
+        super().close_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _schedule(self, client: CruseClientSession):
+        self._executor.submit(self._process_events, client)
+
+    def _set_up_agent_session(self, client: CruseClientSession):
+        client.session, client.state = set_up_cruse_assistant(client.selected_agent)
+
+    def _tear_down_agent_session(self, session: Any):
+        tear_down_cruse_assistant(session)
+
+    def _process_events(self, client: CruseClientSession):
+        """
+        Processes the events of a client until there are none left. Runs on a worker.
+        """
+        while (wait_seconds := self._next_wait(client)) is not None:
+            if wait_seconds > 0:
+                time.sleep(wait_seconds)
+            turn = self._next_turn(client)
+            if turn is None:
+                continue
+            kind, payload, gui_context = turn
+            try:
+                if kind == NEW_CHAT:
+                    self._start_new_chat(client, payload)
+                elif self._start_turn(client, payload, gui_context):
+                    try:
+                        self.run_turn(client, payload, gui_context)
+                    finally:
+                        self._end_turn(client)
+            except Exception as exception:  # pylint: disable=broad-exception-caught
+                # Keep serving this client and the others, and let this one know that it gets no response
+                print(f"Error processing turn of client {client.sid}: {str(exception)}")
+                if self.report_error is not None:
+                    self.report_error(client, f"Sorry, your request failed: {str(exception)}")
+
+
+class AsyncCruseSessionManager(BaseCruseSessionManager):
+    """
+    Processes the turns of the clients as tasks of the running event loop, with asyncio agent sessions,
+    so that waiting for the agents holds no thread. All the methods must be called from the event loop.
+    """
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        run_turn: Callable[[CruseClientSession, str, Any], Awaitable[None]],
+        default_agent: str,
+        max_concurrency: int = 8,
+        idle_timeout_seconds: float = 900.0,
+        coalesce_seconds: float = 0.05,
+        report_error: Optional[Callable[[CruseClientSession, str], Awaitable[None]]] = None,
+    ):
+        """
+        See BaseCruseSessionManager. run_turn and report_error are coroutine functions.
+        """
+        super().__init__(
+            run_turn, default_agent, max_concurrency, idle_timeout_seconds, coalesce_seconds, report_error
+        )
+        # Created on first use, in the event loop of the server
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks = set()
+
+    def close_all(self):
+        """Closes all the agent sessions and cancels the turns in progress."""
+        super().close_all()
+        for task in list(self._tasks):
+            task.cancel()
+
+    def _schedule(self, client: CruseClientSession):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        task = asyncio.get_running_loop().create_task(self._process_events(client))
+        # Keep a reference so that the task is not garbage collected
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _set_up_agent_session(self, client: CruseClientSession):
+        client.session, client.state = set_up_async_cruse_assistant(client.selected_agent)
+
+    def _tear_down_agent_session(self, session: Any):
+        # Each request of an asyncio agent session is a separate HTTP call, so there is no connection to close
+        _ = session
+
+    async def _process_events(self, client: CruseClientSession):
+        """
+        Processes the events of a client until there are none left. Runs as a task of the event loop.
+        """
+        while (wait_seconds := self._next_wait(client)) is not None:
+            if wait_seconds > 0:
+                await asyncio.sleep(wait_seconds)
+            turn = self._next_turn(client)
+            if turn is None:
+                continue
+            kind, payload, gui_context = turn
+            try:
+                if kind == NEW_CHAT:
+                    self._start_new_chat(client, payload)
+                    continue
+                async with self._semaphore:
+                    if self._start_turn(client, payload, gui_context):
+                        try:
+                            await self.run_turn(client, payload, gui_context)
+                        finally:
+                            self._end_turn(client)
+            except Exception as exception:  # pylint: disable=broad-exception-caught
+                # Keep serving this client and the others, and let this one know that it gets no response
+                print(f"Error processing turn of client {client.sid}: {str(exception)}")
+                if self.report_error is not None:
+                    await self.report_error(client, f"Sorry, your request failed: {str(exception)}")
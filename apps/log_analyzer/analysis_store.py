@@ -0,0 +1,154 @@
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from hashlib import sha256
+from typing import Callable
+from typing import Dict
+from typing import Optional
+
+
+class AnalysisCheckpointStore:
+    """
+    Persists the analyses of log entries in a SQLite database, keyed by a hash of their content.
+
+    Every analysis is committed as soon as it is done, so an interrupted run resumes where it stopped, and a new run
+    over mostly unchanged logs only sends the new entries to the agent. Entries with the same content, such as
+    the ones repeating a system prompt and a question, are analysed once, even when they are analysed concurrently.
+    """
+
+    def __init__(self, db_path: str, namespace: str = ""):
+        """
+        :param db_path: Path of the SQLite database, created if needed.
+        :param namespace: Name of the analysis, e.g. the agent network, so that different analyses are not mixed up.
+        """
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        # Analyses run on several threads, which share the connection under the lock
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            "entry_hash TEXT PRIMARY KEY, analysis TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._connection.commit()
+        self.hits = 0
+        self.duplicates = 0
+        self.misses = 0
+
+    def get_entry_hash(self, analysis_input: str) -> str:
+        """
+        :param analysis_input: The input sent to the analysis agent.
+        :return: The hash identifying the analysis of that input.
+        """
+        return sha256(f"{self.namespace}\n{analysis_input}".encode("utf-8")).hexdigest()
+
+    def get(self, entry_hash: str) -> Optional[str]:
+        """
+        :param entry_hash: The hash of an analysis input.
+        :return: The stored analysis, or None if the input has not been analysed yet.
+        """
+        with self._lock:
+            return self._select(entry_hash)
+
+    def put(self, entry_hash: str, analysis: str):
+        """
+        :param entry_hash: The hash of an analysis input.
+        :param analysis: Its analysis.
+        """
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO analyses (entry_hash, analysis, created_at) VALUES (?, ?, ?)",
+                (entry_hash, analysis, time.time()),
+            )
+            self._connection.commit()
+
+    def lookup(self, analysis_input: str) -> Optional[str]:
+        """
+        Returns the stored analysis of an input, for callers that analyse the inputs not stored yet themselves,
+        e.g. several at once, and save() their analyses.
+
+        :param analysis_input: The input sent to the analysis agent.
+        :return: The stored analysis, or None if the input has not been analysed yet.
+        """
+        entry_hash = self.get_entry_hash(analysis_input)
+        with self._lock:
+            analysis = self._select(entry_hash)
+            if analysis is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return analysis
+
+    def save(self, analysis_input: str, analysis: str):
+        """
+        Stores the analysis of an input that was looked up, unless it failed.
+
+        :param analysis_input: The input sent to the analysis agent.
+        :param analysis: Its analysis. Failed analyses, reported as None or "Error: ..." strings, are not stored.
+        """
+        if analysis and not str(analysis).startswith("Error:"):
+            self.put(self.get_entry_hash(analysis_input), analysis)
+
+    def get_or_analyze(self, analysis_input: str, analyze: Callable[[str], str]) -> str:
+        """
+        Returns the stored analysis of an input, or analyses it and stores the result.
+        Concurrent calls for the same input wait for the first one rather than analysing it again.
+
+        :param analysis_input: The input sent to the analysis agent.
+        :param analyze: Function analysing an input.
+        :return: The analysis. Failed analyses, reported as None or "Error: ..." strings, are not stored.
+        """
+        entry_hash = self.get_entry_hash(analysis_input)
+        # Checking the analyses in flight and the stored ones, then marking the entry as in flight, happen under
+        # the same lock, so that an analysis stored by another thread in between is never repeated
+        with self._lock:
+            future = self._in_flight.get(entry_hash)
+            owner = future is None
+            if owner:
+                analysis = self._select(entry_hash)
+                if analysis is not None:
+                    self.hits += 1
+                    return analysis
+                future = Future()
+                self._in_flight[entry_hash] = future
+                self.misses += 1
+            else:
+                self.duplicates += 1
+        if not owner:
+            return future.result()
+
+        try:
+            analysis = analyze(analysis_input)
+            if analysis and not str(analysis).startswith("Error:"):
+                self.put(entry_hash, analysis)
+            future.set_result(analysis)
+        except Exception as exception:
+            future.set_exception(exception)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(entry_hash, None)
+        return analysis
+
+    def get_metrics(self) -> Dict[str, int]:
+        """
+        :return: A dictionary with the number of analyses reused from previous runs, shared between duplicate
+                entries of this run, and sent to the agent, along with the number of stored analyses.
+        """
+        with self._lock:
+            stored = self._connection.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+            return {"hits": self.hits, "duplicates": self.duplicates, "misses": self.misses, "stored": stored}
+
+    def close(self):
+        """Closes the database."""
+        with self._lock:
+            self._connection.close()
+
+    def _select(self, entry_hash: str) -> Optional[str]:
+        """
+        :return: The stored analysis of an input, or None. Must be called with the lock held.
+        """
+        cursor = self._connection.execute("SELECT analysis FROM analyses WHERE entry_hash = ?", (entry_hash,))
+        row = cursor.fetchone()
+        return row[0] if row else None
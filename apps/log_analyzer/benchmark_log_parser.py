@@ -0,0 +1,105 @@
+"""
+Compares the regular expression parser of log_analyzer.py with the streaming parser of log_stream_parser.py
+on a generated agent thinking log: time, peak memory, and whether both find the same entries.
+
+    python -m apps.log_analyzer.benchmark_log_parser --entries 100000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from apps.log_analyzer.log_analyzer import extract_conversation_entries
+from apps.log_analyzer.log_analyzer import extract_system_prompt
+from apps.log_analyzer.log_stream_parser import stream_log_entries
+
+
+def write_log_file(file_path, entries):
+    """
+    Write a log file shaped like the agent thinking logs.
+
+    Args:
+        file_path (str): Path of the file to write
+        entries (int): Number of conversation entries
+    """
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write("[SYSTEM]:\nYou are an agent that answers questions about the weather. " * 20 + "\n\n")
+        for index in range(entries):
+            f.write(f"[HUMAN]:\nWhat is the weather in city number {index}?\n\n")
+            f.write(f"[AGENT]:\nCalling tool get_weather with call id call_{index:08x}\n\n")
+            f.write(f"[AI]:\nIt is sunny in city number {index}, with a light breeze.\n\n")
+            metadata = {"completion_tokens": 12, "prompt_tokens": 250 + index % 50, "total_tokens": 262 + index % 50}
+            f.write(f"[AGENT]:\n{json.dumps(metadata)}\n\n")
+
+
+def parse_with_regex(file_path):
+    """
+    Returns:
+        list: The analysis inputs found by the regular expression parser
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        content = f.read()
+    system_prompt = extract_system_prompt(content)
+    return [system_prompt + " " + entry for entry in extract_conversation_entries(content) if entry.strip()]
+
+
+def parse_with_stream(file_path):
+    """
+    Returns:
+        list: The analysis inputs found by the streaming parser
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        return [system_prompt + " " + entry for system_prompt, entry in stream_log_entries(f) if entry.strip()]
+
+
+def count_with_stream(file_path):
+    """
+    Returns:
+        int: The number of entries found by the streaming parser, consuming them one at a time like the analyzer
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        return sum(1 for _ in stream_log_entries(f))
+
+
+def measure(parse, file_path):
+    """
+    Returns:
+        tuple: The result of the parse, its duration in seconds, and its peak memory in megabytes
+    """
+    started_at = time.perf_counter()
+    result = parse(file_path)
+    elapsed_seconds = time.perf_counter() - started_at
+    # Tracing allocations slows the parse down, so memory is measured on a second run
+    tracemalloc.start()
+    parse(file_path)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed_seconds, peak_bytes / (1024 * 1024)
+
+
+def main():
+    """Parse the arguments, generate the log file and run both parsers on it."""
+    parser = argparse.ArgumentParser(description="Benchmark of the log parsers.")
+    parser.add_argument("--entries", type=int, default=50000, help="Number of conversation entries in the log.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "agent_thinking.txt")
+        write_log_file(file_path, args.entries)
+        size_mb = os.path.getsize(file_path) / (1024 * 1024)
+        print(f"Log file of {args.entries} entries, {size_mb:.1f} MB")
+
+        regex_entries, regex_seconds, regex_peak_mb = measure(parse_with_regex, file_path)
+        stream_count, stream_seconds, stream_peak_mb = measure(count_with_stream, file_path)
+        stream_entries = parse_with_stream(file_path)
+
+    print(f"regex:  {regex_seconds:.2f} s, peak memory {regex_peak_mb:.2f} MB, {len(regex_entries)} entries")
+    print(f"stream: {stream_seconds:.2f} s, peak memory {stream_peak_mb:.2f} MB, {stream_count} entries")
+    print(f"Same entries: {regex_entries == stream_entries}")
+
+
+if __name__ == "__main__":
+    main()
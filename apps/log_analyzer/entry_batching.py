@@ -0,0 +1,257 @@
+import re
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from apps.log_analyzer.analysis_store import AnalysisCheckpointStore
+from apps.log_analyzer.parallel_analysis import AnalysisSessionPool
+from apps.log_analyzer.parallel_analysis import analyze_in_order
+from apps.log_analyzer.parallel_analysis import analyze_on_session
+
+# Rough number of characters per token, to pack batches without a tokenizer
+CHARS_PER_TOKEN = 4
+ENTRY_DELIMITER = "=== ENTRY {number} ==="
+# Strict, as a delimiter must be on a line of its own, so that prose mentioning an entry is not taken for one
+ENTRY_DELIMITER_PATTERN = re.compile(r"^=== ENTRY (\d+) ===[ \t]*$", re.MULTILINE)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    :param text: Some text.
+    :return: The approximate number of tokens of the text.
+    """
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def get_entry_input(system_prompt: str, log_entry: str) -> str:
+    """
+    :param system_prompt: The system prompt of the entry.
+    :param log_entry: The conversation entry.
+    :return: The input sent to the analysis agent for the entry on its own, which also keys its stored analysis.
+    """
+    return system_prompt + " " + log_entry
+
+
+class EntryBatch:
+    """
+    Consecutive log entries analysed by a single request. The entries to analyse share the same system prompt,
+    while the entries whose analysis is stored already only keep their place in the order of the entries.
+    """
+
+    def __init__(self):
+        # The system prompt of the entries to analyse, if any
+        self.system_prompt: Optional[str] = None
+        self.log_files: List[str] = []
+        self.entries: List[str] = []
+        self.analyses: List[Optional[str]] = []
+        self.tokens = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, log_file: str, system_prompt: str, log_entry: str, analysis: str = None):
+        """
+        :param log_file: The name of the log file of the entry.
+        :param system_prompt: The system prompt of the entry.
+        :param log_entry: The conversation entry.
+        :param analysis: The stored analysis of the entry, or None if it is to be analysed.
+        """
+        self.log_files.append(log_file)
+        self.entries.append(log_entry)
+        self.analyses.append(analysis)
+        if analysis is None:
+            if self.system_prompt is None:
+                self.system_prompt = system_prompt
+                self.tokens += estimate_tokens(system_prompt)
+            self.tokens += estimate_tokens(log_entry)
+
+    def get_entries_to_analyze(self) -> List[str]:
+        """
+        :return: The entries whose analysis is not stored, in order.
+        """
+        return [entry for entry, analysis in zip(self.entries, self.analyses) if analysis is None]
+
+    def get_analysis_input(self) -> str:
+        """
+        :return: The input sent to the analysis agent for the entries to analyse.
+                 A single entry is sent as it would be without batching.
+        """
+        entries = self.get_entries_to_analyze()
+        if len(entries) == 1:
+            return get_entry_input(self.system_prompt, entries[0])
+        numbered_entries = "\n\n".join(
+            f"{ENTRY_DELIMITER.format(number=number)}\n{entry}" for number, entry in enumerate(entries, start=1)
+        )
+        return (
+            f"{self.system_prompt}\n\n"
+            f"The following {len(entries)} log entries share the system prompt above. "
+            f"Review each entry separately and answer with one section per entry, in the same order, "
+            f'each starting with a "{ENTRY_DELIMITER.format(number="<number>")}" line of its own.\n\n'
+            f"{numbered_entries}"
+        )
+
+
+def batch_log_entries(
+    entries: Iterable[Tuple[str, str, str]],
+    max_tokens: int,
+    max_entries: int,
+    checkpoint_store: AnalysisCheckpointStore = None,
+) -> Iterator[EntryBatch]:
+    """
+    Packs consecutive log entries sharing the same system prompt into batches, so that the system prompt is sent
+    once per batch rather than once per entry. Each entry is looked up in the checkpoint store first, and only
+    the entries whose analysis is not stored take room in a request.
+
+    :param entries: The (log_file, system_prompt, log_entry) tuples to analyse.
+    :param max_tokens: Approximate maximum number of tokens of a request, system prompt included.
+                       An entry that does not fit on its own is sent alone.
+    :param max_entries: Maximum number of entries of a batch, stored ones included, to keep the response easy
+                        to split and the stored analyses held in memory bounded.
+    :param checkpoint_store: Store of the analyses of previous runs to reuse, if any.
+    :return: A generator of batches, in the order of the entries.
+    """
+    batch = EntryBatch()
+    for log_file, system_prompt, log_entry in entries:
+        analysis = None
+        if checkpoint_store is not None:
+            analysis = checkpoint_store.lookup(get_entry_input(system_prompt, log_entry))
+        if len(batch) >= max_entries or (
+            analysis is None
+            and batch.system_prompt is not None
+            and (batch.system_prompt != system_prompt or batch.tokens + estimate_tokens(log_entry) > max_tokens)
+        ):
+            yield batch
+            batch = EntryBatch()
+        batch.add(log_file, system_prompt, log_entry, analysis)
+    if len(batch) > 0:
+        yield batch
+
+
+def split_batch_analysis(analysis: str, count: int) -> Optional[List[str]]:
+    """
+    Splits the analysis of a batch into the analyses of its entries.
+
+    :param analysis: The response of the analysis agent to a batch.
+    :param count: The number of entries of the batch.
+    :return: The analysis of each entry, or None when the response does not have exactly one section per entry,
+            in order, in which case the entries are to be analysed on their own.
+    """
+    if count == 1:
+        return [analysis]
+    if not analysis:
+        return None
+    matches = list(ENTRY_DELIMITER_PATTERN.finditer(analysis))
+    if [int(match.group(1)) for match in matches] != list(range(1, count + 1)):
+        return None
+    ends = [match.start() for match in matches[1:]] + [len(analysis)]
+    return [analysis[match.end() : end].strip() for match, end in zip(matches, ends)]
+
+
+class BatchingMetrics:
+    """
+    Counts the requests saved by batching.
+    """
+
+    def __init__(self):
+        self.entries = 0
+        self.requests = 0
+        self.fallbacks = 0
+        self.prompt_tokens_saved = 0
+
+    def add(self, batch: EntryBatch):
+        """
+        :param batch: A batch read for analysis.
+        """
+        count = len(batch.get_entries_to_analyze())
+        if count > 0:
+            self.entries += count
+            self.requests += 1
+            self.prompt_tokens_saved += estimate_tokens(batch.system_prompt) * (count - 1)
+
+    def add_fallback(self, batch: EntryBatch):
+        """
+        :param batch: A batch whose response could not be split, so that its entries were analysed on their own.
+        """
+        count = len(batch.get_entries_to_analyze())
+        self.fallbacks += 1
+        self.requests += count
+        self.prompt_tokens_saved -= estimate_tokens(batch.system_prompt) * (count - 1)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        :return: A dictionary with the number of entries analysed, of requests, of batches analysed again entry by
+                entry, and of system prompt tokens not sent again.
+        """
+        return {
+            "entries": self.entries,
+            "requests": self.requests,
+            "entries_per_request": round(self.entries / self.requests, 2) if self.requests else 0.0,
+            "fallbacks": self.fallbacks,
+            "prompt_tokens_saved": self.prompt_tokens_saved,
+        }
+
+
+# pylint: disable=too-many-arguments,too-many-positional-arguments
+def analyze_batches_in_parallel(
+    batches: Iterable[EntryBatch],
+    log_analyzer: Callable[[Any, Dict, str], Tuple[str, Dict]],
+    pool: AnalysisSessionPool,
+    max_concurrency: int,
+    checkpoint_store: AnalysisCheckpointStore = None,
+    metrics: BatchingMetrics = None,
+) -> Iterator[Tuple[str, str]]:
+    """
+    Analyses batches of log entries on up to max_concurrency sessions at the same time, and splits the analyses
+    of the batches back into the analyses of their entries. A batch whose response does not have one section per
+    entry has its entries analysed on their own instead. The analysis of each entry is stored under that entry,
+    so that it is reused whether or not the next run batches the entries the same way.
+
+    :param batches: The batches to analyse, as made by batch_log_entries() with the same checkpoint store.
+    :param log_analyzer: Function analysing an input, given a session and its thread,
+                         returning the analysis and the updated thread.
+    :param pool: The pool of analysis sessions, of at least max_concurrency sessions.
+    :param max_concurrency: Maximum number of batches analysed at the same time.
+    :param checkpoint_store: Store in which to save the analyses of the entries, if any.
+    :param metrics: Metrics to update, if any.
+    :return: A generator of (log_file, analysis) tuples, one per entry, in the order of the entries.
+    """
+
+    def analyze(batch: EntryBatch) -> Tuple[List[str], bool]:
+        entries = batch.get_entries_to_analyze()
+        if not entries:
+            return batch.analyses, False
+        analysis = analyze_on_session(batch.get_analysis_input(), log_analyzer, pool)
+        fell_back = False
+        if analysis is not None and str(analysis).startswith("Error:"):
+            # The request failed as a whole, which analysing the entries one by one would most likely repeat
+            new_analyses = [analysis] * len(entries)
+        else:
+            new_analyses = split_batch_analysis(analysis, len(entries))
+            if new_analyses is None:
+                fell_back = True
+                new_analyses = [
+                    analyze_on_session(get_entry_input(batch.system_prompt, entry), log_analyzer, pool)
+                    for entry in entries
+                ]
+        if checkpoint_store is not None:
+            for entry, entry_analysis in zip(entries, new_analyses):
+                checkpoint_store.save(get_entry_input(batch.system_prompt, entry), entry_analysis)
+        new_analyses_iterator = iter(new_analyses)
+        analyses = [stored if stored is not None else next(new_analyses_iterator) for stored in batch.analyses]
+        return analyses, fell_back
+
+    def batch_items() -> Iterator[Tuple[EntryBatch, EntryBatch]]:
+        for batch in batches:
+            if metrics is not None:
+                metrics.add(batch)
+            yield batch, batch
+
+    for batch, (analyses, fell_back) in analyze_in_order(batch_items(), analyze, max_concurrency):
+        if fell_back and metrics is not None:
+            metrics.add_fallback(batch)
+        yield from zip(batch.log_files, analyses)
@@ -0,0 +1,177 @@
+import re
+from collections import deque
+from hashlib import blake2b
+from typing import Any
+from typing import Callable
+from typing import Deque
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Tuple
+
+SIGNATURE_BITS = 64
+# Signatures are indexed by bands of bits. Two signatures differing by fewer bits than there are bands
+# have at least one band in common, so near duplicates are always found among the candidates of the index.
+SIGNATURE_BANDS = 4
+SHINGLE_SIZE = 3
+
+# Volatile tokens, replaced before comparing entries so that the same exchange with other ids is the same pattern
+VOLATILE_TOKEN_PATTERNS = [
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.IGNORECASE), "<uuid>"),
+    (
+        re.compile(r"\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?"),
+        "<timestamp>",
+    ),
+    (re.compile(r"\b\d{1,2}:\d{2}(?::\d{2})?\s*(?:[ap]m)?\b", re.IGNORECASE), "<time>"),
+    (re.compile(r"\b([A-Za-z]+_)[A-Za-z0-9]*\d[A-Za-z0-9]*\b"), r"\1<id>"),
+    (re.compile(r"\b(?=[0-9a-f]*\d)[0-9a-f]{8,}\b", re.IGNORECASE), "<hex>"),
+    (re.compile(r"\b\d+(?:\.\d+)?"), "<num>"),
+]
+WORD_PATTERN = re.compile(r"<\w+>|\w+")
+
+
+def normalize_log_entry(log_entry: str) -> str:
+    """
+    :param log_entry: A conversation entry.
+    :return: The entry with its ids, timestamps and numbers replaced by placeholders.
+    """
+    for pattern, replacement in VOLATILE_TOKEN_PATTERNS:
+        log_entry = pattern.sub(replacement, log_entry)
+    return log_entry
+
+
+def get_feature_hash(feature: str) -> int:
+    """
+    :param feature: A shingle of words.
+    :return: A stable 64 bits hash of the shingle.
+    """
+    return int.from_bytes(blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def get_simhash(text: str) -> int:
+    """
+    :param text: A normalized conversation entry.
+    :return: The 64 bits SimHash of the shingles of its words. Similar texts have signatures differing by few bits.
+    """
+    words = WORD_PATTERN.findall(text.lower())
+    shingle_count = max(len(words) - SHINGLE_SIZE + 1, 1)
+    shingles = {" ".join(words[index : index + SHINGLE_SIZE]) for index in range(shingle_count)}
+    hashes = [get_feature_hash(shingle) for shingle in shingles]
+    threshold = len(hashes) / 2
+    signature = 0
+    for bit in range(SIGNATURE_BITS):
+        if sum((feature_hash >> bit) & 1 for feature_hash in hashes) > threshold:
+            signature |= 1 << bit
+    return signature
+
+
+class EntryClusterer:
+    """
+    Assigns conversation entries to clusters of near duplicates, as they come.
+
+    Entries are compared on their normalized text, by the Hamming distance of their SimHash signatures. The first
+    entry of a cluster is its representative. Entries with different system prompts never share a cluster.
+    """
+
+    def __init__(self, max_distance: int = 3):
+        """
+        :param max_distance: Maximum number of differing signature bits for an entry to join a cluster.
+                             Must be lower than SIGNATURE_BANDS. 0 only clusters entries equal once normalized.
+        """
+        if max_distance >= SIGNATURE_BANDS:
+            raise ValueError(f"max_distance must be lower than {SIGNATURE_BANDS}")
+        self.max_distance = max_distance
+        self.band_bits = SIGNATURE_BITS // SIGNATURE_BANDS
+        # Cluster of each normalized entry seen, keyed by a hash, to skip signatures for exact duplicates
+        self._exact: Dict[Tuple[int, int], int] = {}
+        # Representatives indexed by system prompt and band, as (signature, cluster) tuples
+        self._bands: Dict[Tuple[int, int, int], List[Tuple[int, int]]] = {}
+        self.clusters = 0
+        self.entries = 0
+
+    def assign(self, system_prompt: str, log_entry: str) -> Tuple[int, bool]:
+        """
+        :param system_prompt: The system prompt of the entry.
+        :param log_entry: The conversation entry.
+        :return: The cluster of the entry, and whether the entry is its representative.
+        """
+        self.entries += 1
+        prompt_key = get_feature_hash(system_prompt)
+        normalized = normalize_log_entry(log_entry)
+        exact_key = (prompt_key, get_feature_hash(normalized))
+        cluster = self._exact.get(exact_key)
+        if cluster is not None:
+            return cluster, False
+
+        signature = get_simhash(normalized)
+        band_mask = (1 << self.band_bits) - 1
+        band_keys = [
+            (prompt_key, band, (signature >> (band * self.band_bits)) & band_mask) for band in range(SIGNATURE_BANDS)
+        ]
+        if self.max_distance > 0:
+            for band_key in band_keys:
+                for candidate_signature, candidate_cluster in self._bands.get(band_key, ()):
+                    if (signature ^ candidate_signature).bit_count() <= self.max_distance:
+                        self._exact[exact_key] = candidate_cluster
+                        return candidate_cluster, False
+
+        cluster = self.clusters
+        self.clusters += 1
+        self._exact[exact_key] = cluster
+        for band_key in band_keys:
+            self._bands.setdefault(band_key, []).append((signature, cluster))
+        return cluster, True
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        :return: A dictionary with the number of entries, of clusters, and of entries per cluster.
+        """
+        return {
+            "entries": self.entries,
+            "clusters": self.clusters,
+            "entries_per_cluster": round(self.entries / self.clusters, 2) if self.clusters else 0.0,
+        }
+
+
+def analyze_clustered_entries(
+    entries: Iterable[Tuple[str, str, str]],
+    analyze_entries: Callable[[Iterable[Tuple[str, str, str]]], Iterator[Tuple[str, str]]],
+    clusterer: EntryClusterer,
+) -> Iterator[Tuple[str, str]]:
+    """
+    Analyses one representative per cluster of near-duplicate entries, and gives its analysis to every entry
+    of the cluster.
+
+    :param entries: The (log_file, system_prompt, log_entry) tuples to analyse.
+    :param analyze_entries: Function analysing (log_file, system_prompt, log_entry) tuples, generating
+                            (log_file, analysis) tuples in the same order, e.g. on a pool of sessions.
+    :param clusterer: The clusterer assigning the entries to clusters.
+    :return: A generator of (log_file, analysis) tuples, one per entry, in the order of the entries.
+             The analyses of entries that were not analysed themselves are prefixed by their cluster.
+    """
+    # Entries waiting for the analysis of their cluster, as (log_file, cluster, is_representative) tuples
+    waiting: Deque[Tuple[str, int, bool]] = deque()
+    # Clusters of the representatives sent for analysis, in order
+    representatives: Deque[int] = deque()
+    analyses: Dict[int, str] = {}
+
+    def representative_entries() -> Iterator[Tuple[str, str, str]]:
+        for log_file, system_prompt, log_entry in entries:
+            cluster, is_representative = clusterer.assign(system_prompt, log_entry)
+            waiting.append((log_file, cluster, is_representative))
+            if is_representative:
+                representatives.append(cluster)
+                yield log_file, system_prompt, log_entry
+
+    def ready() -> Iterator[Tuple[str, str]]:
+        # Representatives come before the other entries of their cluster, so entries are ready in order
+        while waiting and waiting[0][1] in analyses:
+            log_file, cluster, is_representative = waiting.popleft()
+            analysis = analyses[cluster]
+            yield log_file, analysis if is_representative else f"[same pattern as cluster {cluster}] {analysis}"
+
+    for _, analysis in analyze_entries(representative_entries()):
+        analyses[representatives.popleft()] = analysis
+        yield from ready()
+    yield from ready()
@@ -1,11 +1,41 @@
-import json
 import os
 import re
+import time
 
 from neuro_san.client.agent_session_factory import AgentSessionFactory
 from neuro_san.client.streaming_input_processor import StreamingInputProcessor
 
-AGENT_THINKING_LOGS_DIRECTORY = "/private/tmp/agent_thinking"
+from apps.log_analyzer.analysis_store import AnalysisCheckpointStore
+from apps.log_analyzer.entry_batching import BatchingMetrics
+from apps.log_analyzer.entry_batching import analyze_batches_in_parallel
+from apps.log_analyzer.entry_batching import batch_log_entries
+from apps.log_analyzer.entry_clustering import EntryClusterer
+from apps.log_analyzer.entry_clustering import analyze_clustered_entries
+from apps.log_analyzer.log_follower import LogFollower
+from apps.log_analyzer.log_stream_parser import AGENT_THINKING_LOGS_DIRECTORY
+from apps.log_analyzer.log_stream_parser import is_json_metadata
+from apps.log_analyzer.log_stream_parser import stream_log_entries
+from apps.log_analyzer.parallel_analysis import AnalysisProgress
+from apps.log_analyzer.parallel_analysis import AnalysisSessionPool
+from apps.log_analyzer.parallel_analysis import analyze_entries_in_parallel
+
+# Number of entries analysed at the same time, each on its own session. 1 analyses them one after the other.
+MAX_CONCURRENCY = 8
+# Analyses are stored there, so that entries analysed by a previous run are not sent to the agent again.
+# Set to None to analyse every entry on every run.
+CHECKPOINT_DB_PATH = "/tmp/log_analyzer_checkpoints.sqlite"
+# Set to a number of tokens, e.g. 6000, to analyse entries sharing a system prompt together, up to about this many
+# tokens and BATCH_MAX_ENTRIES entries per request, so that the system prompt is not sent again for each entry.
+# None analyses each entry on its own.
+BATCH_MAX_TOKENS = None
+BATCH_MAX_ENTRIES = 10
+# Set to a number of bits, e.g. 3, to analyse near-duplicate entries, e.g. the same tool call with other ids, once:
+# ids, timestamps and numbers are ignored, and entries whose SimHash signatures differ by at most this many bits
+# (out of 64, up to 3) are considered the same pattern. None analyses every entry.
+CLUSTER_MAX_DISTANCE = None
+# True to keep following the log files and analyse new entries as they are written, instead of analysing them once.
+FOLLOW_LOGS = False
+FOLLOW_POLL_INTERVAL_SECONDS = 1.0
 
 AGENT_NETWORK_NAME = "log_analysis_agents"
 os.environ["AGENT_MANIFEST_FILE"] = "registries/manifest.hocon"
@@ -83,15 +113,16 @@ def tear_down_analysis_assistant(analysis_session):
     print("analysis assistant torn down.")
 
 
-def parse_log_files(directory_path, log_analyzer, analysis_session, analysis_thread):
+def iterate_log_entry_parts(directory_path):
     """
-    Parse all log files in a directory and extract system prompts and conversation entries.
+    Walk all log files in a directory and stream their conversation entries, along with the system prompt
+    of their file.
 
     Args:
         directory_path (str): Path to directory containing log files
-        log_analyzer: Function to call for analysis
-        analysis_session: Session object for analysis
-        analysis_thread: Thread object for analysis
+
+    Yields:
+        tuple: The name of the log file, its system prompt and the conversation entry
     """
 
     # Get all log files in the directory
@@ -102,22 +133,11 @@ def parse_log_files(directory_path, log_analyzer, analysis_session, analysis_thr
         print(f"Processing file: {log_file}")
 
         try:
+            # Entries are parsed while the file is read, so memory does not grow with the size of the file
             with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-
-            # Extract system prompt
-            system_prompt = extract_system_prompt(content)
-
-            # Extract conversation entries
-            conversation_entries = extract_conversation_entries(content)
-
-            # Process each conversation entry
-            for log_entry in conversation_entries:
-                if log_entry.strip():  # Skip empty entries
-                    analysis, analysis_thread = log_analyzer(
-                        analysis_session, analysis_thread, system_prompt + " " + log_entry
-                    )
-                    print(analysis)
+                for system_prompt, log_entry in stream_log_entries(f):
+                    if log_entry.strip():  # Skip empty entries
+                        yield log_file, system_prompt, log_entry
 
         except (FileNotFoundError, UnicodeDecodeError, IOError) as e:
             print(f"Error processing file {file_path}: {str(e)}")
@@ -128,6 +148,132 @@ def parse_log_files(directory_path, log_analyzer, analysis_session, analysis_thr
             raise  # Or use logging framework to log full traceback
 
 
+def iterate_log_entries(directory_path):
+    """
+    Walk all log files in a directory and stream their conversation entries, each prefixed with the system prompt
+    of its file.
+
+    Args:
+        directory_path (str): Path to directory containing log files
+
+    Yields:
+        tuple: The name of the log file and the input to analyse
+    """
+    for log_file, system_prompt, log_entry in iterate_log_entry_parts(directory_path):
+        yield log_file, system_prompt + " " + log_entry
+
+
+def parse_log_files(directory_path, log_analyzer, analysis_session, analysis_thread, checkpoint_store=None):
+    """
+    Parse all log files in a directory and analyse their conversation entries one after the other.
+
+    Args:
+        directory_path (str): Path to directory containing log files
+        log_analyzer: Function to call for analysis
+        analysis_session: Session object for analysis
+        analysis_thread: Thread object for analysis
+        checkpoint_store: Store of the analyses of previous runs to reuse, if any
+    """
+
+    def analyze(analysis_input):
+        nonlocal analysis_thread
+        analysis, analysis_thread = log_analyzer(analysis_session, analysis_thread, analysis_input)
+        return analysis
+
+    for _, analysis_input in iterate_log_entries(directory_path):
+        if checkpoint_store is not None:
+            analysis = checkpoint_store.get_or_analyze(analysis_input, analyze)
+        else:
+            analysis = analyze(analysis_input)
+        print(analysis)
+
+
+def parse_log_files_in_parallel(directory_path, log_analyzer, max_concurrency=MAX_CONCURRENCY, checkpoint_store=None):
+    """
+    Parse all log files in a directory and analyse their conversation entries on a pool of independent
+    analysis sessions, up to max_concurrency at the same time. Analyses are printed in the order of the entries,
+    along with the progress of the run. When CLUSTER_MAX_DISTANCE is set, only one entry per pattern of
+    near-duplicate entries is analysed. When BATCH_MAX_TOKENS is set, entries sharing a system prompt are
+    analysed in batches, one request per batch.
+
+    Args:
+        directory_path (str): Path to directory containing log files
+        log_analyzer: Function to call for analysis
+        max_concurrency (int): Maximum number of requests analysed at the same time
+        checkpoint_store: Store of the analyses of previous runs to reuse, if any
+    """
+    pool = AnalysisSessionPool(max_concurrency, set_up_log_analyzer, tear_down_analysis_assistant)
+    batching_metrics = BatchingMetrics()
+
+    def analyze_entries(entry_parts):
+        if BATCH_MAX_TOKENS is not None:
+            batches = batch_log_entries(entry_parts, BATCH_MAX_TOKENS, BATCH_MAX_ENTRIES, checkpoint_store)
+            return analyze_batches_in_parallel(
+                batches, log_analyzer, pool, max_concurrency, checkpoint_store, batching_metrics
+            )
+        entries = ((log_file, system_prompt + " " + log_entry) for log_file, system_prompt, log_entry in entry_parts)
+        return analyze_entries_in_parallel(entries, log_analyzer, pool, max_concurrency, checkpoint_store)
+
+    clusterer = EntryClusterer(CLUSTER_MAX_DISTANCE) if CLUSTER_MAX_DISTANCE is not None else None
+    try:
+        entry_parts = iterate_log_entry_parts(directory_path)
+        if clusterer is not None:
+            analyses = analyze_clustered_entries(entry_parts, analyze_entries, clusterer)
+        else:
+            analyses = analyze_entries(entry_parts)
+        for log_file, analysis in analyses:
+            print(f"[{log_file}] {analysis}")
+        if clusterer is not None:
+            print(f"Clustering: {clusterer.get_metrics()}")
+        if BATCH_MAX_TOKENS is not None:
+            print(f"Batching: {batching_metrics.get_metrics()}")
+    finally:
+        pool.close()
+
+
+def follow_log_files(
+    directory_path,
+    log_analyzer,
+    max_concurrency=MAX_CONCURRENCY,
+    checkpoint_store=None,
+    poll_interval_seconds=FOLLOW_POLL_INTERVAL_SECONDS,
+):
+    """
+    Follow the log files of a directory and analyse the conversation entries appended to them, until interrupted.
+    The entries found by each poll are analysed together as a batch, on a pool of independent analysis sessions.
+
+    Args:
+        directory_path (str): Path to directory containing log files
+        log_analyzer: Function to call for analysis
+        max_concurrency (int): Maximum number of entries analysed at the same time
+        checkpoint_store: Store of the analyses of previous runs to reuse, if any
+        poll_interval_seconds (float): Number of seconds between two looks at the log files
+    """
+    follower = LogFollower(directory_path)
+    pool = AnalysisSessionPool(max_concurrency, set_up_log_analyzer, tear_down_analysis_assistant)
+    progress = AnalysisProgress()
+    print(f"Following log files in {directory_path}...")
+    try:
+        while True:
+            polled_at = time.monotonic()
+            entries = follower.poll()
+            if entries:
+                analyses = analyze_entries_in_parallel(
+                    entries, log_analyzer, pool, max_concurrency, checkpoint_store, progress
+                )
+                for log_file, analysis in analyses:
+                    print(f"[{log_file}] {analysis}")
+                print(
+                    f"Analysed {len(entries)} new entries {time.monotonic() - polled_at:.1f} s after reading them. "
+                    f"{follower.get_metrics()}"
+                )
+            time.sleep(max(poll_interval_seconds - (time.monotonic() - polled_at), 0.0))
+    except KeyboardInterrupt:
+        print("Stopped following log files.")
+    finally:
+        pool.close()
+
+
 def extract_system_prompt(content):
     """
     Extract the [SYSTEM] section from the log content.
@@ -212,25 +358,6 @@ def extract_conversation_entries(content):
     return entries
 
 
-def is_json_metadata(content):
-    """
-    Check if content appears to be JSON metadata (contains expected fields like completion_tokens).
-
-    Args:
-        content (str): Content to check
-
-    Returns:
-        bool: True if content appears to be metadata JSON
-    """
-    try:
-        data = json.loads(content.strip())
-        # Check if it has the expected metadata fields
-        expected_fields = ["completion_tokens", "prompt_tokens", "total_tokens"]
-        return any(field in data for field in expected_fields)
-    except (json.JSONDecodeError, TypeError):
-        return False
-
-
 # Example usage:
 def agentic_log_analyzer(analysis_session, analysis_thread, combined_input):
     """
@@ -244,10 +371,32 @@ def agentic_log_analyzer(analysis_session, analysis_thread, combined_input):
 
 # Example usage:
 if __name__ == "__main__":
-    # Replace these with your actual objects/functions
-    the_analysis_session, the_analysis_thread = set_up_log_analyzer()
-
-    # Call the parser
-    parse_log_files(AGENT_THINKING_LOGS_DIRECTORY, agentic_log_analyzer, the_analysis_session, the_analysis_thread)
-
-    tear_down_analysis_assistant(the_analysis_session)
+    the_checkpoint_store = None
+    if CHECKPOINT_DB_PATH:
+        the_checkpoint_store = AnalysisCheckpointStore(CHECKPOINT_DB_PATH, AGENT_NETWORK_NAME)
+
+    if FOLLOW_LOGS:
+        follow_log_files(AGENT_THINKING_LOGS_DIRECTORY, log_analyzer_agent, MAX_CONCURRENCY, the_checkpoint_store)
+    elif MAX_CONCURRENCY > 1:
+        # The pool sets up and tears down its own sessions
+        parse_log_files_in_parallel(
+            AGENT_THINKING_LOGS_DIRECTORY, log_analyzer_agent, MAX_CONCURRENCY, the_checkpoint_store
+        )
+    else:
+        # Replace these with your actual objects/functions
+        the_analysis_session, the_analysis_thread = set_up_log_analyzer()
+
+        # Call the parser
+        parse_log_files(
+            AGENT_THINKING_LOGS_DIRECTORY,
+            agentic_log_analyzer,
+            the_analysis_session,
+            the_analysis_thread,
+            the_checkpoint_store,
+        )
+
+        tear_down_analysis_assistant(the_analysis_session)
+
+    if the_checkpoint_store is not None:
+        print(f"Checkpoint store: {the_checkpoint_store.get_metrics()}")
+        the_checkpoint_store.close()
@@ -0,0 +1,143 @@
+import os
+import time
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+from apps.log_analyzer.log_stream_parser import CHUNK_SIZE
+from apps.log_analyzer.log_stream_parser import LogEntryStreamParser
+
+
+class FollowedLogFile:
+    """
+    The reading position of a followed log file, and the parser of the entries read so far.
+    """
+
+    # pylint: disable=too-few-public-methods
+    def __init__(self, inode: int):
+        """
+        :param inode: The inode of the file, which changes when the file is rotated.
+        """
+        self.inode = inode
+        self.offset = 0
+        self.size = 0
+        self.parser = LogEntryStreamParser()
+        self.last_growth = time.monotonic()
+
+
+class LogFollower:
+    """
+    Follows the log files of a directory and returns the conversation entries appended to them.
+
+    Only the bytes appended since the previous poll are read and parsed. Incomplete lines are left for the next poll.
+    A file that is replaced (a new inode) or truncated is read again from its start.
+    """
+
+    def __init__(self, directory_path: str, from_start: bool = False, settle_seconds: float = 2.0):
+        """
+        :param directory_path: Path to the directory containing the log files.
+        :param from_start: True to return the entries already in the files when following starts. Otherwise they are
+                           only parsed, to know the system prompt and the entry being written, and only new entries
+                           are returned. Files created while following are always read from their start.
+        :param settle_seconds: Number of seconds after which a file that stopped growing has its last entry completed,
+                               if nothing but its metadata can follow. Entries still waiting for their answer are kept
+                               until it is written.
+        """
+        self.directory_path = directory_path
+        self.from_start = from_start
+        self.settle_seconds = settle_seconds
+        self.files: Dict[str, FollowedLogFile] = {}
+        self.started = False
+        self.bytes_read = 0
+        self.rotations = 0
+
+    def poll(self) -> List[Tuple[str, str]]:
+        """
+        Reads what was appended to the log files since the previous poll.
+
+        :return: The (log_file, analysis_input) tuples of the entries completed since the previous poll.
+        """
+        entries = []
+        seen = set()
+        # Rotated files are often renamed, and keep being read from where they were
+        previous = {followed.inode: followed for followed in self.files.values()}
+        for log_file in sorted(os.listdir(self.directory_path)):
+            file_path = os.path.join(self.directory_path, log_file)
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                continue
+            if not os.path.isfile(file_path):
+                continue
+            seen.add(log_file)
+            try:
+                file_entries = self._poll_file(log_file, file_path, stat, previous)
+            except (FileNotFoundError, UnicodeDecodeError, IOError) as e:
+                print(f"Error processing file {file_path}: {str(e)}")
+                continue
+            entries.extend((log_file, system_prompt + " " + entry) for system_prompt, entry in file_entries)
+
+        # Forget the files that were removed
+        for log_file in set(self.files) - seen:
+            del self.files[log_file]
+        self.started = True
+        return entries
+
+    def _poll_file(
+        self, log_file: str, file_path: str, stat: os.stat_result, previous: Dict[int, FollowedLogFile]
+    ) -> List[Tuple[str, str]]:
+        followed = self.files.get(log_file)
+        if followed is None or followed.inode != stat.st_ino:
+            renamed = previous.get(stat.st_ino)
+            if renamed is None and followed is not None:
+                print(f"Log file {log_file} was rotated, reading it from the start")
+                self.rotations += 1
+            followed = renamed
+        if followed is not None and stat.st_size < followed.offset:
+            print(f"Log file {log_file} was truncated, reading it from the start")
+            self.rotations += 1
+            followed = None
+        is_new = followed is None
+        if is_new:
+            followed = FollowedLogFile(stat.st_ino)
+        self.files[log_file] = followed
+        # Content already there when following starts is only parsed to catch up with the file, unless asked for
+        catching_up = is_new and not self.started and not self.from_start
+
+        entries = []
+        if stat.st_size > followed.offset:
+            with open(file_path, "rb") as f:
+                f.seek(followed.offset)
+                data = b""
+                while True:
+                    chunk = f.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    data += chunk
+                    # Lines being written are left for the next poll
+                    end = data.rfind(b"\n") + 1
+                    if end:
+                        followed.offset += end
+                        self.bytes_read += end
+                        # Newlines never occur within a multi-byte utf-8 character, so whole lines decode fine
+                        file_entries = followed.parser.feed(data[:end].decode("utf-8"))
+                        if not catching_up:
+                            entries.extend(file_entries)
+                        data = data[end:]
+            if catching_up:
+                # Nor is the entry that was being written
+                followed.parser.finish()
+
+        if stat.st_size != followed.size:
+            followed.size = stat.st_size
+            followed.last_growth = time.monotonic()
+        elif time.monotonic() - followed.last_growth >= self.settle_seconds:
+            # The file stopped growing, so its last entry is complete if its metadata was written
+            entries.extend(followed.parser.flush())
+        return entries
+
+    def get_metrics(self) -> Dict[str, int]:
+        """
+        :return: A dictionary with the number of followed files, the bytes read and the rotations detected.
+        """
+        return {"files": len(self.files), "bytes_read": self.bytes_read, "rotations": self.rotations}
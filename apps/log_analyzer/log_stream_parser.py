@@ -0,0 +1,231 @@
+import json
+import re
+from typing import IO
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+# Where the agents write their thinking logs, one file per agent
+AGENT_THINKING_LOGS_DIRECTORY = "/private/tmp/agent_thinking"
+MARKER_PATTERN = re.compile(r"\[(?:HUMAN|AI|AGENT|SYSTEM)]")
+SYSTEM_PROMPT_START_PATTERN = re.compile(r":\s*\n")
+# Number of characters read at a time. Splitting large chunks costs much less than splitting line by line.
+CHUNK_SIZE = 1024 * 1024
+
+
+def is_json_metadata(content):
+    """
+    Check if content appears to be JSON metadata (contains expected fields like completion_tokens).
+
+    Args:
+        content (str): Content to check
+
+    Returns:
+        bool: True if content appears to be metadata JSON
+    """
+    try:
+        data = json.loads(content.strip())
+        # Check if it has the expected metadata fields
+        expected_fields = ["completion_tokens", "prompt_tokens", "total_tokens"]
+        return any(field in data for field in expected_fields)
+    except (json.JSONDecodeError, TypeError):
+        return False
+
+
+def read_chunks(log_file: IO[str], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    Read a log file in chunks that end at line boundaries.
+
+    Args:
+        log_file (IO[str]): The open log file
+        chunk_size (int): Approximate number of characters per chunk
+
+    Yields:
+        str: The next chunk, made of whole lines
+    """
+    while True:
+        chunk = log_file.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk + log_file.readline()
+
+
+class LogEntryStreamParser:
+    """
+    Recognises the system prompt and the conversation entries of a log file in a single pass.
+
+    Produces the same system prompt and entries as extract_system_prompt() and extract_conversation_entries()
+    in log_analyzer.py, but entries are yielded as soon as they are complete. Memory therefore depends on
+    the size of a chunk and of an entry, not on the size of the file. The only difference is that an entry gets
+    the system prompt seen before it, whereas the regular expressions see a system prompt written anywhere in the file.
+
+    Text can be fed as it is appended to the file, which is how log files are followed.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, on_section: Callable[[str, str], None] = None):
+        """
+        Args:
+            on_section (Callable): Function called with the marker of each section of the file, e.g. "[AGENT]",
+                and its raw text up to the next marker, for readers interested in sections rather than entries
+        """
+        self.on_section = on_section
+        self.system_prompt = ""
+        # Marker and raw text of the section being read
+        self._label: Optional[str] = None
+        self._parts: List[str] = []
+        # Raw text of the system prompt being read, None when not reading it
+        self._system_parts: Optional[List[str]] = None
+        self._system_prompt_found = False
+        # Parts of the entry being read, None when looking for the next [HUMAN] section
+        self._entry_parts: Optional[List[str]] = None
+        self._after_ai = False
+
+    def parse(self, lines: Iterable[str]) -> Iterator[Tuple[str, str]]:
+        """
+        Args:
+            lines (Iterable[str]): Lines of a log file, with their line endings, or chunks of whole lines
+
+        Yields:
+            tuple: The system prompt and a conversation entry string
+        """
+        for line in lines:
+            yield from self.feed(line)
+        yield from self.finish()
+
+    def feed(self, text: str) -> List[Tuple[str, str]]:
+        """
+        Args:
+            text (str): The next lines of the log file, with their line endings
+
+        Returns:
+            list: The system prompts and conversation entries completed by the text
+        """
+        entries = []
+        position = 0
+        # Markers never span lines, so a marker can be recognised within the lines it starts on
+        for match in MARKER_PATTERN.finditer(text):
+            if self._label is not None:
+                self._parts.append(text[position : match.start()])
+                self._end_section(entries)
+            self._label = match.group()
+            self._parts = []
+            position = match.end()
+        if self._label is not None:
+            self._parts.append(text[position:])
+        return entries
+
+    def flush(self) -> List[Tuple[str, str]]:
+        """
+        Completes the entry being read when a followed log file stops growing, if the section being read can only
+        end it: the metadata following its answer. Otherwise the section and the entry are kept as they are, since
+        the rest of them, such as an answer that takes a while, may still be appended to the file.
+
+        Returns:
+            list: The system prompt and conversation entry completed, if any
+        """
+        entries = []
+        if self._after_ai and self._label == "[AGENT]" and is_json_metadata("".join(self._parts).strip()):
+            self._end_section(entries)
+            self._label = None
+            self._parts = []
+        return entries
+
+    def finish(self) -> List[Tuple[str, str]]:
+        """
+        Completes the section and the entry being read, at the end of the log file.
+        Text fed afterwards is ignored up to its first marker.
+
+        Returns:
+            list: The system prompts and conversation entries completed by the end of the log file
+        """
+        entries = []
+        if self._label is not None:
+            self._end_section(entries)
+            self._label = None
+            self._parts = []
+        self._end_system_prompt()
+        entry = self._end_entry()
+        if entry is not None:
+            entries.append((self.system_prompt, entry))
+        return entries
+
+    def _end_section(self, entries: List[Tuple[str, str]]):
+        raw_text = "".join(self._parts)
+        if self.on_section is not None:
+            self.on_section(self._label, raw_text)
+        self._read_system_prompt(self._label, raw_text)
+        content = raw_text.strip()
+        if content:
+            entry = self._add_section(self._label, content)
+            if entry is not None:
+                entries.append((self.system_prompt, entry))
+
+    def _read_system_prompt(self, label: str, raw_text: str):
+        """
+        The system prompt is the text following the first "[SYSTEM]:" line, up to the next non-system marker.
+        """
+        if self._system_parts is not None:
+            if label == "[SYSTEM]":
+                self._system_parts.append(label + raw_text)
+                return
+            self._end_system_prompt()
+        if label == "[SYSTEM]" and not self._system_prompt_found and SYSTEM_PROMPT_START_PATTERN.match(raw_text):
+            self._system_prompt_found = True
+            self._system_parts = [raw_text[1:]]
+
+    def _end_system_prompt(self):
+        if self._system_parts is not None:
+            self.system_prompt = "".join(self._system_parts).strip()
+            self._system_parts = None
+
+    def _add_section(self, label: str, content: str) -> Optional[str]:
+        """
+        Adds a non-empty section to the entry being read.
+
+        Returns:
+            str: The entry completed by this section, if any
+        """
+        if self._after_ai:
+            # An entry ends with its [AI] section, plus the following [AGENT] section if it is metadata
+            if label == "[AGENT]" and is_json_metadata(content):
+                self._entry_parts.append(f"[AGENT]:\n{content}")
+                return self._end_entry()
+            entry = self._end_entry()
+            self._add_section(label, content)
+            return entry
+
+        if self._entry_parts is None:
+            # Entries start with a [HUMAN] section
+            if label == "[HUMAN]":
+                self._entry_parts = [f"[HUMAN]:\n{content}"]
+            return None
+
+        self._entry_parts.append(f"{label}:\n{content}")
+        if label == "[AI]":
+            self._after_ai = True
+        return None
+
+    def _end_entry(self) -> Optional[str]:
+        entry_parts = self._entry_parts
+        self._entry_parts = None
+        self._after_ai = False
+        if entry_parts is None or len(entry_parts) < 2:  # At least HUMAN and AI
+            return None
+        return "\n".join(entry_parts)
+
+
+def stream_log_entries(log_file: IO[str]) -> Iterator[Tuple[str, str]]:
+    """
+    Stream the conversation entries of a log file, each with the system prompt of the file.
+
+    Args:
+        log_file (IO[str]): The open log file
+
+    Yields:
+        tuple: The system prompt and a conversation entry string
+    """
+    return LogEntryStreamParser().parse(read_chunks(log_file))
@@ -0,0 +1,231 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Deque
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import Tuple
+
+from apps.log_analyzer.analysis_store import AnalysisCheckpointStore
+
+# Prints the progress every this many seconds
+PROGRESS_INTERVAL_SECONDS = 10.0
+
+
+class AnalysisSessionPool:
+    """
+    A pool of independent analysis sessions, each with its own conversation thread, so that several log entries
+    can be analysed at the same time. Sessions are created on demand, up to the size of the pool.
+    """
+
+    def __init__(self, size: int, set_up: Callable[[], Tuple[Any, Dict]], tear_down: Callable[[Any], None]):
+        """
+        :param size: Maximum number of sessions.
+        :param set_up: Function returning a new session and its conversation thread.
+        :param tear_down: Function closing a session.
+        """
+        self.size = size
+        self.set_up = set_up
+        self.tear_down = tear_down
+        self._idle = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Tuple[Any, Dict]:
+        """
+        :return: An idle session and its conversation thread, waiting for one if all of them are busy.
+        """
+        with self._lock:
+            create = self._idle.empty() and self._created < self.size
+            if create:
+                self._created += 1
+        if not create:
+            return self._idle.get()
+        try:
+            return self.set_up()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def release(self, session: Any, thread: Dict):
+        """
+        Gives a session back to the pool.
+
+        :param session: The session.
+        :param thread: Its conversation thread, as updated by the analysis.
+        """
+        self._idle.put((session, thread))
+
+    def discard(self, session: Any):
+        """
+        Closes a session that failed, so that the pool creates a new one instead.
+
+        :param session: The session.
+        """
+        with self._lock:
+            self._created -= 1
+        try:
+            self.tear_down(session)
+        except Exception as exception:  # pylint: disable=broad-exception-caught
+            print(f"Error tearing down analysis session: {str(exception)}")
+
+    def close(self):
+        """Closes the idle sessions."""
+        while not self._idle.empty():
+            session, _ = self._idle.get_nowait()
+            with self._lock:
+                self._created -= 1
+            self.tear_down(session)
+
+
+class AnalysisProgress:
+    """
+    Counts the analysed entries and reports the throughput.
+    """
+
+    def __init__(self, interval_seconds: float = PROGRESS_INTERVAL_SECONDS):
+        """
+        :param interval_seconds: Minimum number of seconds between two reports.
+        """
+        self.interval_seconds = interval_seconds
+        self.started_at = time.monotonic()
+        self.reported_at = self.started_at
+        self.submitted = 0
+        self.completed = 0
+        self.errors = 0
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        :return: A dictionary with the number of entries submitted, completed and failed, and the throughput.
+        """
+        elapsed_seconds = max(time.monotonic() - self.started_at, 1e-9)
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "errors": self.errors,
+            "in_flight": self.submitted - self.completed,
+            "elapsed_seconds": round(elapsed_seconds, 1),
+            "entries_per_minute": round(self.completed * 60.0 / elapsed_seconds, 1),
+        }
+
+    def report(self, force: bool = False):
+        """
+        Prints the progress, at most once per interval unless forced.
+
+        :param force: True to print regardless of the interval.
+        """
+        now = time.monotonic()
+        if force or now - self.reported_at >= self.interval_seconds:
+            self.reported_at = now
+            print(f"Log analysis progress: {self.get_metrics()}")
+
+
+def analyze_on_session(
+    analysis_input: str, log_analyzer: Callable[[Any, Dict, str], Tuple[str, Dict]], pool: AnalysisSessionPool
+) -> str:
+    """
+    Analyses an input on a session of the pool.
+
+    :param analysis_input: The input sent to the analysis agent.
+    :param log_analyzer: Function analysing an input, given a session and its thread,
+                         returning the analysis and the updated thread.
+    :param pool: The pool of analysis sessions.
+    :return: The analysis, or an "Error: ..." string if it failed.
+    """
+    session = None
+    try:
+        session, thread = pool.acquire()
+        analysis, thread = log_analyzer(session, thread, analysis_input)
+    except Exception as exception:  # pylint: disable=broad-exception-caught
+        # The session may be in a bad state, so it is replaced rather than reused.
+        # A session that could not be set up is not in the pool, and only this input fails.
+        if session is not None:
+            pool.discard(session)
+        return f"Error: {str(exception)}"
+    pool.release(session, thread)
+    return analysis
+
+
+def analyze_in_order(
+    items: Iterable[Tuple[Any, Any]],
+    analyze: Callable[[Any], Any],
+    max_concurrency: int,
+    progress: AnalysisProgress = None,
+) -> Iterator[Tuple[Any, Any]]:
+    """
+    Analyses items on up to max_concurrency threads at the same time.
+
+    Results are yielded in the order of the items, whatever the order in which the analyses complete.
+    At most twice max_concurrency items are read ahead, so that memory stays bounded on large directories.
+
+    :param items: The (key, analysis_input) tuples to analyse.
+    :param analyze: Function analysing an input.
+    :param max_concurrency: Maximum number of analyses running at the same time.
+    :param progress: Progress to update and report, if any.
+    :return: A generator of (key, analysis) tuples.
+    """
+    progress = progress or AnalysisProgress()
+    pending: Deque[Tuple[Any, Future]] = deque()
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="log-analysis") as executor:
+        for key, analysis_input in items:
+            pending.append((key, executor.submit(analyze, analysis_input)))
+            progress.submitted += 1
+            # Results are handed out in order, so waiting for the oldest one bounds the read-ahead
+            while len(pending) >= 2 * max_concurrency:
+                yield _complete(pending.popleft(), progress)
+        while pending:
+            yield _complete(pending.popleft(), progress)
+    progress.report(force=True)
+
+
+# pylint: disable=too-many-arguments,too-many-positional-arguments
+def analyze_entries_in_parallel(
+    entries: Iterable[Tuple[str, str]],
+    log_analyzer: Callable[[Any, Dict, str], Tuple[str, Dict]],
+    pool: AnalysisSessionPool,
+    max_concurrency: int,
+    checkpoint_store: AnalysisCheckpointStore = None,
+    progress: AnalysisProgress = None,
+) -> Iterator[Tuple[str, str]]:
+    """
+    Analyses log entries on up to max_concurrency sessions at the same time.
+
+    Results are yielded in the order of the entries, whatever the order in which the analyses complete.
+    At most twice max_concurrency entries are read ahead, so that memory stays bounded on large directories.
+
+    :param entries: The (log_file, analysis_input) tuples to analyse.
+    :param log_analyzer: Function analysing an input, given a session and its thread,
+                         returning the analysis and the updated thread.
+    :param pool: The pool of analysis sessions, of at least max_concurrency sessions.
+    :param max_concurrency: Maximum number of analyses running at the same time.
+    :param checkpoint_store: Store of the analyses of previous runs to reuse, if any.
+    :param progress: Progress to update and report, if any.
+    :return: A generator of (log_file, analysis) tuples. Failed analyses are reported as "Error: ..." strings.
+    """
+
+    def analyze(analysis_input: str) -> str:
+        # Stored analyses are reused without taking a session
+        if checkpoint_store is not None:
+            return checkpoint_store.get_or_analyze(
+                analysis_input, lambda text: analyze_on_session(text, log_analyzer, pool)
+            )
+        return analyze_on_session(analysis_input, log_analyzer, pool)
+
+    return analyze_in_order(entries, analyze, max_concurrency, progress)
+
+
+def _complete(pending_item: Tuple[Any, Future], progress: AnalysisProgress) -> Tuple[Any, Any]:
+    key, future = pending_item
+    analysis = future.result()
+    progress.completed += 1
+    if analysis is not None and str(analysis).startswith("Error:"):
+        progress.errors += 1
+    progress.report()
+    return key, analysis
@@ -0,0 +1,286 @@
+"""
+Token usage analytics over the agent thinking logs, without any LLM call.
+
+Reads the token metadata that agents write after their answers, e.g. {"prompt_tokens": 250, "completion_tokens": 12,
+"total_tokens": 262}, into a columnar table, and reports the usage per network, agent, file and time bucket,
+with percentiles, so that cost and latency hotspots stand out.
+
+    python -m apps.log_analyzer.token_usage --csv token_usage.csv --json token_usage.json
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import re
+from array import array
+from datetime import datetime
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from apps.log_analyzer.log_stream_parser import AGENT_THINKING_LOGS_DIRECTORY
+from apps.log_analyzer.log_stream_parser import LogEntryStreamParser
+from apps.log_analyzer.log_stream_parser import is_json_metadata
+from apps.log_analyzer.log_stream_parser import read_chunks
+
+# Numeric fields of the token metadata. Only the token counts are always there.
+METRICS = ("prompt_tokens", "completion_tokens", "total_tokens", "total_cost", "time_taken_in_seconds")
+DIMENSIONS = ("network", "agent", "file", "time_bucket")
+PERCENTILES = (50, 90, 99)
+TIME_BUCKET_SECONDS = 3600
+# Sections are written as "[AGENT] @ 2025-06-01 14:03:27:" followed by their text, or as "[AGENT]:" by older writers
+SECTION_HEADER_PATTERN = re.compile(r"[ \t]*(?:@[ \t]*(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}))?[ \t]*:")
+UNDATED = "undated"
+
+
+def parse_section_header(section_text: str) -> Tuple[Optional[datetime], str]:
+    """
+    :param section_text: The raw text of a section, following its marker.
+    :return: The local time the section was written, if its header tells, and the text of the section after its header.
+    """
+    match = SECTION_HEADER_PATTERN.match(section_text)
+    if match is None:
+        return None, section_text
+    written_at = datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S") if match.group(1) else None
+    return written_at, section_text[match.end() :]
+
+
+def get_time_bucket(written_at: Optional[datetime], bucket_seconds: int) -> str:
+    """
+    :param written_at: The local time a section was written, if known.
+    :param bucket_seconds: Length of the time buckets.
+    :return: The start of the time bucket of the section, or "undated".
+    """
+    if written_at is None:
+        return UNDATED
+    timestamp = written_at.timestamp()
+    return datetime.fromtimestamp(timestamp - timestamp % bucket_seconds).isoformat(timespec="minutes")
+
+
+def parse_token_metadata(section_text: str) -> Optional[Dict[str, float]]:
+    """
+    :param section_text: The text of an [AGENT] section, after its header.
+    :return: The numeric metadata fields of the section, or None if the section is not token metadata.
+    """
+    text = section_text.strip()
+    if not text.startswith("{") or not is_json_metadata(text):
+        return None
+    data = json.loads(text)
+    return {
+        metric: float(data[metric])
+        for metric in METRICS
+        if isinstance(data.get(metric), (int, float)) and not isinstance(data.get(metric), bool)
+    }
+
+
+def get_agent_origin(log_file: str) -> Tuple[str, str]:
+    """
+    :param log_file: The name of a thinking log file, named after the origin of its agent,
+                     e.g. "hello_world.announcer.txt".
+    :return: The names of the network and of the agent.
+    """
+    stem = os.path.splitext(log_file)[0]
+    network, _, agent = stem.partition(".")
+    return network, agent or network
+
+
+def get_percentile(sorted_values: List[float], percentile: float) -> float:
+    """
+    :param sorted_values: Values sorted in ascending order.
+    :param percentile: The percentile, between 0 and 100.
+    :return: The percentile of the values, interpolated linearly between the closest ranks. NaN if there are none.
+    """
+    if not sorted_values:
+        return math.nan
+    rank = (len(sorted_values) - 1) * percentile / 100.0
+    lower = math.floor(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+
+class TokenUsageTable:
+    """
+    A columnar table of token metadata, one row per [AGENT] metadata section.
+
+    Metrics are stored in typed arrays of doubles, NaN for missing values, and dimensions as arrays of codes into
+    lists of labels, so that millions of rows take a few dozen bytes each.
+    """
+
+    def __init__(self):
+        self.metrics: Dict[str, array] = {metric: array("d") for metric in METRICS}
+        self.codes: Dict[str, array] = {dimension: array("I") for dimension in DIMENSIONS}
+        self.labels: Dict[str, List[str]] = {dimension: [] for dimension in DIMENSIONS}
+        self._label_codes: Dict[str, Dict[str, int]] = {dimension: {} for dimension in DIMENSIONS}
+
+    def __len__(self) -> int:
+        return len(self.metrics[METRICS[0]])
+
+    def add(self, dimensions: Dict[str, str], metadata: Dict[str, float]):
+        """
+        :param dimensions: The label of the row for each dimension.
+        :param metadata: The metric values of the row.
+        """
+        for dimension in DIMENSIONS:
+            label = dimensions[dimension]
+            label_codes = self._label_codes[dimension]
+            code = label_codes.get(label)
+            if code is None:
+                code = len(self.labels[dimension])
+                label_codes[label] = code
+                self.labels[dimension].append(label)
+            self.codes[dimension].append(code)
+        for metric in METRICS:
+            self.metrics[metric].append(metadata.get(metric, math.nan))
+
+    # pylint: disable=too-many-locals
+    def aggregate(self, dimension: str) -> List[Dict[str, Any]]:
+        """
+        :param dimension: One of DIMENSIONS.
+        :return: One dictionary per label of the dimension, with the number of rows and, for each metric,
+                its sum, mean, percentiles and maximum. Sorted by decreasing total tokens.
+        """
+        labels = self.labels[dimension]
+        groups: Dict[str, List[List[float]]] = {metric: [[] for _ in labels] for metric in METRICS}
+        counts = [0] * len(labels)
+        codes = self.codes[dimension]
+        for metric in METRICS:
+            values = self.metrics[metric]
+            metric_groups = groups[metric]
+            for code, value in zip(codes, values):
+                if not math.isnan(value):
+                    metric_groups[code].append(value)
+        for code in codes:
+            counts[code] += 1
+
+        rows = []
+        for code, label in enumerate(labels):
+            row = {"dimension": dimension, "label": label, "rows": counts[code]}
+            for metric in METRICS:
+                values = sorted(groups[metric][code])
+                total = sum(values)
+                row[f"{metric}_sum"] = round(total, 6)
+                row[f"{metric}_mean"] = round(total / len(values), 6) if values else math.nan
+                for percentile in PERCENTILES:
+                    row[f"{metric}_p{percentile}"] = round(get_percentile(values, percentile), 6)
+                row[f"{metric}_max"] = values[-1] if values else math.nan
+            rows.append(row)
+        rows.sort(key=lambda row: row["total_tokens_sum"], reverse=True)
+        return rows
+
+
+def collect_token_usage(directory_path: str, bucket_seconds: int = TIME_BUCKET_SECONDS) -> TokenUsageTable:
+    """
+    :param directory_path: Path to the directory containing the log files.
+    :param bucket_seconds: Length of the time buckets. Sections are dated by the time written in their header.
+    :return: The table of the token metadata found in the log files.
+    """
+    table = TokenUsageTable()
+    for log_file in sorted(os.listdir(directory_path)):
+        file_path = os.path.join(directory_path, log_file)
+        if not os.path.isfile(file_path):
+            continue
+        try:
+            add_file_token_usage(table, file_path, bucket_seconds)
+        except (FileNotFoundError, UnicodeDecodeError, IOError) as e:
+            print(f"Error processing file {file_path}: {str(e)}")
+    return table
+
+
+def add_file_token_usage(table: TokenUsageTable, file_path: str, bucket_seconds: int):
+    """
+    :param table: The table to add the token metadata of the log file to.
+    :param file_path: Path of the log file.
+    :param bucket_seconds: Length of the time buckets.
+    """
+    log_file = os.path.basename(file_path)
+    network, agent = get_agent_origin(log_file)
+
+    def add_section(label: str, raw_text: str):
+        if label != "[AGENT]":
+            return
+        written_at, text = parse_section_header(raw_text)
+        metadata = parse_token_metadata(text)
+        if metadata is not None:
+            bucket = get_time_bucket(written_at, bucket_seconds)
+            table.add({"network": network, "agent": agent, "file": log_file, "time_bucket": bucket}, metadata)
+
+    # The sections are split by the same single pass as the conversation entries, which are not needed here
+    parser = LogEntryStreamParser(on_section=add_section)
+    with open(file_path, "r", encoding="utf-8") as f:
+        for chunk in read_chunks(f):
+            parser.feed(chunk)
+    parser.finish()
+
+
+def write_csv(rows: List[Dict[str, Any]], file_path: str):
+    """
+    :param rows: The aggregated rows of one or more dimensions.
+    :param file_path: Path of the CSV file to write.
+    """
+    with open(file_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ["dimension", "label", "rows"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_json(rows: List[Dict[str, Any]], file_path: str):
+    """
+    :param rows: The aggregated rows of one or more dimensions.
+    :param file_path: Path of the JSON file to write. NaN values are written as null.
+    """
+    cleaned = [
+        {key: None if isinstance(value, float) and math.isnan(value) else value for key, value in row.items()}
+        for row in rows
+    ]
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(cleaned, f, indent=2)
+
+
+def print_report(rows: List[Dict[str, Any]], dimension: str, top: int):
+    """
+    Print the heaviest labels of a dimension.
+    """
+    print(f"\nToken usage per {dimension}:")
+    print(f"{'label':40} {'rows':>8} {'total':>12} {'prompt p50':>11} {'prompt p99':>11} {'time p90 s':>11}")
+    for row in rows[:top]:
+        print(
+            f"{row['label'][:40]:40} {row['rows']:>8} {row['total_tokens_sum']:>12.0f} "
+            f"{row['prompt_tokens_p50']:>11.0f} {row['prompt_tokens_p99']:>11.0f} "
+            f"{row['time_taken_in_seconds_p90']:>11.2f}"
+        )
+
+
+def main():
+    """Parse the arguments, collect the token usage and report it."""
+    parser = argparse.ArgumentParser(description="Token usage analytics of the agent thinking logs.")
+    parser.add_argument("--directory", default=AGENT_THINKING_LOGS_DIRECTORY, help="Directory of the log files.")
+    parser.add_argument("--by", choices=DIMENSIONS, action="append", help="Dimensions to report. Default: all.")
+    parser.add_argument("--bucket-seconds", type=int, default=TIME_BUCKET_SECONDS, help="Length of time buckets.")
+    parser.add_argument("--top", type=int, default=20, help="Number of labels printed per dimension.")
+    parser.add_argument("--csv", help="Path of a CSV file to export the aggregates to.")
+    parser.add_argument("--json", help="Path of a JSON file to export the aggregates to.")
+    args = parser.parse_args()
+
+    table = collect_token_usage(args.directory, args.bucket_seconds)
+    print(f"Found {len(table)} token metadata sections in {args.directory}")
+
+    rows = []
+    for dimension in args.by or DIMENSIONS:
+        dimension_rows = table.aggregate(dimension)
+        print_report(dimension_rows, dimension, args.top)
+        rows.extend(dimension_rows)
+
+    if args.csv:
+        write_csv(rows, args.csv)
+        print(f"\nWrote {args.csv}")
+    if args.json:
+        write_json(rows, args.json)
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
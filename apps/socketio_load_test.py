@@ -0,0 +1,121 @@
+"""
+Measures how many concurrent clients a running demo app can serve, whatever its backend (Flask or ASGI).
+
+Each client connects to the "/chat" namespace, sends user inputs and times how long the app takes to answer.
+By default the answer is the "update_user_input" echo, which exercises the server without calling any LLM.
+Use --response-event update_speech to time full agent turns instead.
+
+Example, comparing both backends of the cruse app:
+
+    python -m apps.cruse.interface_flask            # port 5001
+    python -m apps.socketio_load_test --url http://localhost:5001 --clients 10,50,100,200
+
+    python -m apps.cruse.interface_asgi             # port 5001
+    python -m apps.socketio_load_test --url http://localhost:5001 --clients 10,50,100,200
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any
+from typing import Dict
+from typing import List
+
+# pylint: disable=import-error
+import socketio
+
+
+async def run_client(url: str, messages: int, response_event: str, timeout_seconds: float) -> Dict[str, Any]:
+    """
+    Connects one client, sends its user inputs one after the other and times the responses.
+
+    :param url: The url of the app.
+    :param messages: The number of user inputs to send.
+    :param response_event: The event that answers a user input.
+    :param timeout_seconds: The number of seconds after which a connection or a response is considered lost.
+    :return: A dictionary telling whether the client connected, with its response latencies in seconds
+            and its number of lost responses.
+    """
+    client = socketio.AsyncClient(reconnection=False)
+    responses = asyncio.Queue()
+    client.on(response_event, lambda *_: responses.put_nowait(time.perf_counter()), namespace="/chat")
+
+    result = {"connected": False, "latencies": [], "lost": 0}
+    try:
+        await client.connect(url, namespaces=["/chat"], wait_timeout=timeout_seconds)
+    except (socketio.exceptions.ConnectionError, asyncio.TimeoutError):
+        return result
+    result["connected"] = True
+
+    try:
+        for index in range(messages):
+            sent_at = time.perf_counter()
+            await client.emit("user_input", {"data": f"load test message {index}"}, namespace="/chat")
+            try:
+                received_at = await asyncio.wait_for(responses.get(), timeout=timeout_seconds)
+            except asyncio.TimeoutError:
+                result["lost"] += 1
+                continue
+            result["latencies"].append(received_at - sent_at)
+    finally:
+        await client.disconnect()
+    return result
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    :param values: Sorted values.
+    :param fraction: The percentile, between 0 and 1.
+    :return: The value at that percentile, using the nearest rank.
+    """
+    if not values:
+        return float("nan")
+    return values[min(int(fraction * len(values)), len(values) - 1)]
+
+
+async def run_step(url: str, clients: int, messages: int, response_event: str, timeout_seconds: float) -> Dict:
+    """
+    Runs a number of clients at the same time.
+
+    :return: A dictionary with the connection rate, the latency percentiles in milliseconds and the throughput.
+    """
+    started_at = time.perf_counter()
+    results = await asyncio.gather(
+        *(run_client(url, messages, response_event, timeout_seconds) for _ in range(clients))
+    )
+    elapsed_seconds = time.perf_counter() - started_at
+
+    latencies = sorted(latency for result in results for latency in result["latencies"])
+    return {
+        "clients": clients,
+        "connected": sum(1 for result in results if result["connected"]),
+        "responses": len(latencies),
+        "lost": sum(result["lost"] for result in results),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 1) if latencies else float("nan"),
+        "responses_per_second": round(len(latencies) / elapsed_seconds, 1),
+    }
+
+
+async def main():
+    """Parses the arguments and runs the load test, one step per number of clients."""
+    parser = argparse.ArgumentParser(description="Load test of the socketio demo apps.")
+    parser.add_argument("--url", default="http://localhost:5001", help="Url of the running app.")
+    parser.add_argument("--clients", default="10,50,100", help="Comma-separated numbers of concurrent clients.")
+    parser.add_argument("--messages", type=int, default=5, help="Number of user inputs sent by each client.")
+    parser.add_argument("--response-event", default="update_user_input", help="Event that answers a user input.")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for a connection or response.")
+    args = parser.parse_args()
+
+    print(f"Load testing {args.url}, waiting for '{args.response_event}' events")
+    header = ["clients", "connected", "responses", "lost", "p50_ms", "p95_ms", "mean_ms", "responses_per_second"]
+    print("\t".join(header))
+    for clients in (int(count) for count in args.clients.split(",")):
+        step = await run_step(args.url, clients, args.messages, args.response_event, args.timeout)
+        print("\t".join(str(step[column]) for column in header))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
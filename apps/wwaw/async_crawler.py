@@ -0,0 +1,321 @@
+import asyncio
+import time
+from typing import Dict
+from typing import List
+from typing import Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+from aiohttp import ClientError
+from aiohttp import ClientSession
+from aiohttp import ClientTimeout
+from aiohttp import TCPConnector
+from page_cache import CachedPage
+from page_cache import PageCache
+
+USER_AGENT = "wwaw-builder"
+MAX_CONCURRENCY = 16
+PER_HOST_CONCURRENCY = 4
+# Requests per second and burst allowed to each host by its token bucket
+REQUESTS_PER_SECOND = 4.0
+BURST = 4
+REQUEST_TIMEOUT_SECONDS = 10.0
+# Content types of the pages of a crawl, and of sitemaps (application/xml or text/xml)
+HTML_CONTENT_TYPE = "text/html"
+XML_CONTENT_TYPE = "xml"
+# Where sitemaps are, unless a robots.txt says otherwise
+SITEMAP_PATH = "/sitemap.xml"
+
+
+class FetchedPage:
+    """
+    A downloaded HTML page, exposing the same text and headers attributes as a requests response.
+    """
+
+    def __init__(self, url: str, status: int, headers: Dict[str, str], text: str):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.text = text
+
+
+class TokenBucket:
+    """
+    Spaces out requests to a host: each request takes a token, and tokens are refilled at a constant rate,
+    up to a burst capacity.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        """
+        Args:
+            rate (float): Tokens refilled per second. 0 or less for no limit.
+            capacity (int): Maximum number of tokens, i.e. of requests allowed back to back.
+        """
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def slow_down(self, delay_seconds: float):
+        """
+        Args:
+            delay_seconds (float): Minimum delay between requests asked for by the host,
+                                   e.g. a robots.txt Crawl-delay.
+        """
+        if delay_seconds > 0 and (self.rate <= 0 or 1.0 / self.rate < delay_seconds):
+            self.rate = 1.0 / delay_seconds
+            self.capacity = 1
+            self.tokens = min(self.tokens, 1.0)
+
+    async def acquire(self):
+        """Waits until a token is available, and takes it."""
+        if self.rate <= 0:
+            return
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Nothing is awaited between the check and the decrement, so concurrent tasks cannot both take the token
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return
+            await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+
+class HostPoliteness:
+    """
+    The limits applied to the requests sent to one host.
+    """
+
+    def __init__(self, concurrency: int, rate: float, burst: int):
+        """
+        Args:
+            concurrency (int): Maximum number of requests in flight to the host.
+            rate (float): Requests per second allowed to the host.
+            burst (int): Requests allowed back to back.
+        """
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.bucket = TokenBucket(rate, burst)
+        self.robots: Optional[asyncio.Task] = None
+
+
+class AsyncPageFetcher:
+    """
+    Downloads HTML pages concurrently over a pool of keep-alive connections, politely:
+    the requests to each host are limited in number and rate, and its robots.txt is fetched once and obeyed.
+
+        async with AsyncPageFetcher() as fetcher:
+            page = await fetcher.fetch(url)
+    """
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        user_agent: str = USER_AGENT,
+        max_concurrency: int = MAX_CONCURRENCY,
+        per_host_concurrency: int = PER_HOST_CONCURRENCY,
+        requests_per_second: float = REQUESTS_PER_SECOND,
+        burst: int = BURST,
+        timeout_seconds: float = REQUEST_TIMEOUT_SECONDS,
+        respect_robots: bool = True,
+        cache: Optional[PageCache] = None,
+        offline: bool = False,
+        cache_max_age_seconds: Optional[float] = None,
+    ):
+        """
+        Args:
+            user_agent (str): The User-Agent sent, and looked up in robots.txt files.
+            max_concurrency (int): Maximum number of requests in flight, i.e. size of the connection pool.
+            per_host_concurrency (int): Maximum number of requests in flight to the same host.
+            requests_per_second (float): Requests per second allowed to each host. 0 for no limit.
+            burst (int): Requests allowed back to back to each host.
+            timeout_seconds (float): Timeout of each request.
+            respect_robots (bool): False to ignore robots.txt files.
+            cache (PageCache, optional): Cache of the pages of previous crawls, if any. Cached pages are
+                                         revalidated with conditional requests, and only downloaded again if they
+                                         changed.
+            offline (bool): True to only read pages from the cache, without any request.
+            cache_max_age_seconds (float, optional): Age under which cached pages are used without revalidation.
+                                                     None to always revalidate them.
+        """
+        self.user_agent = user_agent
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.timeout_seconds = timeout_seconds
+        self.respect_robots = respect_robots
+        self.cache = cache
+        self.offline = offline
+        self.cache_max_age_seconds = cache_max_age_seconds
+        self.hosts: Dict[str, HostPoliteness] = {}
+        self.session: Optional[ClientSession] = None
+        self.started = time.monotonic()
+        self.metrics = {
+            "requests": 0,
+            "pages": 0,
+            "bytes": 0,
+            "robots_disallowed": 0,
+            "skipped": 0,
+            "errors": 0,
+            "cache_hits": 0,
+            "cache_revalidated": 0,
+            "cache_misses": 0,
+        }
+
+    async def __aenter__(self):
+        self.started = time.monotonic()
+        if self.offline:
+            return self
+        connector = TCPConnector(
+            limit=self.max_concurrency, limit_per_host=self.per_host_concurrency, ttl_dns_cache=300
+        )
+        self.session = ClientSession(
+            connector=connector,
+            timeout=ClientTimeout(total=self.timeout_seconds),
+            headers={"User-Agent": self.user_agent},
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        for politeness in self.hosts.values():
+            if politeness.robots is not None and not politeness.robots.done():
+                politeness.robots.cancel()
+        if self.session is not None:
+            await self.session.close()
+
+    def _get_host(self, url: str) -> HostPoliteness:
+        host = urlparse(url).netloc.lower()
+        politeness = self.hosts.get(host)
+        if politeness is None:
+            politeness = HostPoliteness(self.per_host_concurrency, self.requests_per_second, self.burst)
+            self.hosts[host] = politeness
+        return politeness
+
+    async def _get_robots(self, url: str, politeness: HostPoliteness) -> RobotFileParser:
+        # The first request to a host fetches its robots.txt, the others wait for it
+        if politeness.robots is None:
+            politeness.robots = asyncio.ensure_future(self._fetch_robots(url, politeness))
+        # Shielded, so that cancelling a request does not cancel the fetch the other requests wait for
+        return await asyncio.shield(politeness.robots)
+
+    async def _fetch_robots(self, url: str, politeness: HostPoliteness) -> RobotFileParser:
+        parsed = urlparse(url)
+        robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+        robots = RobotFileParser(robots_url)
+        try:
+            async with politeness.semaphore:
+                await politeness.bucket.acquire()
+                self.metrics["requests"] += 1
+                async with self.session.get(robots_url) as response:
+                    # Same rules as RobotFileParser.read()
+                    if response.status in (401, 403):
+                        robots.disallow_all = True
+                    elif response.status >= 400:
+                        robots.allow_all = True
+                    else:
+                        robots.parse((await response.text(errors="replace")).splitlines())
+        except (ClientError, asyncio.TimeoutError) as e:
+            print(f"Could not read {robots_url}, crawling {parsed.netloc} without it: {str(e)}")
+            robots.allow_all = True
+        crawl_delay = robots.crawl_delay(self.user_agent)
+        if crawl_delay:
+            politeness.bucket.slow_down(float(crawl_delay))
+        return robots
+
+    async def get_sitemap_urls(self, url: str) -> List[str]:
+        """
+        Args:
+            url (str): A URL of the host.
+
+        Returns:
+            list: The URLs of the sitemaps of the host listed in its robots.txt, or else its default sitemap URL.
+        """
+        parsed = urlparse(url)
+        default_urls = [f"{parsed.scheme}://{parsed.netloc}{SITEMAP_PATH}"]
+        if self.offline:
+            return default_urls
+        robots = await self._get_robots(url, self._get_host(url))
+        return robots.site_maps() or default_urls
+
+    async def fetch(self, url: str, content_type: str = HTML_CONTENT_TYPE) -> Optional[FetchedPage]:
+        """
+        Args:
+            url (str): The URL of the page.
+            content_type (str): Part of the Content-Type expected, e.g. XML_CONTENT_TYPE for sitemaps.
+
+        Returns:
+            FetchedPage: The page, or None if it is disallowed by robots.txt, is not of the expected content type
+                         or could not be downloaded.
+        """
+        cached = self.cache.get(url) if self.cache is not None else None
+        if self.offline or (
+            cached is not None
+            and self.cache_max_age_seconds is not None
+            and time.time() - cached.fetched_at < self.cache_max_age_seconds
+        ):
+            if cached is None:
+                self.metrics["cache_misses"] += 1
+                return None
+            self.metrics["cache_hits"] += 1
+            return self._get_cached_page(cached)
+
+        politeness = self._get_host(url)
+        try:
+            if self.respect_robots:
+                robots = await self._get_robots(url, politeness)
+                if not robots.can_fetch(self.user_agent, url):
+                    self.metrics["robots_disallowed"] += 1
+                    return None
+            headers = cached.get_conditional_headers() if cached is not None else None
+            async with politeness.semaphore:
+                await politeness.bucket.acquire()
+                self.metrics["requests"] += 1
+                async with self.session.get(url, headers=headers) as response:
+                    if response.status == 304 and cached is not None:
+                        # Not modified: the cached page is still the current one
+                        self.metrics["cache_revalidated"] += 1
+                        self.cache.touch(cached)
+                        return self._get_cached_page(cached)
+                    # Skip unexpected content types before downloading the body
+                    response_type = response.headers.get("Content-Type", "")
+                    if response.status >= 400 or content_type not in response_type:
+                        self.metrics["skipped"] += 1
+                        return None
+                    text = await response.text(errors="replace")
+        except (ClientError, asyncio.TimeoutError, ValueError) as e:
+            self.metrics["errors"] += 1
+            print(f"Skipping {url} due to error: {str(e) or type(e).__name__}")
+            return None
+        if self.cache is not None:
+            self.metrics["cache_misses"] += 1
+            self.cache.put(
+                url,
+                response.status,
+                response_type,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+                text,
+            )
+        self.metrics["pages"] += 1
+        self.metrics["bytes"] += len(text)
+        return FetchedPage(str(response.url), response.status, dict(response.headers), text)
+
+    def _get_cached_page(self, cached: CachedPage) -> FetchedPage:
+        self.metrics["pages"] += 1
+        return FetchedPage(cached.url, cached.status, {"Content-Type": cached.content_type}, cached.text)
+
+    def get_metrics(self) -> Dict[str, float]:
+        """
+        Returns:
+            dict: A dictionary with the numbers of requests, pages, bytes, pages disallowed by robots.txt,
+                  pages skipped, errors and cache hits, revalidations and misses, along with the elapsed time
+                  and the pages fetched per second.
+        """
+        elapsed = time.monotonic() - self.started
+        return {
+            **self.metrics,
+            "hosts": len(self.hosts),
+            "elapsed_seconds": round(elapsed, 2),
+            "pages_per_second": round(self.metrics["pages"] / elapsed, 2) if elapsed > 0 else 0.0,
+        }
@@ -0,0 +1,143 @@
+"""
+Measures the crawl bookkeeping cost per discovered link as the number of discovered URLs grows, for the former list
+frontier, and for the CrawlFrontier with a set or a Bloom filter. No page is downloaded.
+
+    python benchmark_crawl_frontier.py --urls 100000
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from crawl_frontier import CrawlFrontier
+
+CHECKPOINTS = (1000, 10000, 30000, 100000, 300000, 1000000)
+
+
+def generate_pages(total_urls, links_per_page, seed=0):
+    """
+    Generates the links of the crawled pages: mostly links to already discovered pages, as site navigation does,
+    and some new ones, until total_urls URLs are discovered.
+
+    Args:
+        total_urls (int): Number of distinct URLs to discover
+        links_per_page (int): Number of links per page
+
+    Returns:
+        list: The (number of URLs discovered so far, links) tuple of each page, in crawl order
+    """
+    rng = random.Random(seed)
+    discovered = 1
+    pages = []
+    while discovered < total_urls:
+        links = []
+        for _ in range(links_per_page):
+            if discovered < total_urls and rng.random() < 0.3:
+                index = discovered
+                discovered += 1
+            else:
+                index = rng.randrange(discovered)
+            links.append(f"https://example.com/section/{index % 97}/page-{index}")
+        pages.append((discovered, links))
+    return pages
+
+
+def run_legacy(pages, max_urls):
+    """
+    The former bookkeeping: a list popped from the front, scanned for every link.
+
+    Returns:
+        list: (discovered URLs, microseconds per link) measured at each checkpoint
+    """
+    visited = set()
+    to_visit = [("https://example.com/section/0/page-0", None)]
+    measures = []
+    links = 0
+    started = time.perf_counter()
+    checkpoints = [checkpoint for checkpoint in CHECKPOINTS if checkpoint <= max_urls]
+    for discovered, page_links in pages:
+        if not checkpoints:
+            break
+        if to_visit:
+            url, _ = to_visit.pop(0)
+            visited.add(url)
+        for full_link in page_links:
+            if full_link not in visited:
+                if not any(full_link == queued_url for queued_url, _ in to_visit):
+                    to_visit.append((full_link, "parent"))
+        links += len(page_links)
+        if checkpoints and discovered >= checkpoints[0]:
+            elapsed = time.perf_counter() - started
+            measures.append((checkpoints.pop(0), elapsed / links * 1e6))
+            links = 0
+            started = time.perf_counter()
+    return measures
+
+
+def run_frontier(pages, frontier):
+    """
+    The CrawlFrontier bookkeeping.
+
+    Returns:
+        list: (discovered URLs, microseconds per link) measured at each checkpoint
+    """
+    frontier.add("https://example.com/section/0/page-0", None)
+    measures = []
+    links = 0
+    started = time.perf_counter()
+    checkpoints = list(CHECKPOINTS)
+    for discovered, page_links in pages:
+        if frontier:
+            frontier.pop()
+        for full_link in page_links:
+            frontier.add(full_link, "parent")
+        links += len(page_links)
+        if checkpoints and discovered >= checkpoints[0]:
+            elapsed = time.perf_counter() - started
+            measures.append((checkpoints.pop(0), elapsed / links * 1e6))
+            links = 0
+            started = time.perf_counter()
+    return measures
+
+
+def main():
+    """Generate the pages, run the three bookkeepings and print the cost per link."""
+    parser = argparse.ArgumentParser(description="Benchmark the wwaw crawl frontier.")
+    parser.add_argument("--urls", type=int, default=100000, help="Number of distinct URLs discovered.")
+    parser.add_argument("--links_per_page", type=int, default=40, help="Number of links per page.")
+    parser.add_argument(
+        "--legacy_urls", type=int, default=30000, help="Stop the quadratic list frontier after this many URLs."
+    )
+    args = parser.parse_args()
+
+    pages = generate_pages(args.urls, args.links_per_page)
+    print(f"{len(pages)} pages, {len(pages) * args.links_per_page} links, {args.urls} distinct URLs")
+
+    results = {
+        "list": dict(run_legacy(pages, min(args.legacy_urls, args.urls))),
+        "set": dict(run_frontier(pages, CrawlFrontier())),
+    }
+    bloom_frontier = CrawlFrontier(bloom_capacity=args.urls)
+    results["bloom"] = dict(run_frontier(pages, bloom_frontier))
+
+    print(f"\n{'discovered URLs':>16} {'list us/link':>13} {'set us/link':>12} {'bloom us/link':>14}")
+    for checkpoint in CHECKPOINTS:
+        if checkpoint > args.urls:
+            break
+        cells = [f"{measures[checkpoint]:.2f}" if checkpoint in measures else "-" for measures in results.values()]
+        print(f"{checkpoint:>16} {cells[0]:>13} {cells[1]:>12} {cells[2]:>14}")
+
+    set_frontier = CrawlFrontier()
+    for _, page_links in pages:
+        for full_link in page_links:
+            set_frontier.add(full_link, None)
+    set_bytes = sys.getsizeof(set_frontier.seen) + sum(sys.getsizeof(url) for url in set_frontier.seen)
+    print(
+        f"\nSeen URLs memory: set {set_bytes / 1e6:.1f} MB, "
+        f"bloom filter {len(bloom_frontier.seen.bits) / 1e6:.2f} MB"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Measures the parse time per page of the former extraction, which parsed each page three times with html.parser,
+against the parse-once extraction of html_extraction.py, with html.parser and with lxml.
+Pages come from the page cache of previous crawls if there is one, otherwise a page is generated.
+
+    python benchmark_html_extraction.py --pages 200
+"""
+
+import argparse
+import os
+import time
+from re import sub
+
+from bs4 import BeautifulSoup
+from html_extraction import HTML_PARSER
+from html_extraction import LXML_PARSER
+from html_extraction import SCENE7_JUNK_REGEX
+from html_extraction import URL_REGEX
+from html_extraction import extract_page
+from page_cache import PAGE_CACHE_PATH
+from page_cache import PageCache
+
+
+def generate_page(sections):
+    """
+    Returns:
+        str: A page shaped like a corporate web page: navigation, scripts, images and paragraphs
+    """
+    navigation = "".join(f'<li><a href="/section/{index}">Section {index}</a></li>' for index in range(40))
+    body = "".join(
+        f"<div class='card'><h2>Heading {index}</h2><picture><source srcset='/img/{index}.webp'>"
+        f"<img src='/img/{index}.jpg' alt='image {index}'></picture>"
+        f"<p>Paragraph {index} about our services, see https://example.com/{index} for more. "
+        f"We help <b>clients</b> with <a href='/offer/{index}'>offer {index}</a>.</p>"
+        f"<script>window.dataLayer.push({{'card': {index}}});</script></div>"
+        for index in range(sections)
+    )
+    return (
+        f"<html><head><title>Example page</title><style>.card {{margin: 0}}</style></head>"
+        f"<body><nav><ul>{navigation}</ul></nav>{body}</body></html>"
+    )
+
+
+def extract_three_parses(html):
+    """
+    The former extraction: one parse for the text, one for the title and one for the links.
+
+    Returns:
+        tuple: The title, text and links of the page
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style", "noscript", "img", "source", "picture", "svg"]):
+        tag.decompose()
+    for tag in soup.find_all(True):
+        for attr in ["src", "srcset", "data-src", "data-srcset", "alt", "title"]:
+            if attr in tag.attrs:
+                del tag.attrs[attr]
+    paragraphs = soup.find_all(["p", "h1", "h2", "h3", "li"])
+    raw_text = " ".join(p.get_text(separator=" ", strip=True) for p in paragraphs)
+    text = sub(URL_REGEX, "", raw_text)
+    text = sub(SCENE7_JUNK_REGEX, "", text)
+    text = text.replace('"', "").replace("'", "").encode("ascii", errors="ignore").decode().strip()
+
+    soup = BeautifulSoup(html, "html.parser")
+    title = soup.title.string.strip() if soup.title and soup.title.string else ""
+
+    soup = BeautifulSoup(html, "html.parser")
+    links = [a["href"] for a in soup.find_all("a", href=True)]
+    return title, text, links
+
+
+def time_per_page(extract, pages):
+    """
+    Returns:
+        float: Mean milliseconds per page
+    """
+    started = time.perf_counter()
+    for html in pages:
+        extract(html)
+    return (time.perf_counter() - started) / len(pages) * 1000
+
+
+def main():
+    """Load or generate the pages, time each extraction and check they agree."""
+    parser = argparse.ArgumentParser(description="Benchmark the wwaw HTML extraction.")
+    parser.add_argument("--pages", type=int, default=200, help="Number of pages to extract.")
+    parser.add_argument("--cache_path", default=PAGE_CACHE_PATH, help="Page cache to read pages from, if it exists.")
+    args = parser.parse_args()
+
+    pages = []
+    if os.path.exists(args.cache_path):
+        cache = PageCache(args.cache_path)
+        pages = [page.text for page in cache.iterate_pages(args.pages)]
+        cache.close()
+        print(f"Read {len(pages)} pages from {args.cache_path}")
+    if not pages:
+        pages = [generate_page(30)] * args.pages
+        print(f"Generated {len(pages)} pages of {len(pages[0]) / 1000:.0f} kB")
+
+    mismatches = 0
+    for html in pages:
+        page = extract_page(html)
+        if extract_three_parses(html) != (page.title, page.text, page.links):
+            mismatches += 1
+    print(f"Pages extracted differently by the parse-once extraction: {mismatches}")
+
+    print(f"\n{'extraction':32} {'ms/page':>8}")
+    baseline = time_per_page(extract_three_parses, pages)
+    print(f"{'3 parses, html.parser':32} {baseline:>8.2f}")
+    for backend in (HTML_PARSER, LXML_PARSER):
+        per_page = time_per_page(lambda html, backend=backend: extract_page(html, backend), pages)
+        print(f"{'1 parse, ' + backend:32} {per_page:>8.2f}  ({baseline / per_page:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
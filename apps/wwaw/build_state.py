@@ -0,0 +1,87 @@
+import json
+import os
+from hashlib import md5
+from typing import Dict
+from typing import Optional
+
+# Where the state of the build of an agent network is kept between runs, for incremental builds
+BUILD_STATE_PATH_TEMPLATE = "wwaw_build_state_%s.json"
+
+
+def get_text_hash(text: str) -> str:
+    """
+    Args:
+        text (str): The text of a page.
+
+    Returns:
+        str: A hash of the text, to tell whether it changed between builds.
+    """
+    return md5(text.encode("utf-8")).hexdigest()
+
+
+# pylint: disable=too-few-public-methods
+class PageState:
+    """
+    What a build remembers of a page, to tell whether it changed since.
+    """
+
+    def __init__(self, agent_name: str, text_hash: str, lastmod: Optional[str] = None):
+        """
+        Args:
+            agent_name (str): The name of the agent representing the page.
+            text_hash (str): The hash of the text extracted from the page.
+            lastmod (str, optional): The ISO lastmod of the page in its sitemap, if any.
+        """
+        self.agent_name = agent_name
+        self.text_hash = text_hash
+        self.lastmod = lastmod
+
+
+class BuildState:
+    """
+    The agents of a built network, with the pages they represent.
+    """
+
+    def __init__(self, agents: dict, top_agent_name: Optional[str], pages: Dict[str, PageState]):
+        """
+        Args:
+            agents (dict): The agent hierarchy, as written to the HOCON file.
+            top_agent_name (str, optional): The name of the top agent.
+            pages (dict): The state of each page represented by an agent, keyed by URL.
+        """
+        self.agents = agents
+        self.top_agent_name = top_agent_name
+        self.pages = pages
+
+    def save(self, path: str):
+        """
+        Writes the state to a file, replacing the previous one only once it is complete.
+
+        Args:
+            path (str): The path of the file.
+        """
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "top_agent_name": self.top_agent_name,
+                    "pages": {url: vars(page) for url, page in self.pages.items()},
+                    "agents": self.agents,
+                },
+                f,
+            )
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BuildState":
+        """
+        Args:
+            path (str): The path of a file written by `save`.
+
+        Returns:
+            BuildState: The state read from the file.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        pages = {url: PageState(**page) for url, page in state["pages"].items()}
+        return cls(state["agents"], state["top_agent_name"], pages)
@@ -1,28 +1,62 @@
 from argparse import ArgumentParser
+from asyncio import FIRST_COMPLETED
+from asyncio import Task
+from asyncio import create_task
+from asyncio import gather
+from asyncio import run
+from asyncio import wait
+from copy import deepcopy
 from hashlib import md5
 from os import makedirs
+from os import replace
+from pathlib import Path
 from random import choices
-from random import uniform
 from re import sub
 from string import ascii_lowercase
 from string import digits
-from time import sleep
+from typing import Dict
 from typing import List
 from typing import Optional
 from typing import Tuple
 from urllib.parse import urljoin
 from urllib.parse import urlparse
 
-from bs4 import BeautifulSoup
+from async_crawler import MAX_CONCURRENCY
+from async_crawler import PER_HOST_CONCURRENCY
+from async_crawler import REQUESTS_PER_SECOND
+from async_crawler import AsyncPageFetcher
+from build_state import BUILD_STATE_PATH_TEMPLATE
+from build_state import BuildState
+from build_state import PageState
+from build_state import get_text_hash
+from content_hierarchy import build_similarity_hierarchy
+from content_hierarchy import get_routing_report
+from crawl_frontier import CrawlFrontier
+from crawl_frontier import is_valid_url
 from hocon_constants import HOCON_HEADER_REMAINDER
 from hocon_constants import HOCON_HEADER_START
 from hocon_constants import LEAF_NODE_AGENT_TEMPLATE
 from hocon_constants import REGULAR_AGENT_TEMPLATE
 from hocon_constants import TOP_AGENT_TEMPLATE
-from requests import RequestException
-from requests import get
+from html_extraction import HTML_PARSER
+from html_extraction import LXML_PARSER
+from html_extraction import ExtractedPage
+from html_extraction import extract_page
+from page_cache import PAGE_CACHE_PATH
+from page_cache import PageCache
+from page_summarizer import SummarizedPage
+from page_summarizer import get_summary_stats
+from page_summarizer import summarize
+from sitemap_crawl import crawl_sitemap_async
 from tldextract import extract
 
+from coded_tools.agent_network_hocon_writer import AgentNetworkHoconWriter
+
+# Writes the agents one at a time, in linear time, and escapes their names and instructions
+HOCON_WRITER = AgentNetworkHoconWriter(
+    HOCON_HEADER_START, HOCON_HEADER_REMAINDER, TOP_AGENT_TEMPLATE, REGULAR_AGENT_TEMPLATE, LEAF_NODE_AGENT_TEMPLATE
+)
+
 # Regex to replace all non-alphanumeric and non-hyphen characters with an empty string
 SAFE_AGENT_NAME_CHARS_REGEX = r"[^a-zA-Z0-9\-]"
 
@@ -32,12 +66,6 @@ AGENT_NAME_SANITIZE_REGEX = r"[^\w\s-]"
 # Regex to replace sequences of whitespace or underscores with a single hyphen
 AGENT_NAME_HYPHENATE_REGEX = r"[\s_]+"
 
-# Regex to remove URLs from extracted text
-URL_REGEX = r"https?://\S+"
-
-# Regex to remove scene7 junk or custom format @(...) from extracted text
-SCENE7_JUNK_REGEX = r"@\(.*?\)"
-
 
 class WebAgentNetworkBuilder:
     TOTAL_AGENTS = 40
@@ -64,6 +92,23 @@ class WebAgentNetworkBuilder:
     def __init__(self):
         self.agent_counter = 0
         self.politeness_delay = 0.0
+        self.max_concurrency = MAX_CONCURRENCY
+        self.per_host_concurrency = PER_HOST_CONCURRENCY
+        self.requests_per_second = REQUESTS_PER_SECOND
+        self.respect_robots = True
+        # Number of URLs expected, to remember the URLs seen in a Bloom filter rather than a set, for huge crawls
+        self.bloom_capacity = None
+        # Pages are cached between runs, so that rebuilding a network only revalidates them, or reads them offline
+        self.cache_path = PAGE_CACHE_PATH
+        self.offline = False
+        self.cache_max_age_seconds = None
+        self.html_parser = HTML_PARSER
+        self.parse_seconds: List[float] = []
+        # Token budget of the page text in the instructions of each agent, summarized to fit, if any
+        self.summary_tokens = None
+        self.summaries: List[SummarizedPage] = []
+        # The page of each agent, kept between builds so that incremental builds only update the changed ones
+        self.pages: Dict[str, PageState] = {}
         self.top_agent_name = None
 
     def create_intermediate_agents(self, parent: str, chunks: List[List[str]], new_agents: dict) -> List[str]:
@@ -164,6 +209,29 @@ class WebAgentNetworkBuilder:
                 updated_agents = self.enforce_max_fanout(agents, max_children)
         return updated_agents
 
+    def enforce_fanout_by_similarity(self, agents: dict, max_children: int = None) -> dict:
+        """
+        Enforces the maximum fan-out constraint by grouping agents with similar content, rather than in crawl order.
+
+        The pages become the leaves of a balanced tree under the top agent, whose intermediate agents are about the
+        terms shared by their sub-agents, so the tree is as shallow as the fan-out allows, whatever the link
+        structure of the site.
+
+        Args:
+            agents (dict): A dictionary representing the agent hierarchy.
+            max_children (int): Maximum number of allowed direct children per agent.
+
+        Returns:
+            dict: A new agent hierarchy with fan-out constraints enforced.
+        """
+        if max_children is None:
+            max_children = self.MAX_CHILDREN
+        if self.top_agent_name not in agents:
+            return self.enforce_fanout_recursive(agents, max_children)
+        return build_similarity_hierarchy(
+            agents, self.top_agent_name, max_children, self.AGENT_INSTRUCTION_PREFACE, self.MAX_NAME_LEN
+        )
+
     def add_agent(self, agents, agent_name: str, instructions: str, down_chains: list, top_agent: str = "false"):
         """
         Adds a new agent to the agent hierarchy with the specified attributes.
@@ -197,7 +265,7 @@ class WebAgentNetworkBuilder:
             print(f" {self.agent_counter}")
         return str(agents[agent_name])
 
-    def get_clean_agent_name(self, url, html, existing_names=None):
+    def get_clean_agent_name(self, url, html, existing_names=None, title=None):
         """
         Generates a clean, URL-based agent name derived from the HTML page title or URL path.
 
@@ -208,13 +276,15 @@ class WebAgentNetworkBuilder:
             url (str): The URL of the web page.
             html (str): The raw HTML content of the web page.
             existing_names (set, optional): A set of agent names already used. Ensures the result is unique.
+            title (str, optional): The title of the page, if already extracted from the HTML.
 
         Returns:
             str: A clean, unique agent name suitable for use as an identifier.
         """
         if existing_names is None:
             existing_names = set()
-        title = _extract_title_from_html(html)
+        if title is None:
+            title = _extract_title_from_html(html)
 
         # If no title is found, fall back to using the URL path or netloc for the agent name
         if not title:
@@ -270,23 +340,51 @@ class WebAgentNetworkBuilder:
         url: str,
         parent_name: Optional[str],
         resp,
-        visited: set,
         existing_names: set,
         agents: dict,
         count: int,
-        to_visit: List[Tuple[str, Optional[str]]],
+        to_visit: CrawlFrontier,
         base_domain: str,
     ) -> int:
-        text = clean_and_extract_text(resp.text)
-        if len(text) < self.MIN_PAGE_LEN:
+        page = self.add_page_agent(url, parent_name, resp, existing_names, agents)
+        if page is None:
             return count  # Skip light pages
 
-        name = self.get_clean_agent_name(url, resp.text, existing_names)
+        name = self.pages[url].agent_name
+        for href in page.links:
+            full_link = urljoin(url, href)
+            # The frontier skips the links already queued or crawled
+            if is_valid_url(full_link, base_domain):
+                to_visit.add(full_link, name)
+
+        return count + 1
+
+    def add_page_agent(
+        self, url: str, parent_name: Optional[str], resp, existing_names: set, agents: dict
+    ) -> Optional[ExtractedPage]:
+        """
+        Adds the agent of a page under the agent of its parent page, and records the page, without following
+        its links.
+
+        Args:
+            url (str): The URL of the page.
+            parent_name (str, optional): The agent of the parent page, or None for the top agent.
+            resp (FetchedPage): The page.
+            existing_names (set): The names of the agents, to which the name of the new agent is added.
+            agents (dict): The agent hierarchy, to which the new agent is added.
+
+        Returns:
+            ExtractedPage: The text, title and links of the page, or None if the page was too light to be an agent.
+        """
+        # The text, title and links all come from a single parse of the page
+        page = extract_page(resp.text, self.html_parser)
+        self.parse_seconds.append(page.parse_seconds)
+        if len(page.text) < self.MIN_PAGE_LEN:
+            return None
+
+        name = self.get_clean_agent_name(url, resp.text, existing_names, page.title)
         existing_names.add(name)
-        clean_text = (
-            text[: self.PAGE_LEN_MAX].replace('"', "").replace("'", "").encode("ascii", errors="ignore").decode()
-        )
-        instructions = f"{self.AGENT_INSTRUCTION_PREFACE}\n\n{clean_text}".replace('"""', "").replace('"', "")
+        instructions = self.get_instructions(page.text)
 
         if parent_name is None:
             is_top = "true"
@@ -298,16 +396,26 @@ class WebAgentNetworkBuilder:
         if parent_name and parent_name in agents and name != parent_name:
             agents[parent_name].get("down_chains", []).append(name)
 
-        visited.add(url)
+        self.pages[url] = PageState(name, get_text_hash(page.text))
+        return page
 
-        soup = BeautifulSoup(resp.text, "html.parser")
-        for a in soup.find_all("a", href=True):
-            full_link = urljoin(url, a["href"])
-            if is_valid_url(full_link, base_domain) and full_link not in visited:
-                if not any(full_link == queued_url for queued_url, _ in to_visit):
-                    to_visit.append((full_link, name))
+    def get_instructions(self, text: str) -> str:
+        """
+        Args:
+            text (str): The text of a page.
 
-        return count + 1
+        Returns:
+            str: The instructions of the agent of the page, made of its text, summarized to the token budget if
+                 any, within the length limit.
+        """
+        if self.summary_tokens:
+            summary = summarize(text, self.summary_tokens)
+            self.summaries.append(summary)
+            text = summary.text
+        clean_text = (
+            text[: self.PAGE_LEN_MAX].replace('"', "").replace("'", "").encode("ascii", errors="ignore").decode()
+        )
+        return f"{self.AGENT_INSTRUCTION_PREFACE}\n\n{clean_text}".replace('"""', "").replace('"', "")
 
     def crawl(self, start_url, max_agents):
         """
@@ -320,6 +428,8 @@ class WebAgentNetworkBuilder:
         revisiting URLs and ensures agent names are unique and well-formed. Pages that don’t meet content length
         requirements are excluded from the final network.
 
+        Pages are downloaded concurrently, see `crawl_async`.
+
         Args:
             start_url (str): The root URL to begin crawling from.
             max_agents (int): Maximum number of agents (pages) to generate.
@@ -328,9 +438,31 @@ class WebAgentNetworkBuilder:
             dict: A dictionary representing the agent hierarchy, where each key is an agent name and each value is
                   a dictionary with "instructions", "down_chains", and "top_agent" fields.
         """
+        return run(self.crawl_async(start_url, max_agents))
+
+    async def crawl_async(self, start_url, max_agents):
+        """
+        Asynchronous version of `crawl`.
+
+        Up to `max_concurrency` pages are downloaded at the same time over a shared connection pool, with at most
+        `per_host_concurrency` requests in flight and `requests_per_second` requests per second to each host.
+        The robots.txt of each host is fetched once and obeyed, unless `respect_robots` is False.
+        Pages are kept in the page cache at `cache_path`, if any, and revalidated with conditional requests on the
+        next crawls, or read from it without any request if `offline` is True.
+        Pages are processed one at a time as they arrive, and no more downloads are started than needed to reach
+        `max_agents`, so that the crawl stops as soon as the page budget is spent.
+
+        Args:
+            start_url (str): The root URL to begin crawling from.
+            max_agents (int): Maximum number of agents (pages) to generate.
+
+        Returns:
+            dict: The agent hierarchy, as returned by `crawl`.
+        """
         agents = {}
-        visited = set()
-        to_visit: List[Tuple[str, Optional[str]]] = [(start_url, None)]
+        to_visit = CrawlFrontier(self.bloom_capacity)
+        to_visit.add(start_url, None)
+        in_flight: Dict[Task, Tuple[str, Optional[str]]] = {}
         count = 0
         # Use tldextract to isolate the registered domain and suffix (e.g., 'example.com') from the URL.
         # This helps in determining whether a link is internal to the site, which is important for focused crawling.
@@ -338,32 +470,99 @@ class WebAgentNetworkBuilder:
         base_domain = f"{domain_info.domain}.{domain_info.suffix}"
         existing_names = set()
 
-        while to_visit and count < max_agents:
-            url, parent_name = to_visit.pop(0)
-            if url in visited:
-                continue
-            try:
-                resp = get(url, timeout=10)
-                # Skip non-HTML content types
-                if "text/html" not in resp.headers.get("Content-Type", ""):
-                    continue
-                count = self._process_page(
-                    url, parent_name, resp, visited, existing_names, agents, count, to_visit, base_domain
-                )
-            except (RequestException, ValueError, UnicodeDecodeError) as e:
-                print(f"Skipping {url} due to error: {str(e)}")
-                continue
-
-            if hasattr(self, "politeness_delay") and self.politeness_delay > 0:
-                sleep(uniform(self.politeness_delay * 0.75, self.politeness_delay * 1.25))
-
-        linked = set()
-        for agent in agents.values():
-            linked.update(agent["down_chains"])
+        fetcher = self.create_fetcher()
+        async with fetcher:
+            while (to_visit or in_flight) and count < max_agents:
+                # Light pages do not count, so the budget is only known to be spent once pages are processed
+                while to_visit and len(in_flight) < min(self.max_concurrency, max_agents - count):
+                    url, parent_name = to_visit.pop()
+                    in_flight[create_task(fetcher.fetch(url))] = (url, parent_name)
+                if not in_flight:
+                    break
 
+                done, _ = await wait(in_flight, return_when=FIRST_COMPLETED)
+                for task in done:
+                    url, parent_name = in_flight.pop(task)
+                    resp = task.result()
+                    if resp is None or count >= max_agents:
+                        continue
+                    try:
+                        count = self._process_page(
+                            url, parent_name, resp, existing_names, agents, count, to_visit, base_domain
+                        )
+                    except (ValueError, UnicodeDecodeError) as e:
+                        print(f"Skipping {url} due to error: {str(e)}")
+
+            # The budget is spent, so the downloads still in flight are not needed
+            for task in in_flight:
+                task.cancel()
+            await gather(*in_flight, return_exceptions=True)
         print(f"Generated {count} agents with real content.")
+        self.report_metrics(fetcher)
         return agents
 
+    def crawl_sitemap(self, start_url, max_agents, state: Optional[BuildState] = None):
+        """
+        Builds the agents from the pages listed in the sitemaps of the site, rather than by following links, or
+        updates the agents of a previous build.
+
+        Sitemaps are found in the robots.txt of the site, or else at /sitemap.xml. Each page becomes an agent under
+        the agent of the closest page up its path. With the state of a previous build, only the pages that changed
+        are fetched: the pages whose sitemap lastmod is not more recent than at the previous build are skipped,
+        and the other known pages are revalidated, their agents updated if their text changed.
+
+        Args:
+            start_url (str): The root URL of the site, which is the top agent.
+            max_agents (int): Maximum number of agents (pages) to generate, including the ones of the previous build.
+            state (BuildState, optional): The state of a previous build, to update incrementally.
+
+        Returns:
+            dict: The agent hierarchy, as returned by `crawl`.
+        """
+        return run(crawl_sitemap_async(self, start_url, max_agents, state))
+
+    def create_fetcher(self) -> AsyncPageFetcher:
+        """
+        Returns:
+            AsyncPageFetcher: A fetcher with the concurrency, politeness and page cache settings of the builder.
+        """
+        # A politeness delay between requests is a rate limit of one request per delay
+        requests_per_second = self.requests_per_second
+        if self.politeness_delay > 0:
+            requests_per_second = 1.0 / self.politeness_delay
+
+        fetcher = AsyncPageFetcher(
+            max_concurrency=self.max_concurrency,
+            per_host_concurrency=self.per_host_concurrency,
+            requests_per_second=requests_per_second,
+            burst=1 if self.politeness_delay > 0 else self.per_host_concurrency,
+            respect_robots=self.respect_robots,
+            cache=PageCache(self.cache_path) if self.cache_path else None,
+            offline=self.offline,
+            cache_max_age_seconds=self.cache_max_age_seconds,
+        )
+        if self.offline and fetcher.cache is None:
+            raise ValueError("Offline crawls read pages from the page cache, which is disabled.")
+        return fetcher
+
+    def report_metrics(self, fetcher: AsyncPageFetcher):
+        """
+        Closes the page cache of a fetcher, and prints the metrics of the crawl, page parsing and summaries.
+
+        Args:
+            fetcher (AsyncPageFetcher): The fetcher of the crawl.
+        """
+        if fetcher.cache is not None:
+            fetcher.cache.close()
+        print(f"Crawl metrics: {fetcher.get_metrics()}")
+        if self.parse_seconds:
+            print(
+                f"Parsed {len(self.parse_seconds)} pages with {self.html_parser} in {sum(self.parse_seconds):.2f}s, "
+                f"{sum(self.parse_seconds) / len(self.parse_seconds) * 1000:.1f} ms per page"
+            )
+        if self.summaries:
+            print(f"Summary metrics: {get_summary_stats(self.summaries)}")
+
     @classmethod
     def main(cls):
         parser = ArgumentParser(description="Generate a hierarchy of web agents.")
@@ -412,6 +611,87 @@ class WebAgentNetworkBuilder:
             default=0.0,
             help="Average delay (in seconds) between page requests to be polite to servers (default: 0.0)",
         )
+        parser.add_argument(
+            "--max_concurrency",
+            type=int,
+            default=MAX_CONCURRENCY,
+            help=f"Maximum number of pages downloaded at the same time (default: {MAX_CONCURRENCY})",
+        )
+        parser.add_argument(
+            "--per_host_concurrency",
+            type=int,
+            default=PER_HOST_CONCURRENCY,
+            help=f"Maximum number of pages downloaded at the same time from a host (default: {PER_HOST_CONCURRENCY})",
+        )
+        parser.add_argument(
+            "--requests_per_second",
+            type=float,
+            default=REQUESTS_PER_SECOND,
+            help=f"Maximum number of requests per second to a host (default: {REQUESTS_PER_SECOND})",
+        )
+        parser.add_argument(
+            "--ignore_robots",
+            action="store_true",
+            help="Do not fetch and obey the robots.txt of the crawled hosts",
+        )
+        parser.add_argument(
+            "--bloom_capacity",
+            type=int,
+            default=None,
+            help="Number of URLs expected, to remember seen URLs in a Bloom filter for huge crawls (default: a set)",
+        )
+        parser.add_argument(
+            "--cache_path",
+            type=str,
+            default=PAGE_CACHE_PATH,
+            help=f"Path of the page cache kept between runs (default: {PAGE_CACHE_PATH})",
+        )
+        parser.add_argument("--no_cache", action="store_true", help="Do not read nor write the page cache")
+        parser.add_argument(
+            "--html_parser",
+            choices=[HTML_PARSER, LXML_PARSER],
+            default=HTML_PARSER,
+            help=f"Parser of the pages, {LXML_PARSER} is faster but must be installed (default: {HTML_PARSER})",
+        )
+        parser.add_argument(
+            "--offline",
+            action="store_true",
+            help="Build the network from the page cache only, without any request",
+        )
+        parser.add_argument(
+            "--cache_max_age",
+            type=float,
+            default=None,
+            help="Age in seconds under which cached pages are used without revalidation (default: always revalidate)",
+        )
+        parser.add_argument(
+            "--summary_tokens",
+            type=int,
+            default=None,
+            help="Summarize the text of each page to about this many tokens, without any LLM (default: no summary)",
+        )
+        parser.add_argument(
+            "--sitemap",
+            action="store_true",
+            help="Find the pages in the sitemaps of the site rather than by following links",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Update the network of the previous build with the pages changed since, according to the sitemaps",
+        )
+        parser.add_argument(
+            "--state_path",
+            type=str,
+            default=None,
+            help=f"Path of the build state kept for incremental builds (default: {BUILD_STATE_PATH_TEMPLATE})",
+        )
+        parser.add_argument(
+            "--hierarchy",
+            choices=["links", "similarity"],
+            default="links",
+            help="Group agents under their linking page, or by content similarity in a balanced tree (default: links)",
+        )
 
         args = parser.parse_args()
 
@@ -427,8 +707,31 @@ class WebAgentNetworkBuilder:
 
         builder = cls()
         builder.politeness_delay = args.politeness_delay
-        the_agents = builder.crawl(the_start_url, the_total_agents)
-        the_agents = builder.enforce_fanout_recursive(the_agents, max_children=cls.MAX_CHILDREN)
+        builder.max_concurrency = args.max_concurrency
+        builder.per_host_concurrency = args.per_host_concurrency
+        builder.requests_per_second = args.requests_per_second
+        builder.respect_robots = not args.ignore_robots
+        builder.bloom_capacity = args.bloom_capacity
+        builder.cache_path = None if args.no_cache else args.cache_path
+        builder.offline = args.offline
+        builder.cache_max_age_seconds = args.cache_max_age
+        builder.html_parser = args.html_parser
+        builder.summary_tokens = args.summary_tokens
+        the_state_path = args.state_path or BUILD_STATE_PATH_TEMPLATE % the_agent_network_name
+        if args.incremental:
+            # The hierarchy of the previous build is kept, with its agents updated and the new ones added to it
+            the_agents = builder.crawl_sitemap(the_start_url, the_total_agents, BuildState.load(the_state_path))
+        elif args.sitemap:
+            the_agents = builder.crawl_sitemap(the_start_url, the_total_agents)
+        else:
+            the_agents = builder.crawl(the_start_url, the_total_agents)
+        if args.hierarchy == "similarity" and not args.incremental and builder.top_agent_name in the_agents:
+            # The links hierarchy, for comparison; it changes the agents it is given
+            the_links_agents = builder.enforce_fanout_recursive(deepcopy(the_agents), max_children=cls.MAX_CHILDREN)
+            print(f"Routing with the links hierarchy: {get_routing_report(the_links_agents, builder.top_agent_name)}")
+            the_agents = builder.enforce_fanout_by_similarity(the_agents, max_children=cls.MAX_CHILDREN)
+        else:
+            the_agents = builder.enforce_fanout_recursive(the_agents, max_children=cls.MAX_CHILDREN)
         the_linked = set()
         for an_agnt in the_agents.values():
             the_linked.update(an_agnt.get("down_chains", []))
@@ -460,43 +763,31 @@ class WebAgentNetworkBuilder:
         for name, data in the_agents.items():
             data["down_chains"] = [child for child in data.get("down_chains", []) if child != name]
 
-        # now generate HOCON
-        hocon = get_agent_network_hocon(the_agents, the_agent_network_name)
-
-        # Write the agent network file
-        from pathlib import Path
+        if builder.top_agent_name in the_agents:
+            the_report = get_routing_report(the_agents, builder.top_agent_name)
+            print(f"Routing with the {args.hierarchy} hierarchy: {the_report}")
 
+        # Write the agent network file, one agent at a time
         file_path = Path(cls.OUTPUT_PATH) / f"{the_agent_network_name}.hocon"
         # Ensure the directory exists
         makedirs(file_path.parent, exist_ok=True)
-        with file_path.open("w", encoding="utf-8") as file:
-            file.write(hocon)
+        # The previous file is only replaced once the new one is complete
+        temporary_path = file_path.with_name(f"{file_path.name}.tmp")
+        with temporary_path.open("w", encoding="utf-8") as file:
+            write_agent_network_hocon(the_agents, the_agent_network_name, file)
+        replace(temporary_path, file_path)
+        BuildState(the_agents, builder.top_agent_name, builder.pages).save(the_state_path)
         print(f"\n agent count: {builder.agent_counter}")
         print("\nDone!\n")
 
 
-def is_valid_url(link, base_domain):
-    """
-    Determines whether a given link is a valid internal HTTP/HTTPS URL within the specified base domain.
-
-    Args:
-        link (str): The URL to validate.
-        base_domain (str): The base domain that the link must belong to (e.g., "example.com").
-
-    Returns:
-        bool: True if the link is a valid internal HTTP/HTTPS link for the domain, False otherwise.
-    """
-    parsed = urlparse(link)
-    return parsed.scheme in ("http", "https") and base_domain in parsed.netloc
-
-
 def clean_and_extract_text(html):
     """
     Cleans and extracts readable text content from HTML.
 
-    Removes non-content elements (e.g., scripts, styles, images), strips unnecessary attributes,
-    extracts visible text from paragraph-level tags, and sanitizes the text by removing URLs,
-    special characters, and non-ASCII content.
+    Removes non-content elements (e.g., scripts, styles, images), extracts visible text from paragraph-level tags,
+    and sanitizes the text by removing URLs, special characters, and non-ASCII content.
+    When the title and links of the page are needed as well, use `extract_page` to parse the page only once.
 
     Args:
         html (str): Raw HTML content of a web page.
@@ -504,33 +795,7 @@ def clean_and_extract_text(html):
     Returns:
         str: Cleaned and normalized text extracted from the HTML.
     """
-    soup = BeautifulSoup(html, "html.parser")
-
-    # Remove unwanted tags entirely
-    for tag in soup(["script", "style", "noscript", "img", "source", "picture", "svg"]):
-        tag.decompose()
-
-    # Remove image srcset and media nonsense in attributes
-    for tag in soup.find_all(True):
-        for attr in ["src", "srcset", "data-src", "data-srcset", "alt", "title"]:
-            if attr in tag.attrs:
-                del tag.attrs[attr]
-
-    # Extract visible paragraph-level content
-    paragraphs = soup.find_all(["p", "h1", "h2", "h3", "li"])
-    raw_text = " ".join(p.get_text(separator=" ", strip=True) for p in paragraphs)
-
-    # Remove URLs or scene7 junk using regex
-    clean_text = sub(URL_REGEX, "", raw_text)
-    clean_text = sub(SCENE7_JUNK_REGEX, "", clean_text)
-
-    # Reminder: PAGE_LEN_MAX (default 5000) truncates page content earlier in crawl();
-    # if changing size logic, update both places or consolidate here.
-    # Normalize to ascii-only and strip quotes
-    clean_text = clean_text.replace('"', "").replace("'", "")
-    clean_text = clean_text.encode("ascii", errors="ignore").decode()
-
-    return clean_text.strip()
+    return extract_page(html).text
 
 
 def _extract_title_from_html(html: str) -> str:
@@ -546,8 +811,7 @@ def _extract_title_from_html(html: str) -> str:
     Returns:
         str: The cleaned title string if found, otherwise an empty string.
     """
-    soup = BeautifulSoup(html, "html.parser")
-    return soup.title.string.strip() if soup.title and soup.title.string else ""
+    return extract_page(html).title
 
 
 def random_id(prefix="", length=6):
@@ -583,52 +847,40 @@ def get_agent_network_hocon(agents, agent_network_name):
     Returns:
         str: A HOCON-formatted string representing the complete agent network.
     """
-    # If a top agent has already been designated, explicitly mark it in the agent dictionary
+    _mark_top_agent(agents)
+    return HOCON_WRITER.to_string(agents, agent_network_name)
+
+
+def write_agent_network_hocon(agents, agent_network_name, stream):
+    """
+    Writes the HOCON of the agent network to a stream, one agent at a time, without building the whole HOCON
+    in memory. See `get_agent_network_hocon`.
+
+    Args:
+        agents (dict): The dictionary containing all agents with their attributes.
+        agent_network_name (str): The name of the agent network.
+        stream (TextIO): The text stream to write to, e.g. an open file.
+
+    Returns:
+        int: The number of characters written.
+    """
+    _mark_top_agent(agents)
+    return HOCON_WRITER.write(stream, agents, agent_network_name)
+
+
+def _mark_top_agent(agents):
+    """
+    If a top agent has already been designated, explicitly marks it in the agent dictionary.
+
+    Args:
+        agents (dict): The dictionary containing all agents with their attributes.
+    """
     if hasattr(WebAgentNetworkBuilder, "top_agent_name") and WebAgentNetworkBuilder.top_agent_name:
         top_agent_name = WebAgentNetworkBuilder.top_agent_name
         if top_agent_name in agents:
             agents[top_agent_name]["top_agent"] = "true"
             print(f"Assigned top_agent to: {top_agent_name}")
 
-    # Initialize HOCON string with the standard header
-    agent_network_hocon = HOCON_HEADER_START + agent_network_name + HOCON_HEADER_REMAINDER
-    for agent_name, agent in agents.items():
-        unique_tools = []
-        # Deduplicate and validate the down_chains list for each agent
-        for down_chain in agent.get("down_chains", []):
-            if down_chain == agent_name:
-                print(f"Warning: Agent '{agent_name}' directly references itself in down_chains.")
-                continue  # Skip it entirely
-            elif down_chain not in unique_tools:
-                unique_tools.append(f'"{down_chain}"')
-
-        tools = ",".join(unique_tools)
-
-        # Format the agent using the appropriate HOCON template based on its type
-        if agent.get("top_agent") == "true":
-            an_agent = TOP_AGENT_TEMPLATE % (
-                agent_name,
-                agent["instructions"],
-                tools,
-            )
-        elif agent.get("down_chains"):
-            an_agent = REGULAR_AGENT_TEMPLATE % (
-                agent_name,
-                agent["instructions"],
-                tools,
-            )
-        else:
-            an_agent = LEAF_NODE_AGENT_TEMPLATE % (
-                agent_name,
-                agent["instructions"],
-            )
-        agent_network_hocon += an_agent
-
-    # Finalize the HOCON string with a closing bracket
-    agent_network_hocon += "]\n}\n"
-
-    return agent_network_hocon
-
 
 if __name__ == "__main__":
     WebAgentNetworkBuilder().main()
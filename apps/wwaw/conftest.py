@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+# build_wwaw imports the shared HOCON writer from coded_tools, at the top level of the repository, which the README
+# puts in the PYTHONPATH. Loaded by pytest before test_build_wwaw.py, so that the tests run from this directory too.
+REPOSITORY_ROOT = str(Path(__file__).resolve().parents[2])
+if REPOSITORY_ROOT not in sys.path:
+    sys.path.append(REPOSITORY_ROOT)
@@ -0,0 +1,248 @@
+from collections import Counter
+from collections import deque
+from math import ceil
+from math import log
+from math import sqrt
+from re import findall
+from re import sub
+from typing import Dict
+from typing import List
+from typing import Optional
+
+# Regex of the words that make up the content of a page for similarity purposes
+WORD_REGEX = r"[a-z][a-z0-9]{2,}"
+
+# Frequent words that say nothing about the topic of a page
+STOP_WORDS = {
+    "and", "are", "but", "can", "for", "from", "has", "have", "how", "its", "more", "not", "our", "out", "that",
+    "the", "their", "them", "they", "this", "use", "was", "were", "what", "when", "which", "who", "will", "with",
+    "you", "your", "all", "any", "also", "into", "about", "over", "than", "then", "there", "these", "those",
+}  # fmt: skip
+
+# Number of highest-weighted terms kept per vector, which keeps similarities fast on long pages
+MAX_TERMS = 100
+KMEANS_ITERATIONS = 5
+TOPIC_TERMS = 3
+
+SparseVector = Dict[str, float]
+
+
+def get_tfidf_vectors(texts: Dict[str, str]) -> Dict[str, SparseVector]:
+    """
+    Computes a TF-IDF vector for each text. Terms found in every text, such as a shared preface, get no weight.
+
+    Args:
+        texts (dict): The text of each agent, keyed by agent name.
+
+    Returns:
+        dict: The L2-normalized sparse TF-IDF vector of each text, keyed by agent name.
+    """
+    counts = {name: Counter(word for word in findall(WORD_REGEX, text.lower()) if word not in STOP_WORDS)
+              for name, text in texts.items()}  # fmt: skip
+    document_frequency = Counter()
+    for term_counts in counts.values():
+        document_frequency.update(term_counts.keys())
+    total = len(texts)
+
+    vectors = {}
+    for name, term_counts in counts.items():
+        weights = {
+            term: (1.0 + log(count)) * log(total / document_frequency[term])
+            for term, count in term_counts.items()
+            if document_frequency[term] < total
+        }
+        vectors[name] = _normalize(dict(Counter(weights).most_common(MAX_TERMS)))
+    return vectors
+
+
+def _normalize(vector: SparseVector) -> SparseVector:
+    norm = sqrt(sum(weight * weight for weight in vector.values()))
+    return {term: weight / norm for term, weight in vector.items()} if norm else vector
+
+
+def cosine_similarity(vector: SparseVector, other: SparseVector) -> float:
+    """
+    Args:
+        vector (dict): An L2-normalized sparse vector.
+        other (dict): Another one.
+
+    Returns:
+        float: The cosine similarity of the vectors, which is their dot product as they are normalized.
+    """
+    if len(vector) > len(other):
+        vector, other = other, vector
+    return sum(weight * other.get(term, 0.0) for term, weight in vector.items())
+
+
+def _centroid(vectors: List[SparseVector]) -> SparseVector:
+    total = Counter()
+    for vector in vectors:
+        total.update(vector)
+    return _normalize(dict(total.most_common(MAX_TERMS)))
+
+
+def balanced_clusters(names: List[str], vectors: Dict[str, SparseVector], cluster_count: int) -> List[List[str]]:
+    """
+    Splits items into clusters of similar content, of at most ceil(len(names) / cluster_count) items each.
+
+    Balanced k-means: the seeds are spread out, farthest first, and each round assigns the most similar
+    (item, cluster) pairs first, as long as the cluster has room.
+
+    Args:
+        names (list): The names of the items to cluster.
+        vectors (dict): The vector of each item.
+        cluster_count (int): The number of clusters.
+
+    Returns:
+        list: The non-empty clusters, as lists of names in their original order.
+    """
+    cluster_count = min(cluster_count, len(names))
+    capacity = ceil(len(names) / cluster_count)
+
+    # Farthest-first seeds: each seed is the item least similar to the seeds chosen so far
+    centroids = [vectors[names[0]]]
+    closest = [cosine_similarity(vectors[name], centroids[0]) for name in names]
+    while len(centroids) < cluster_count:
+        seed = min(range(len(names)), key=closest.__getitem__)
+        centroids.append(vectors[names[seed]])
+        closest = [
+            max(similarity, cosine_similarity(vectors[name], centroids[-1]))
+            for similarity, name in zip(closest, names)
+        ]
+
+    assignment: List[Optional[int]] = []
+    for _ in range(KMEANS_ITERATIONS):
+        pairs = sorted(
+            ((cosine_similarity(vectors[name], centroid), index, cluster)
+             for index, name in enumerate(names)
+             for cluster, centroid in enumerate(centroids)),
+            reverse=True,
+        )  # fmt: skip
+        assignment = [None] * len(names)
+        sizes = [0] * cluster_count
+        for _, index, cluster in pairs:
+            if assignment[index] is None and sizes[cluster] < capacity:
+                assignment[index] = cluster
+                sizes[cluster] += 1
+        centroids = [
+            _centroid([vectors[name] for name, assigned in zip(names, assignment) if assigned == cluster])
+            for cluster in range(cluster_count)
+        ]
+
+    clusters = [
+        [name for name, assigned in zip(names, assignment) if assigned == cluster] for cluster in range(cluster_count)
+    ]
+    return [cluster for cluster in clusters if cluster]
+
+
+def get_topic_terms(vectors: List[SparseVector], count: int = TOPIC_TERMS) -> List[str]:
+    """
+    Args:
+        vectors (list): The vectors of the items of a cluster.
+        count (int): The number of terms to return.
+
+    Returns:
+        list: The terms weighing the most in the cluster.
+    """
+    return [term for term, _ in Counter(_centroid(vectors)).most_common(count)]
+
+
+def get_routing_report(agents: dict, top_agent_name: str) -> Dict[str, float]:
+    """
+    Measures how many agents a query goes through to reach each leaf agent from the top agent.
+
+    With AAOSA, every agent on the way asks all of its down chains whether they can help, so each hop costs one LLM
+    call per sibling. The report gives both the hops and the down chains asked along the way.
+
+    Args:
+        agents (dict): The agent hierarchy.
+        top_agent_name (str): The name of the top agent.
+
+    Returns:
+        dict: The number of leaves, the mean and maximum hops from the top agent to a leaf, the mean and maximum
+              number of down chains asked on the way, and the number of agents the top agent cannot reach.
+    """
+    hops = {top_agent_name: 0}
+    asked = {top_agent_name: 0}
+    queue = deque([top_agent_name])
+    while queue:
+        name = queue.popleft()
+        down_chains = agents[name].get("down_chains", [])
+        for child in down_chains:
+            if child not in hops and child in agents:
+                hops[child] = hops[name] + 1
+                asked[child] = asked[name] + len(down_chains)
+                queue.append(child)
+
+    leaves = [name for name in hops if not agents[name].get("down_chains")]
+    leaf_count = max(len(leaves), 1)
+    return {
+        "leaves": len(leaves),
+        "mean_hops": round(sum(hops[leaf] for leaf in leaves) / leaf_count, 2),
+        "max_hops": max((hops[leaf] for leaf in leaves), default=0),
+        "mean_down_chains_asked": round(sum(asked[leaf] for leaf in leaves) / leaf_count, 2),
+        "max_down_chains_asked": max((asked[leaf] for leaf in leaves), default=0),
+        "unreachable": len(agents) - len(hops),
+    }
+
+
+def build_similarity_hierarchy(
+    agents: dict, top_agent_name: str, max_children: int, intermediate_preface: str, max_name_len: int
+) -> dict:
+    """
+    Rebuilds the agent hierarchy from the content of the agents rather than from the links between their pages.
+
+    The top agent stays at the top. The other agents become leaves of a balanced tree of intermediate agents,
+    recursively grouping agents with similar content, at most `max_children` per agent, so the tree is
+    ceil(log(len(agents)) / log(max_children)) levels deep at most. Intermediate agents are named and instructed
+    after the terms their group is about, which helps routing queries.
+
+    Args:
+        agents (dict): The agent hierarchy built by the crawl.
+        top_agent_name (str): The name of the top agent.
+        max_children (int): Maximum number of direct children per agent, at least 2.
+        intermediate_preface (str): The beginning of the instructions of intermediate agents.
+        max_name_len (int): Maximum length of agent names.
+
+    Returns:
+        dict: The new agent hierarchy.
+    """
+    new_agents = {name: dict(agent, down_chains=[]) for name, agent in agents.items()}
+    content_names = [name for name in agents if name != top_agent_name]
+    vectors = get_tfidf_vectors({name: agents[name]["instructions"] for name in content_names})
+
+    # Groups of agents to place under a parent, processed breadth first
+    pending = deque([(top_agent_name, content_names)])
+    while pending:
+        parent, names = pending.popleft()
+        if len(names) <= max_children:
+            new_agents[parent]["down_chains"] = list(names)
+            continue
+        for cluster in balanced_clusters(names, vectors, max_children):
+            if len(cluster) == 1:
+                new_agents[parent]["down_chains"].append(cluster[0])
+                continue
+            terms = get_topic_terms([vectors[name] for name in cluster])
+            branch = _get_branch_name(terms, new_agents, max_name_len)
+            instructions = (
+                f"{intermediate_preface} You are an intermediate agent, grouping {len(cluster)} sub-agents"
+                f" about: {', '.join(terms) or 'various topics'}."
+            )
+            new_agents[branch] = {
+                "instructions": instructions.replace('"', "").replace("'", ""),
+                "down_chains": [],
+                "top_agent": "false",
+            }
+            new_agents[parent]["down_chains"].append(branch)
+            pending.append((branch, cluster))
+    return new_agents
+
+
+def _get_branch_name(terms: List[str], agents: dict, max_name_len: int) -> str:
+    base = sub(r"[^a-z0-9\-]", "", "-".join(terms[:2] + ["topics"]))[: max_name_len - 4].strip("-")
+    name = base
+    index = 1
+    while name in agents:
+        name = f"{base}-{index}"
+        index += 1
+    return name
@@ -0,0 +1,159 @@
+from collections import deque
+from hashlib import blake2b
+from math import ceil
+from math import log
+from typing import Deque
+from typing import Iterator
+from typing import Optional
+from typing import Tuple
+from urllib.parse import parse_qsl
+from urllib.parse import urlencode
+from urllib.parse import urlsplit
+from urllib.parse import urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Query parameters that only track where a visitor came from, and do not change the page
+TRACKING_QUERY_PREFIXES = ("utm_",)
+TRACKING_QUERY_PARAMETERS = {"fbclid", "gclid", "mc_cid", "mc_eid"}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalizes a URL so that the different spellings of the same page are crawled once.
+
+    Lowercases the scheme and host, drops default ports, fragments and tracking query parameters,
+    sorts the remaining query parameters and gives an empty path a trailing slash.
+
+    Args:
+        url (str): An absolute URL.
+
+    Returns:
+        str: The normalized URL.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port is None or DEFAULT_PORTS.get(scheme) == port else f"{host}:{port}"
+    if parts.username:
+        netloc = f"{parts.username}@{netloc}"
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_QUERY_PARAMETERS and not key.lower().startswith(TRACKING_QUERY_PREFIXES)
+    ]
+    return urlunsplit((scheme, netloc, parts.path or "/", urlencode(sorted(query)), ""))
+
+
+def is_valid_url(link, base_domain):
+    """
+    Determines whether a given link is a valid internal HTTP/HTTPS URL within the specified base domain.
+
+    Args:
+        link (str): The URL to validate.
+        base_domain (str): The base domain that the link must belong to (e.g., "example.com").
+
+    Returns:
+        bool: True if the link is a valid internal HTTP/HTTPS link for the domain, False otherwise.
+    """
+    parsed = urlsplit(link)
+    return parsed.scheme in ("http", "https") and base_domain in parsed.netloc
+
+
+class BloomFilter:
+    """
+    A fixed-size set of strings that may report strings it never saw, at a chosen rate, but never misses one.
+    Takes about 1.2 bytes per string at a 1% error rate, whatever the length of the strings.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        Args:
+            capacity (int): Number of strings expected. The error rate rises past it.
+            error_rate (float): Rate of strings wrongly reported as seen, at capacity.
+        """
+        self.size = max(8, ceil(-capacity * log(error_rate) / log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterator[int]:
+        # Double hashing: k positions from two independent 64 bits hashes
+        digest = blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+        for index in range(self.hash_count):
+            yield (first + index * second) % self.size
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def add(self, item: str):
+        """
+        Args:
+            item (str): The string to add.
+        """
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class CrawlFrontier:
+    """
+    The URLs waiting to be crawled, in discovery order, along with the name of the agent that linked to each.
+
+    Every URL is queued at most once: URLs are normalized, and checked against the set of all the URLs seen so far,
+    queued or already crawled, in constant time. For very large crawls, a Bloom filter can replace the set to keep
+    its memory small, at the cost of skipping a few pages wrongly taken as seen.
+    """
+
+    def __init__(self, bloom_capacity: Optional[int] = None, error_rate: float = 0.001):
+        """
+        Args:
+            bloom_capacity (int, optional): Number of URLs expected, to use a Bloom filter sized for them
+                                            rather than a set. None to use a set.
+            error_rate (float): Rate of URLs wrongly taken as seen by the Bloom filter.
+        """
+        self.queue: Deque[Tuple[str, Optional[str]]] = deque()
+        self.seen = set() if bloom_capacity is None else BloomFilter(bloom_capacity, error_rate)
+
+    def add(self, url: str, parent_name: Optional[str]) -> bool:
+        """
+        Queues a URL, unless it was seen before.
+
+        Args:
+            url (str): The URL to crawl.
+            parent_name (str, optional): The name of the agent linking to it, None for the start URL.
+
+        Returns:
+            bool: True if the URL was queued, False if it was seen before.
+        """
+        url = normalize_url(url)
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        self.queue.append((url, parent_name))
+        return True
+
+    def pop(self) -> Tuple[str, Optional[str]]:
+        """
+        Returns:
+            tuple: The (url, parent_name) tuple queued first.
+        """
+        return self.queue.popleft()
+
+    def __contains__(self, url: str) -> bool:
+        return normalize_url(url) in self.seen
+
+    def __len__(self) -> int:
+        return len(self.queue)
+
+    def __iter__(self) -> Iterator[Tuple[str, Optional[str]]]:
+        return iter(self.queue)
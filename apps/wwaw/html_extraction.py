@@ -0,0 +1,144 @@
+from re import sub
+from time import perf_counter
+from typing import List
+from typing import Optional
+
+from bs4 import BeautifulSoup
+from bs4 import CData
+from bs4 import FeatureNotFound
+from bs4 import NavigableString
+from bs4 import Tag
+
+# BeautifulSoup tree builders. lxml is much faster than the built-in html.parser, but is an optional dependency,
+# and may build a slightly different tree from malformed HTML.
+HTML_PARSER = "html.parser"
+LXML_PARSER = "lxml"
+
+# Tags whose content is not part of the text of a page
+REMOVED_TAGS = {"script", "style", "noscript", "img", "source", "picture", "svg"}
+
+# Tags whose text makes up the text of a page
+PARAGRAPH_TAGS = {"p", "h1", "h2", "h3", "li"}
+
+# String types that make up the text of a tag, as in Tag.get_text(): not comments, doctypes, etc.
+TEXT_STRING_TYPES = (NavigableString, CData)
+
+# Regex to remove URLs from extracted text
+URL_REGEX = r"https?://\S+"
+
+# Regex to remove scene7 junk or custom format @(...) from extracted text
+SCENE7_JUNK_REGEX = r"@\(.*?\)"
+
+
+class ExtractedPage:
+    """
+    What the crawler needs from a web page, extracted from a single parse of its HTML.
+    """
+
+    def __init__(self, title: str, text: str, links: List[str], parse_seconds: float):
+        """
+        Args:
+            title (str): The stripped title of the page, empty if there is none.
+            text (str): The cleaned text of the paragraph-level tags of the page.
+            links (list): The href of each link of the page, in document order, as written in the page.
+            parse_seconds (float): Time taken to parse the HTML and extract the above.
+        """
+        self.title = title
+        self.text = text
+        self.links = links
+        self.parse_seconds = parse_seconds
+
+
+def make_soup(html: str, parser: str = HTML_PARSER) -> BeautifulSoup:
+    """
+    Parses HTML with the given tree builder, falling back on the built-in one if it is not installed.
+
+    Args:
+        html (str): Raw HTML content.
+        parser (str): HTML_PARSER or LXML_PARSER.
+
+    Returns:
+        BeautifulSoup: The parsed document.
+    """
+    try:
+        return BeautifulSoup(html, parser)
+    except FeatureNotFound:
+        print(f"HTML parser {parser} is not installed, using {HTML_PARSER}")
+        return BeautifulSoup(html, HTML_PARSER)
+
+
+def clean_text(raw_text: str) -> str:
+    """
+    Removes URLs, scene7 junk, quotes and non-ASCII characters from extracted text.
+
+    Args:
+        raw_text (str): Text extracted from a page.
+
+    Returns:
+        str: The cleaned text.
+    """
+    text = sub(URL_REGEX, "", raw_text)
+    text = sub(SCENE7_JUNK_REGEX, "", text)
+    text = text.replace('"', "").replace("'", "")
+    text = text.encode("ascii", errors="ignore").decode()
+    return text.strip()
+
+
+def extract_page(html: str, parser: str = HTML_PARSER) -> ExtractedPage:
+    """
+    Parses the HTML of a page once, and extracts its title, text and links in a single traversal of the tree.
+
+    The results are the ones of parsing the page three times, once for each: the title is the first <title> of the
+    page, the links are all the <a href> of the page, and the text is the text of the paragraph-level tags outside
+    of non-content tags, such as scripts and images. A paragraph nested in another one is part of the text of both.
+
+    Args:
+        html (str): Raw HTML content of a web page.
+        parser (str): HTML_PARSER or LXML_PARSER.
+
+    Returns:
+        ExtractedPage: The title, text and links of the page.
+    """
+    started = perf_counter()
+    soup = make_soup(html, parser)
+
+    title_tag: Optional[Tag] = None
+    links: List[str] = []
+    # Stripped strings of each paragraph-level tag, in document order, and the indexes of the open ones
+    paragraphs: List[List[str]] = []
+    open_paragraphs: List[int] = []
+    # Depth-first traversal with an explicit stack, as pages can be nested deeper than the recursion limit.
+    # Each level holds the iterator of the children of a tag, whether the tag opened a paragraph,
+    # and whether it is within a non-content tag.
+    stack = [(iter(soup.contents), False, False)]
+    while stack:
+        children, opened_paragraph, removed = stack[-1]
+        node = next(children, None)
+        if node is None:
+            stack.pop()
+            if opened_paragraph:
+                open_paragraphs.pop()
+            continue
+
+        if isinstance(node, Tag):
+            name = node.name
+            if name == "title" and title_tag is None:
+                title_tag = node
+            elif name == "a" and node.get("href") is not None:
+                links.append(node["href"])
+            node_removed = removed or name in REMOVED_TAGS
+            node_opens_paragraph = not node_removed and name in PARAGRAPH_TAGS
+            if node_opens_paragraph:
+                open_paragraphs.append(len(paragraphs))
+                paragraphs.append([])
+            stack.append((iter(node.contents), node_opens_paragraph, node_removed))
+        elif open_paragraphs and not removed and type(node) in TEXT_STRING_TYPES:
+            text = node.strip()
+            if text:
+                for index in open_paragraphs:
+                    paragraphs[index].append(text)
+
+    title_string = title_tag.string if title_tag is not None else None
+    title = title_string.strip() if title_string else ""
+    raw_text = " ".join(" ".join(strings) for strings in paragraphs)
+    return ExtractedPage(title, clean_text(raw_text), links, perf_counter() - started)
@@ -0,0 +1,138 @@
+import sqlite3
+import time
+from typing import Dict
+from typing import Iterator
+from typing import Optional
+
+PAGE_CACHE_PATH = "wwaw_page_cache.sqlite"
+
+
+class CachedPage:
+    """
+    A page stored in the cache, along with the validators needed to revalidate it.
+    """
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        url: str,
+        status: int,
+        content_type: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        text: str,
+        fetched_at: float,
+    ):
+        self.url = url
+        self.status = status
+        self.content_type = content_type
+        self.etag = etag
+        self.last_modified = last_modified
+        self.text = text
+        self.fetched_at = fetched_at
+
+    def get_conditional_headers(self) -> Dict[str, str]:
+        """
+        Returns:
+            dict: The headers asking the server to answer 304 Not Modified if the page did not change.
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """
+    Persists the raw HTML of the crawled pages in a SQLite database, so that rebuilding an agent network only
+    revalidates the pages with conditional requests, or does not touch the network at all when offline.
+    """
+
+    def __init__(self, db_path: str = PAGE_CACHE_PATH):
+        """
+        Args:
+            db_path (str): Path of the SQLite database, created if needed.
+        """
+        self.db_path = db_path
+        self._connection = sqlite3.connect(db_path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "url TEXT PRIMARY KEY, status INTEGER NOT NULL, content_type TEXT NOT NULL, etag TEXT, "
+            "last_modified TEXT, text TEXT NOT NULL, fetched_at REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        """
+        Args:
+            url (str): The URL of the page.
+
+        Returns:
+            CachedPage: The cached page, or None if the page is not in the cache.
+        """
+        row = self._connection.execute(
+            "SELECT url, status, content_type, etag, last_modified, text, fetched_at FROM pages WHERE url = ?", (url,)
+        ).fetchone()
+        return CachedPage(*row) if row else None
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def put(
+        self, url: str, status: int, content_type: str, etag: Optional[str], last_modified: Optional[str], text: str
+    ) -> CachedPage:
+        """
+        Stores a downloaded page, replacing the previous version if any.
+
+        Args:
+            url (str): The URL of the page.
+            status (int): The HTTP status of the response.
+            content_type (str): The Content-Type header of the response.
+            etag (str, optional): The ETag header of the response.
+            last_modified (str, optional): The Last-Modified header of the response.
+            text (str): The HTML of the page.
+
+        Returns:
+            CachedPage: The stored page.
+        """
+        page = CachedPage(url, status, content_type, etag, last_modified, text, time.time())
+        self._connection.execute(
+            "INSERT OR REPLACE INTO pages (url, status, content_type, etag, last_modified, text, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url, status, content_type, etag, last_modified, text, page.fetched_at),
+        )
+        self._connection.commit()
+        return page
+
+    def touch(self, page: CachedPage):
+        """
+        Records that a cached page was revalidated, i.e. is still fresh.
+
+        Args:
+            page (CachedPage): The page revalidated.
+        """
+        page.fetched_at = time.time()
+        self._connection.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (page.fetched_at, page.url))
+        self._connection.commit()
+
+    def iterate_pages(self, limit: Optional[int] = None) -> Iterator[CachedPage]:
+        """
+        Args:
+            limit (int, optional): Maximum number of pages to return. None for all of them.
+
+        Returns:
+            iterator: The cached pages.
+        """
+        cursor = self._connection.execute(
+            "SELECT url, status, content_type, etag, last_modified, text, fetched_at FROM pages LIMIT ?",
+            (-1 if limit is None else limit,),
+        )
+        for row in cursor:
+            yield CachedPage(*row)
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self):
+        """Closes the database."""
+        self._connection.close()
@@ -0,0 +1,172 @@
+from collections import Counter
+from math import ceil
+from math import sqrt
+from re import findall
+from re import split
+from time import perf_counter
+from typing import List
+
+from content_hierarchy import STOP_WORDS
+from content_hierarchy import WORD_REGEX
+from content_hierarchy import cosine_similarity
+from content_hierarchy import get_tfidf_vectors
+
+# Rough number of characters per LLM token in English text, to estimate token counts without a tokenizer
+CHARS_PER_TOKEN = 4
+
+# Regex splitting text into sentences, after their end punctuation
+SENTENCE_SPLIT_REGEX = r"(?<=[.!?])\s+"
+
+# Sentences with fewer words, such as "Learn more.", are navigation rather than content
+MIN_SENTENCE_WORDS = 4
+
+# Only the first sentences of very long pages are ranked, as TextRank compares every pair of sentences
+MAX_SENTENCES = 300
+
+DAMPING = 0.85
+TEXTRANK_ITERATIONS = 30
+
+
+class SummarizedPage:
+    """
+    The extractive summary of the text of a page, with measures of its size and quality.
+    """
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(self, text: str, original_tokens: int, sentences: int, selected_sentences: int, term_coverage: float):
+        """
+        Args:
+            text (str): The summary, made of the best ranked sentences of the page, in page order.
+            original_tokens (int): The estimated number of tokens of the text of the page.
+            sentences (int): The number of sentences ranked.
+            selected_sentences (int): The number of sentences in the summary.
+            term_coverage (float): The cosine similarity of the term frequencies of the summary and of the page,
+                                   1.0 when the summary is the page.
+        """
+        self.text = text
+        self.original_tokens = original_tokens
+        self.tokens = estimate_tokens(text)
+        self.sentences = sentences
+        self.selected_sentences = selected_sentences
+        self.term_coverage = term_coverage
+        self.summarize_seconds = 0.0
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Args:
+        text (str): Some text.
+
+    Returns:
+        int: The estimated number of LLM tokens of the text.
+    """
+    return ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def get_term_frequencies(text: str) -> dict:
+    """
+    Args:
+        text (str): Some text.
+
+    Returns:
+        dict: The L2-normalized frequencies of the words of the text, except stop words.
+    """
+    counts = Counter(word for word in findall(WORD_REGEX, text.lower()) if word not in STOP_WORDS)
+    norm = sqrt(sum(count * count for count in counts.values()))
+    return {word: count / norm for word, count in counts.items()} if norm else {}
+
+
+def rank_sentences(sentences: List[str]) -> List[float]:
+    """
+    Ranks sentences with TextRank: PageRank over the graph of the sentences, weighted by their TF-IDF similarity,
+    so that the sentences most similar to the rest of the page rank first.
+
+    Args:
+        sentences (list): The sentences of a page.
+
+    Returns:
+        list: The score of each sentence.
+    """
+    vectors = get_tfidf_vectors({str(index): sentence for index, sentence in enumerate(sentences)})
+    vectors = [vectors[str(index)] for index in range(len(sentences))]
+    count = len(sentences)
+    weights = [[0.0] * count for _ in range(count)]
+    for index in range(count):
+        for other in range(index + 1, count):
+            weights[index][other] = weights[other][index] = cosine_similarity(vectors[index], vectors[other])
+    # Each sentence shares its score among the other ones, in proportion to their similarity
+    shares = [[weight / sum(row) for weight in row] if any(row) else row for row in weights]
+
+    scores = [1.0 / count] * count
+    for _ in range(TEXTRANK_ITERATIONS):
+        scores = [
+            (1 - DAMPING) / count + DAMPING * sum(share[index] * score for share, score in zip(shares, scores))
+            for index in range(count)
+        ]
+    return scores
+
+
+def summarize(text: str, max_tokens: int) -> SummarizedPage:
+    """
+    Summarizes the text of a page to the sentences that best represent it, within a token budget, without any LLM.
+
+    Args:
+        text (str): The text of a page.
+        max_tokens (int): The maximum estimated number of tokens of the summary.
+
+    Returns:
+        SummarizedPage: The summary, which is the text itself if it fits the budget.
+    """
+    started = perf_counter()
+    original_tokens = estimate_tokens(text)
+    if original_tokens <= max_tokens:
+        summary = SummarizedPage(text, original_tokens, 0, 0, 1.0)
+        summary.summarize_seconds = perf_counter() - started
+        return summary
+
+    sentences = [
+        sentence for sentence in split(SENTENCE_SPLIT_REGEX, text) if len(sentence.split()) >= MIN_SENTENCE_WORDS
+    ]
+    sentences = sentences[:MAX_SENTENCES]
+    scores = rank_sentences(sentences) if sentences else []
+
+    # The best ranked sentences that fit in the budget, in the order of the page
+    selected = []
+    budget = max_tokens
+    for index in sorted(range(len(sentences)), key=lambda index: -scores[index]):
+        tokens = estimate_tokens(sentences[index] + " ")
+        if tokens <= budget:
+            selected.append(index)
+            budget -= tokens
+    if selected:
+        summary_text = " ".join(sentences[index] for index in sorted(selected))
+    else:
+        # No sentence is short enough, e.g. a page without punctuation: its beginning is the summary
+        summary_text = text[: max_tokens * CHARS_PER_TOKEN].rsplit(" ", 1)[0]
+
+    coverage = cosine_similarity(get_term_frequencies(summary_text), get_term_frequencies(text))
+    summary = SummarizedPage(summary_text, original_tokens, len(sentences), len(selected), round(coverage, 3))
+    summary.summarize_seconds = perf_counter() - started
+    return summary
+
+
+def get_summary_stats(summaries: List[SummarizedPage]) -> dict:
+    """
+    Args:
+        summaries (list): The summaries of the pages of a crawl.
+
+    Returns:
+        dict: The number of pages summarized, their total estimated tokens before and after, the compression ratio,
+              the mean term coverage and the mean milliseconds taken per page.
+    """
+    count = max(len(summaries), 1)
+    original_tokens = sum(summary.original_tokens for summary in summaries)
+    tokens = sum(summary.tokens for summary in summaries)
+    return {
+        "pages": len(summaries),
+        "original_tokens": original_tokens,
+        "summary_tokens": tokens,
+        "compression": round(tokens / original_tokens, 3) if original_tokens else 1.0,
+        "mean_term_coverage": round(sum(summary.term_coverage for summary in summaries) / count, 3),
+        "mean_ms": round(sum(summary.summarize_seconds for summary in summaries) / count * 1000, 2),
+    }
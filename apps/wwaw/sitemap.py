@@ -0,0 +1,110 @@
+from asyncio import gather
+from datetime import datetime
+from datetime import timezone
+from typing import List
+from typing import Optional
+from typing import Tuple
+from xml.etree.ElementTree import ParseError
+from xml.etree.ElementTree import fromstring
+
+from async_crawler import XML_CONTENT_TYPE
+from async_crawler import AsyncPageFetcher
+from crawl_frontier import normalize_url
+
+# Maximum number of sitemaps read, as sitemap indexes can list thousands of them
+MAX_SITEMAPS = 100
+
+
+class SitemapEntry:
+    """
+    A page listed in a sitemap.
+    """
+
+    def __init__(self, url: str, lastmod: Optional[datetime]):
+        """
+        Args:
+            url (str): The normalized URL of the page.
+            lastmod (datetime, optional): When the page last changed, according to the sitemap, if it says.
+        """
+        self.url = url
+        self.lastmod = lastmod
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[datetime]:
+    """
+    Args:
+        value (str, optional): A W3C datetime, e.g. "2025-10-06" or "2025-10-06T10:00:00+00:00".
+
+    Returns:
+        datetime: The timezone-aware datetime, in UTC if the value has no timezone, or None if it is not valid.
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def parse_sitemap(xml: str) -> Tuple[List[SitemapEntry], List[str]]:
+    """
+    Args:
+        xml (str): A sitemap (urlset) or a sitemap index (sitemapindex).
+
+    Returns:
+        tuple: The pages listed in the sitemap, and the URLs of the sitemaps listed in the sitemap index.
+
+    Raises:
+        ParseError: If the sitemap is not valid XML.
+    """
+    entries = []
+    sitemap_urls = []
+    for element in fromstring(xml):
+        # Tags are namespaced, e.g. {http://www.sitemaps.org/schemas/sitemap/0.9}url
+        tag = element.tag.rsplit("}", 1)[-1]
+        fields = {child.tag.rsplit("}", 1)[-1]: (child.text or "").strip() for child in element}
+        if not fields.get("loc"):
+            continue
+        if tag == "url":
+            entries.append(SitemapEntry(normalize_url(fields["loc"]), parse_lastmod(fields.get("lastmod"))))
+        elif tag == "sitemap":
+            sitemap_urls.append(fields["loc"])
+    return entries, sitemap_urls
+
+
+async def discover_sitemap_entries(
+    fetcher: AsyncPageFetcher, start_url: str, max_sitemaps: int = MAX_SITEMAPS
+) -> List[SitemapEntry]:
+    """
+    Reads the sitemaps of the host of a URL: the ones listed in its robots.txt, or else /sitemap.xml, and the
+    sitemaps listed in sitemap indexes, level by level, each level downloaded concurrently.
+
+    Args:
+        fetcher (AsyncPageFetcher): The fetcher to download the sitemaps with.
+        start_url (str): A URL of the host.
+        max_sitemaps (int): Maximum number of sitemaps read.
+
+    Returns:
+        list: The pages listed in the sitemaps, each once, in sitemap order.
+    """
+    entries = {}
+    seen = set()
+    pending = await fetcher.get_sitemap_urls(start_url)
+    while pending and len(seen) < max_sitemaps:
+        batch = list(dict.fromkeys(url for url in pending if url not in seen))[: max_sitemaps - len(seen)]
+        seen.update(batch)
+        pending = []
+        for sitemap_url, sitemap in zip(batch, await gather(*(fetcher.fetch(url, XML_CONTENT_TYPE) for url in batch))):
+            if sitemap is None:
+                continue
+            try:
+                found, sitemap_urls = parse_sitemap(sitemap.text)
+            except ParseError as e:
+                print(f"Skipping sitemap {sitemap_url} due to error: {str(e)}")
+                continue
+            pending.extend(sitemap_urls)
+            for entry in found:
+                entries.setdefault(entry.url, entry)
+    print(f"Read {len(entries)} pages from {len(seen)} sitemaps")
+    return list(entries.values())
@@ -0,0 +1,195 @@
+from asyncio import create_task
+from collections import deque
+from datetime import datetime
+from typing import AsyncIterator
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from urllib.parse import urlparse
+
+from async_crawler import AsyncPageFetcher
+from async_crawler import FetchedPage
+from build_state import BuildState
+from build_state import get_text_hash
+from crawl_frontier import is_valid_url
+from crawl_frontier import normalize_url
+from html_extraction import extract_page
+from sitemap import discover_sitemap_entries
+from tldextract import extract
+
+
+# pylint: disable=too-many-locals,too-many-branches,too-many-statements
+async def crawl_sitemap_async(builder, start_url, max_agents, state: Optional[BuildState] = None):
+    """
+    Asynchronous version of `WebAgentNetworkBuilder.crawl_sitemap`.
+
+    Args:
+        builder (WebAgentNetworkBuilder): The builder of the agent network.
+        start_url (str): The root URL of the site, which is the top agent.
+        max_agents (int): Maximum number of agents (pages) to generate, including the ones of the previous build.
+        state (BuildState, optional): The state of a previous build, to update incrementally.
+
+    Returns:
+        dict: The agent hierarchy, as returned by `WebAgentNetworkBuilder.crawl`.
+    """
+    agents = {}
+    if state is not None:
+        agents = state.agents
+        builder.pages = state.pages
+        builder.top_agent_name = state.top_agent_name
+    existing_names = set(agents)
+    domain_info = extract(start_url)
+    base_domain = f"{domain_info.domain}.{domain_info.suffix}"
+    start_url = normalize_url(start_url)
+    count = len(builder.pages)
+    previous_count = count
+    updated = 0
+    unchanged = 0
+
+    fetcher = builder.create_fetcher()
+    async with fetcher:
+        entries = await discover_sitemap_entries(fetcher, start_url)
+        lastmods = {entry.url: entry.lastmod for entry in entries if entry.lastmod is not None}
+        urls = [start_url] + [entry.url for entry in entries if is_valid_url(entry.url, base_domain)]
+        if not entries and state is None:
+            # Without a sitemap, the links are crawled instead
+            urls = []
+
+        # The known pages that did not change since the previous build, according to their lastmod, are skipped
+        known_urls = []
+        for url in dict.fromkeys(urls + list(builder.pages)):
+            page_state = builder.pages.get(url)
+            if page_state is None:
+                continue
+            if url in lastmods and page_state.lastmod and lastmods[url] <= datetime.fromisoformat(page_state.lastmod):
+                unchanged += 1
+            else:
+                known_urls.append(url)
+        async for url, resp in fetch_in_order(fetcher, known_urls, lambda: builder.max_concurrency):
+            if resp is None:
+                # Fetched again by the next build, as its lastmod is not recorded
+                continue
+            if update_page(builder, url, resp, agents):
+                updated += 1
+            record_lastmod(builder, url, lastmods)
+
+        # New pages, the ones closest to the root first, so that they are added after their path parents
+        new_urls = sorted(
+            (url for url in dict.fromkeys(urls) if url not in builder.pages),
+            key=lambda url: (url != start_url, urlparse(url).path.rstrip("/").count("/")),
+        )
+        async for url, resp in fetch_in_order(
+            fetcher, new_urls, lambda: min(builder.max_concurrency, max_agents - count)
+        ):
+            if resp is None or count >= max_agents:
+                continue
+            try:
+                page = builder.add_page_agent(url, get_path_parent(builder, url), resp, existing_names, agents)
+                if page is not None:
+                    count += 1
+                    record_lastmod(builder, url, lastmods)
+            except (ValueError, UnicodeDecodeError) as e:
+                print(f"Skipping {url} due to error: {str(e)}")
+
+    if not urls:
+        print("No sitemap found, crawling links instead.")
+        if fetcher.cache is not None:
+            fetcher.cache.close()
+        return await builder.crawl_async(start_url, max_agents)
+    print(
+        f"Generated {count - previous_count} agents with real content, updated {updated}, "
+        f"skipped {unchanged} pages unchanged since their sitemap lastmod."
+    )
+    builder.report_metrics(fetcher)
+    return agents
+
+
+async def fetch_in_order(
+    fetcher: AsyncPageFetcher, urls: List[str], get_window_size: Callable[[], int]
+) -> AsyncIterator[Tuple[str, Optional[FetchedPage]]]:
+    """
+    Args:
+        fetcher (AsyncPageFetcher): The fetcher downloading the pages.
+        urls (list): The URLs of the pages.
+        get_window_size (callable): Function returning how many pages may be downloaded concurrently.
+
+    Returns:
+        AsyncIterator: The (url, page) tuples, in the order of the URLs. The page is None if it was not downloaded.
+    """
+    window = deque()
+    remaining = iter(urls)
+    while True:
+        while len(window) < get_window_size():
+            url = next(remaining, None)
+            if url is None:
+                break
+            window.append((url, create_task(fetcher.fetch(url))))
+        if not window:
+            return
+        url, task = window.popleft()
+        yield url, await task
+
+
+def update_page(builder, url: str, resp: FetchedPage, agents: dict) -> bool:
+    """
+    Updates the instructions of the agent of a page of a previous build, if the text of the page changed.
+
+    Args:
+        builder (WebAgentNetworkBuilder): The builder of the agent network.
+        url (str): The URL of the page.
+        resp (FetchedPage): The page.
+        agents (dict): The agent hierarchy of the previous build.
+
+    Returns:
+        bool: True if the agent was updated.
+    """
+    page = extract_page(resp.text, builder.html_parser)
+    builder.parse_seconds.append(page.parse_seconds)
+    page_state = builder.pages[url]
+    text_hash = get_text_hash(page.text)
+    if (
+        text_hash == page_state.text_hash
+        or len(page.text) < builder.MIN_PAGE_LEN
+        or page_state.agent_name not in agents
+    ):
+        return False
+    agents[page_state.agent_name]["instructions"] = builder.get_instructions(page.text)
+    page_state.text_hash = text_hash
+    return True
+
+
+def record_lastmod(builder, url: str, lastmods: Dict[str, datetime]):
+    """
+    Records the sitemap lastmod of a page that was fetched and checked, so that the next build skips it until
+    its lastmod changes. The pages that could not be fetched keep their previous lastmod, if any.
+
+    Args:
+        builder (WebAgentNetworkBuilder): The builder of the agent network.
+        url (str): The URL of the page.
+        lastmods (dict): The sitemap lastmod of the pages, by URL.
+    """
+    if url in lastmods:
+        builder.pages[url].lastmod = lastmods[url].isoformat()
+
+
+def get_path_parent(builder, url: str) -> Optional[str]:
+    """
+    Args:
+        builder (WebAgentNetworkBuilder): The builder of the agent network.
+        url (str): The URL of a page.
+
+    Returns:
+        str: The agent of the closest page up the path of the URL, e.g. /services for /services/cloud,
+             else the top agent.
+    """
+    parsed = urlparse(url)
+    segments = parsed.path.rstrip("/").split("/")[:-1]
+    while segments:
+        path = f"{parsed.scheme}://{parsed.netloc}{'/'.join(segments)}"
+        for candidate in (path, f"{path}/"):
+            if candidate in builder.pages:
+                return builder.pages[candidate].agent_name
+        segments.pop()
+    return builder.top_agent_name
@@ -1,6 +1,23 @@
+from asyncio import run
+from time import monotonic
+from types import SimpleNamespace
 from unittest.mock import Mock
 
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from async_crawler import AsyncPageFetcher
+from async_crawler import TokenBucket
+from build_state import BuildState
 from build_wwaw import WebAgentNetworkBuilder
+from content_hierarchy import get_routing_report
+from crawl_frontier import BloomFilter
+from crawl_frontier import CrawlFrontier
+from crawl_frontier import normalize_url
+from html_extraction import extract_page
+from page_cache import PageCache
+from page_summarizer import estimate_tokens
+from page_summarizer import summarize
+from sitemap import parse_sitemap
 
 
 def test_create_intermediate_agents_single_pass():
@@ -27,11 +44,10 @@ def test_process_page_single_pass():
     builder = WebAgentNetworkBuilder()
     url = "http://example.com"
     parent_name = None
-    visited = set()
     existing_names = set()
     agents = {}
     count = 0
-    to_visit = []
+    to_visit = CrawlFrontier()
     base_domain = "example.com"
 
     html = """
@@ -40,6 +56,7 @@ def test_process_page_single_pass():
         <p>This is a test page with enough text content to pass the minimum length requirement.</p>
         <a href="/about">About</a>
         <a href="http://example.com/contact">Contact</a>
+        <a href="http://example.com:80/contact#team">Contact again</a>
         <a href="http://otherdomain.com/external">External</a>
     </body></html>
     """
@@ -52,15 +69,305 @@ def test_process_page_single_pass():
     builder.PAGE_LEN_MAX = 5000
     builder.AGENT_INSTRUCTION_PREFACE = "Agent Instructions:"
 
-    new_count = builder._process_page(
-        url, parent_name, resp, visited, existing_names, agents, count, to_visit, base_domain
-    )
+    new_count = builder._process_page(url, parent_name, resp, existing_names, agents, count, to_visit, base_domain)
 
     assert new_count == count + 1
-    assert url in visited
+    assert url in builder.pages
     assert len(agents) == 1
     name = next(iter(agents))
     assert "Agent Instructions:" in agents[name]["instructions"]
     assert agents[name]["down_chains"] == []
-    assert len(to_visit) == 2  # /about and /contact; external should be ignored
+    assert len(to_visit) == 2  # /about and /contact once; external should be ignored
     assert all("example.com" in link for link, _ in to_visit)
+
+
+def test_normalize_url():
+    assert normalize_url("HTTPS://Example.COM:443") == "https://example.com/"
+    assert normalize_url("http://example.com:8080/a#top") == "http://example.com:8080/a"
+    assert normalize_url("http://example.com/a?b=2&utm_source=x&a=1") == "http://example.com/a?a=1&b=2"
+
+
+def test_crawl_frontier_queues_each_url_once():
+    for frontier in (CrawlFrontier(), CrawlFrontier(bloom_capacity=1000)):
+        assert frontier.add("http://example.com/a", None)
+        assert frontier.add("http://example.com/b", "a")
+        assert not frontier.add("http://EXAMPLE.com/a#section", "b")
+        assert frontier.pop() == ("http://example.com/a", None)
+        # Crawled URLs stay seen
+        assert not frontier.add("http://example.com/a", "b")
+        assert len(frontier) == 1
+
+
+def test_bloom_filter_error_rate():
+    bloom = BloomFilter(10000, error_rate=0.01)
+    for index in range(10000):
+        bloom.add(f"http://example.com/page/{index}")
+    assert all(f"http://example.com/page/{index}" in bloom for index in range(10000))
+    false_positives = sum(f"http://example.com/other/{index}" in bloom for index in range(10000))
+    assert false_positives < 300
+
+
+def test_page_cache_offline_fetch(tmp_path):
+    cache = PageCache(str(tmp_path / "pages.sqlite"))
+    cache.put("http://example.com/", 200, "text/html", '"v1"', "Mon, 06 Oct 2025 10:00:00 GMT", "<html></html>")
+
+    cached = cache.get("http://example.com/")
+    assert cached.get_conditional_headers() == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 06 Oct 2025 10:00:00 GMT",
+    }
+
+    async def fetch_offline(url):
+        async with AsyncPageFetcher(cache=cache, offline=True) as fetcher:
+            return await fetcher.fetch(url)
+
+    page = run(fetch_offline("http://example.com/"))
+    assert page.text == "<html></html>"
+    assert page.headers["Content-Type"] == "text/html"
+    assert run(fetch_offline("http://example.com/missing")) is None
+    cache.close()
+
+
+def test_extract_page_single_parse():
+    html = """
+    <html><head><title> Test Page </title><script>var skipped = 1;</script></head>
+    <body>
+        <ul><li>Item with <a href="/about">a link</a></li></ul>
+        <svg><title>Icon</title><a href="/icon">Icon</a><p>Not text</p></svg>
+        <p>Visit https://example.com/page for @(junk)more.</p>
+    </body></html>
+    """
+    page = extract_page(html)
+
+    assert page.title == "Test Page"
+    assert page.text == "Item with a link Visit  for more."
+    assert page.links == ["/about", "/icon"]
+    assert page.parse_seconds > 0
+
+
+def test_enforce_fanout_by_similarity():
+    builder = WebAgentNetworkBuilder()
+    builder.top_agent_name = "home"
+    agents = {"home": {"instructions": "Home page", "down_chains": [], "top_agent": "true"}}
+    for index in range(9):
+        topic = ["cloud hosting servers", "banking loans mortgages", "hospital patients doctors"][index % 3]
+        agents[f"page-{index}"] = {"instructions": f"{topic} page {index}", "down_chains": [], "top_agent": "false"}
+        # A chain of links: each page is only linked from the previous one
+        agents["home" if index == 0 else f"page-{index - 1}"]["down_chains"].append(f"page-{index}")
+
+    new_agents = builder.enforce_fanout_by_similarity(agents, max_children=3)
+
+    # The pages of each topic are grouped under an intermediate agent named after the topic
+    assert len(new_agents["home"]["down_chains"]) == 3
+    for branch in new_agents["home"]["down_chains"]:
+        pages = new_agents[branch]["down_chains"]
+        assert len(pages) == 3
+        assert len({int(page.split("-")[1]) % 3 for page in pages}) == 1
+        assert new_agents[pages[0]]["instructions"].split()[0] in branch
+    assert get_routing_report(agents, "home")["max_hops"] == 9
+    assert get_routing_report(new_agents, "home") == {
+        "leaves": 9,
+        "mean_hops": 2,
+        "max_hops": 2,
+        "mean_down_chains_asked": 6,
+        "max_down_chains_asked": 6,
+        "unreachable": 0,
+    }
+
+
+def test_summarize_to_token_budget():
+    text = (
+        "Our cloud platform hosts your applications on secure servers. "
+        "Click here to accept all the cookies of this site. "
+        "The cloud platform scales servers for your applications automatically. "
+        "Follow us on social networks for the latest news. "
+        "Secure cloud servers keep your applications available."
+    )
+    summary = summarize(text, 30)
+
+    # Sentences about the topic of the page are kept, in page order, the off-topic ones are not
+    assert summary.text.startswith("Our cloud platform hosts your applications on secure servers. ")
+    assert "cookies" not in summary.text and "social" not in summary.text
+    assert summary.tokens <= 30 < summary.original_tokens == estimate_tokens(text)
+    assert summary.selected_sentences == 2
+    assert 0 < summary.term_coverage < 1
+    assert summarize(text, 100).text == text
+
+
+def test_parse_sitemap():
+    entries, sitemap_urls = parse_sitemap(
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        "<url><loc>HTTPS://Example.com/a#top</loc><lastmod>2025-10-06</lastmod></url>"
+        "<url><loc>https://example.com/b</loc><lastmod>not a date</lastmod></url>"
+        "<sitemap><loc>https://example.com/more.xml</loc></sitemap>"
+        "</urlset>"
+    )
+    assert [entry.url for entry in entries] == ["https://example.com/a", "https://example.com/b"]
+    assert entries[0].lastmod.isoformat() == "2025-10-06T00:00:00+00:00"
+    assert entries[1].lastmod is None
+    assert sitemap_urls == ["https://example.com/more.xml"]
+
+
+def publish_site(cache_path, cloud_lastmod, cloud_text):
+    # Puts a site of three pages, whose sitemap only lists two of them, in the page cache, for offline builds
+    cache = PageCache(cache_path)
+    sitemap = (
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        f"<url><loc>https://example.com/services/cloud</loc><lastmod>{cloud_lastmod}</lastmod></url>"
+        "<url><loc>https://example.com/services</loc><lastmod>2025-01-01</lastmod></url>"
+        "</urlset>"
+    )
+    cache.put("https://example.com/sitemap.xml", 200, "application/xml", None, None, sitemap)
+    for path, title, text in (
+        ("/", "Home", "Welcome home. "),
+        ("/services", "Services", "Our services. "),
+        ("/services/cloud", "Cloud", cloud_text),
+    ):
+        html = f"<html><head><title>{title}</title></head><body><p>{text * 30}</p></body></html>"
+        cache.put(f"https://example.com{path}", 200, "text/html", None, None, html)
+    cache.close()
+
+
+def build_from_sitemap(cache_path, state=None):
+    builder = WebAgentNetworkBuilder()
+    builder.cache_path = cache_path
+    builder.offline = True
+    agents = builder.crawl_sitemap("https://example.com", 10, state)
+    return agents, BuildState(agents, builder.top_agent_name, builder.pages)
+
+
+def test_incremental_sitemap_crawl(tmp_path):
+    cache_path = str(tmp_path / "cache.sqlite")
+
+    publish_site(cache_path, "2025-01-01", "Cloud hosting. ")
+    agents, state = build_from_sitemap(cache_path)
+    # Pages are under the closest page up their path
+    assert {name: agent["down_chains"] for name, agent in agents.items()} == {
+        "home": ["services"],
+        "services": ["cloud"],
+        "cloud": [],
+    }
+
+    state.save(str(tmp_path / "state.json"))
+    publish_site(cache_path, "2025-02-01", "Cloud hosting and more. ")
+    agents, state = build_from_sitemap(cache_path, BuildState.load(str(tmp_path / "state.json")))
+    assert "Cloud hosting and more." in agents["cloud"]["instructions"]
+    assert state.pages["https://example.com/services/cloud"].lastmod == "2025-02-01T00:00:00+00:00"
+
+
+def test_incremental_sitemap_crawl_retries_failed_fetches(tmp_path, monkeypatch):
+    cache_path = str(tmp_path / "cache.sqlite")
+    cloud_url = "https://example.com/services/cloud"
+    publish_site(cache_path, "2025-01-01", "Cloud hosting. ")
+    _, state = build_from_sitemap(cache_path)
+
+    publish_site(cache_path, "2025-02-01", "Cloud hosting and more. ")
+    fetch = AsyncPageFetcher.fetch
+
+    async def fetch_failing_once(fetcher, url, *args):
+        if url == cloud_url and url not in failed:
+            failed.add(url)
+            return None
+        return await fetch(fetcher, url, *args)
+
+    failed = set()
+    monkeypatch.setattr(AsyncPageFetcher, "fetch", fetch_failing_once)
+    agents, state = build_from_sitemap(cache_path, state)
+    # The page that could not be fetched keeps its previous lastmod, so that the next build fetches it
+    assert failed == {cloud_url}
+    assert "Cloud hosting and more." not in agents["cloud"]["instructions"]
+    assert state.pages[cloud_url].lastmod == "2025-01-01T00:00:00+00:00"
+
+    agents, state = build_from_sitemap(cache_path, state)
+    assert "Cloud hosting and more." in agents["cloud"]["instructions"]
+    assert state.pages[cloud_url].lastmod == "2025-02-01T00:00:00+00:00"
+
+
+def create_site(pages):
+    # A site serving the given (content type, body) by path, recording the path and time of each request
+    requests = []
+
+    async def handle(request):
+        requests.append((request.path, monotonic()))
+        if request.path not in pages:
+            raise web.HTTPNotFound()
+        content_type, body = pages[request.path]
+        return web.Response(text=body, content_type=content_type)
+
+    app = web.Application()
+    app.router.add_get("/{path:.*}", handle)
+    return app, requests
+
+
+def test_token_bucket_rate_and_burst():
+    async def take(bucket, count):
+        started = monotonic()
+        for _ in range(count):
+            await bucket.acquire()
+        return monotonic() - started
+
+    bucket = TokenBucket(20.0, capacity=2)
+    # The burst goes through at once, then a token is refilled every 50 ms
+    assert run(take(bucket, 2)) < 0.04
+    assert run(take(bucket, 2)) >= 0.09
+    assert run(take(TokenBucket(0.0), 100)) < 0.04
+
+    # A Crawl-delay only ever slows the bucket down, and ends the burst
+    bucket = TokenBucket(20.0, capacity=4)
+    bucket.slow_down(0.1)
+    assert (bucket.rate, bucket.capacity) == (10.0, 1)
+    bucket.slow_down(0.01)
+    assert bucket.rate == 10.0
+    assert run(take(bucket, 2)) >= 0.09
+
+
+def test_fetcher_obeys_robots_txt():
+    robots = "User-agent: *\nDisallow: /private\nCrawl-delay: 1\n"
+    html = "<html><body><p>Page</p></body></html>"
+    app, requests = create_site(
+        {"/robots.txt": ("text/plain", robots), "/a": ("text/html", html), "/b": ("text/html", html)}
+    )
+
+    async def fetch_all():
+        async with TestServer(app) as server:
+            async with AsyncPageFetcher(requests_per_second=100.0, cache=None) as fetcher:
+                pages = [await fetcher.fetch(str(server.make_url(path))) for path in ("/private", "/a", "/b")]
+                return pages, fetcher.get_metrics()
+
+    pages, metrics = run(fetch_all())
+
+    assert pages[0] is None
+    assert [page.text for page in pages[1:]] == [html, html]
+    assert metrics["robots_disallowed"] == 1
+    # robots.txt is fetched once, the disallowed page never, and the pages are spaced by the Crawl-delay
+    assert [path for path, _ in requests] == ["/robots.txt", "/a", "/b"]
+    assert requests[2][1] - requests[1][1] >= 0.95
+
+
+def test_crawl_stops_at_max_agents(monkeypatch):
+    links = "".join(f'<a href="/page{index}">Page {index}</a>' for index in range(20))
+    text = "<p>" + "Enough text for the page to make an agent. " * 10 + "</p>"
+    pages = {"/": ("text/html", f"<html><head><title>Home</title></head><body>{text}{links}</body></html>")}
+    for index in range(20):
+        pages[f"/page{index}"] = (
+            "text/html",
+            f"<html><head><title>Page {index}</title></head><body>{text}</body></html>",
+        )
+    app, requests = create_site(pages)
+    # An IP address has no registered domain, so the links are kept as internal by the address itself
+    monkeypatch.setattr("build_wwaw.extract", lambda url: SimpleNamespace(domain="127.0", suffix="0.1"))
+
+    builder = WebAgentNetworkBuilder()
+    builder.cache_path = None
+    builder.requests_per_second = 0.0
+
+    async def crawl():
+        async with TestServer(app, host="127.0.0.1") as server:
+            return await builder.crawl_async(str(server.make_url("/")), 5)
+
+    agents = run(crawl())
+
+    assert len(agents) == 5
+    # No more pages are downloaded than the budget needs
+    assert len([path for path, _ in requests if path != "/robots.txt"]) == 5
@@ -0,0 +1,156 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-studio SDK Software in commercial settings.
+#
+import threading
+import time
+from typing import Any
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+# Key under which the absolute deadline (seconds since the epoch) of a chain of agent calls
+# is passed down through sly_data and metadata. Wall-clock time is used so that it can cross processes.
+CALL_DEADLINE_KEY = "call_deadline"
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class AgentCallGuard:
+    """
+    Bounds the time spent in nested agent calls.
+
+    Each call gets the time budget remaining until the deadline of the chain it belongs to,
+    and a per-target circuit breaker fails fast once a target agent has timed out repeatedly.
+    After a cool down period, a single trial call is let through to probe the target again.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout_seconds: float = 30.0):
+        """
+        :param failure_threshold: Number of consecutive timeouts after which the circuit of a target opens.
+        :param reset_timeout_seconds: Number of seconds an open circuit waits before letting a trial call through.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._targets: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_deadline(sly_data: Dict[str, Any], default_budget_seconds: float) -> float:
+        """
+        :param sly_data: The sly_data of the call, possibly carrying the deadline of the calling chain.
+        :param default_budget_seconds: The budget of a chain starting with this call.
+        :return: The absolute deadline of the call, in seconds since the epoch.
+        """
+        own_deadline = time.time() + default_budget_seconds
+        inherited_deadline = sly_data.get(CALL_DEADLINE_KEY)
+        if inherited_deadline is None:
+            return own_deadline
+        return min(float(inherited_deadline), own_deadline)
+
+    def before_call(self, target: str, deadline: float) -> Tuple[float, Optional[str]]:
+        """
+        Checks whether a call to the target can go ahead.
+
+        :param target: The name of the agent being called.
+        :param deadline: The absolute deadline of the call.
+        :return: A tuple of the remaining budget in seconds and an error message,
+                which is None when the call can go ahead.
+        """
+        remaining = deadline - time.time()
+        with self._lock:
+            stats = self._get_stats(target)
+            if remaining <= 0:
+                stats["deadline_exhausted"] += 1
+                return remaining, f"Error: Deadline exceeded before calling {target}."
+
+            if stats["state"] == OPEN:
+                if time.monotonic() - stats["opened_at"] < self.reset_timeout_seconds:
+                    stats["rejected"] += 1
+                    return remaining, f"Error: {target} is unavailable after repeated timeouts, not calling it."
+                stats["state"] = HALF_OPEN
+            elif stats["state"] == HALF_OPEN:
+                # A trial call is already in flight
+                stats["rejected"] += 1
+                return remaining, f"Error: {target} is unavailable after repeated timeouts, not calling it."
+
+            stats["calls"] += 1
+        return remaining, None
+
+    def record_success(self, target: str, elapsed_seconds: float):
+        """
+        :param target: The name of the agent that answered.
+        :param elapsed_seconds: The duration of the call.
+        """
+        with self._lock:
+            stats = self._get_stats(target)
+            stats["successes"] += 1
+            stats["consecutive_timeouts"] = 0
+            stats["state"] = CLOSED
+            stats["max_latency_seconds"] = max(stats["max_latency_seconds"], elapsed_seconds)
+
+    def record_timeout(self, target: str, elapsed_seconds: float):
+        """
+        :param target: The name of the agent that did not answer within its budget.
+        :param elapsed_seconds: The duration of the call.
+        """
+        with self._lock:
+            stats = self._get_stats(target)
+            stats["timeouts"] += 1
+            stats["consecutive_timeouts"] += 1
+            stats["max_latency_seconds"] = max(stats["max_latency_seconds"], elapsed_seconds)
+            if stats["state"] == HALF_OPEN or stats["consecutive_timeouts"] >= self.failure_threshold:
+                if stats["state"] != OPEN:
+                    stats["times_opened"] += 1
+                stats["state"] = OPEN
+                stats["opened_at"] = time.monotonic()
+
+    def record_error(self, target: str):
+        """
+        Records a call that failed for another reason than a timeout.
+        Such failures do not count towards opening the circuit, but a failed trial call re-opens it.
+
+        :param target: The name of the agent that was called.
+        """
+        with self._lock:
+            stats = self._get_stats(target)
+            stats["errors"] += 1
+            if stats["state"] == HALF_OPEN:
+                stats["state"] = OPEN
+                stats["opened_at"] = time.monotonic()
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        :return: A dictionary of the counters and circuit state of each target.
+        """
+        with self._lock:
+            metrics = {}
+            for target, stats in self._targets.items():
+                metrics[target] = {key: value for key, value in stats.items() if key != "opened_at"}
+            return metrics
+
+    def _get_stats(self, target: str) -> Dict[str, Any]:
+        stats = self._targets.get(target)
+        if stats is None:
+            stats = {
+                "state": CLOSED,
+                "calls": 0,
+                "successes": 0,
+                "timeouts": 0,
+                "consecutive_timeouts": 0,
+                "errors": 0,
+                "rejected": 0,
+                "deadline_exhausted": 0,
+                "times_opened": 0,
+                "max_latency_seconds": 0.0,
+                "opened_at": 0.0,
+            }
+            self._targets[target] = stats
+        return stats
@@ -15,6 +15,8 @@ from typing import Union
 import aiofiles  # Import for asynchronous file operations
 from neuro_san.interfaces.coded_tool import CodedTool
 
+from coded_tools.agent_network_hocon_writer import AgentNetworkHoconWriter
+
 WRITE_TO_FILE = True
 OUTPUT_PATH = "registries/"
 AGENT_NETWORK_NAME = "AutomaticallyDesignedAgentNetwork"
@@ -91,11 +93,16 @@ LEAF_NODE_AGENT_TEMPLATE = (
     "        },\n"
 )
 
+# Writes the agents one at a time, in linear time, and escapes their names and instructions
+HOCON_WRITER = AgentNetworkHoconWriter(
+    HOCON_HEADER_START, HOCON_HEADER_REMAINDER, TOP_AGENT_TEMPLATE, REGULAR_AGENT_TEMPLATE, LEAF_NODE_AGENT_TEMPLATE
+)
+
 
 async def modify_registry(the_agent_network_hocon_str, the_agent_network_name):
     """
     Writes the agent network to a file and updates the manifest.hocon file.
-    :param the_agent_network_hocon_str: The agent network hocon string
+    :param the_agent_network_hocon_str: The agent network hocon string, as returned to the calling agent
     :param the_agent_network_name: The file name, without the .hocon extension
     :return:
     """
@@ -177,6 +184,7 @@ class GetAgentNetworkHocon(CodedTool):
         the_agent_network_hocon_str = self.get_agent_network_hocon(the_agent_network_name)
         logger.info("The resulting agent network: \n %s", str(the_agent_network_hocon_str))
         if WRITE_TO_FILE:
+            # The file is written from the HOCON already rendered, rather than rendering the agents again
             await modify_registry(the_agent_network_hocon_str, the_agent_network_name)
         logger.info(">>>>>>>>>>>>>>>>>>>DONE !!!>>>>>>>>>>>>>>>>>>")
         return the_agent_network_hocon_str
@@ -186,37 +194,10 @@ class GetAgentNetworkHocon(CodedTool):
         Returns a full agent network hocon.
         """
         has_top_agent = False
-        for agent_name, agent in self.agents.items():
+        for agent in self.agents.values():
             if agent["top_agent"] == "true":
                 has_top_agent = True
-        if not has_top_agent:
-            self.agents[0]["top_agent"] = "true"
-
-        agent_network_hocon = HOCON_HEADER_START + agent_network_name + HOCON_HEADER_REMAINDER
-        for agent_name, agent in self.agents.items():
-            tools = ""
-            if agent["down_chains"]:
-                for j, down_chain in enumerate(agent["down_chains"]):
-                    tools = tools + '"' + down_chain + '"'
-                    if j < len(agent["down_chains"]) - 1:
-                        tools = tools + ","
-            if agent["top_agent"] == "true":  # top agent
-                an_agent = TOP_AGENT_TEMPLATE % (
-                    agent_name,
-                    agent["instructions"],
-                    tools,
-                )
-            elif agent["down_chains"]:
-                an_agent = REGULAR_AGENT_TEMPLATE % (
-                    agent_name,
-                    agent["instructions"],
-                    tools,
-                )
-            else:  # leaf node agent
-                an_agent = LEAF_NODE_AGENT_TEMPLATE % (
-                    agent_name,
-                    agent["instructions"],
-                )
-            agent_network_hocon = agent_network_hocon + an_agent
-        agent_network_hocon = agent_network_hocon + "]\n}\n"
-        return agent_network_hocon
+        if not has_top_agent and self.agents:
+            next(iter(self.agents.values()))["top_agent"] = "true"
+
+        return HOCON_WRITER.to_string(self.agents, agent_network_name)
@@ -0,0 +1,162 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-studio SDK Software in commercial settings.
+#
+import json
+import logging
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import TextIO
+from typing import Tuple
+from typing import Union
+
+# Markers substituted for the %s of the agent templates, to find where the values go
+NAME_SLOT = "\x00name\x00"
+INSTRUCTIONS_SLOT = "\x00instructions\x00"
+TOOLS_SLOT = "\x00tools\x00"
+TRIPLE_QUOTE = '"""'
+HOCON_FOOTER = "]\n}\n"
+
+Agents = Union[Dict[str, Dict[str, Any]], Iterable[Tuple[str, Dict[str, Any]]]]
+
+
+# pylint: disable=too-few-public-methods
+class AgentTemplate:
+    """
+    An agent template, such as a top agent template, with %s for the name, the instructions and, optionally,
+    the tools of the agent, in that order. The instructions must be within a triple-quoted string.
+    """
+
+    def __init__(self, template: str):
+        """
+        :param template: The template of the HOCON of an agent.
+        """
+        slots = (NAME_SLOT, INSTRUCTIONS_SLOT, TOOLS_SLOT)
+        skeleton = template % slots[: template.count("%s")]
+        position = skeleton.index(INSTRUCTIONS_SLOT)
+        start = skeleton.rfind(TRIPLE_QUOTE, 0, position)
+        end = skeleton.find(TRIPLE_QUOTE, position)
+        if start == -1 or end == -1:
+            raise ValueError("The instructions of an agent template must be within a triple-quoted string.")
+        # The parts of the template around the triple-quoted string of the instructions, and within it
+        self.head = skeleton[:start]
+        self.quoted_head = skeleton[start + len(TRIPLE_QUOTE) : position]
+        self.quoted_tail = skeleton[position + len(INSTRUCTIONS_SLOT) : end]
+        self.tail = skeleton[end + len(TRIPLE_QUOTE) :]
+
+    def render(self, name: str, instructions: str, tools: List[str]) -> str:
+        """
+        :param name: The name of the agent.
+        :param instructions: The instructions of the agent, as they should read once the HOCON is parsed.
+        :param tools: The names of the tools of the agent.
+        :return: The HOCON of the agent.
+        """
+        quoted = self.quoted_head + instructions + self.quoted_tail
+        if TRIPLE_QUOTE in instructions:
+            # Nothing can be escaped within a triple-quoted string, so the same string is written as a quoted string
+            instructions_string = json.dumps(quoted, ensure_ascii=False)
+        else:
+            instructions_string = TRIPLE_QUOTE + quoted + TRIPLE_QUOTE
+        tools_string = ",".join(json.dumps(tool, ensure_ascii=False) for tool in tools)
+        # Names are within double quotes in the templates
+        name_string = json.dumps(name, ensure_ascii=False)[1:-1]
+        return (
+            self.head.replace(NAME_SLOT, name_string).replace(TOOLS_SLOT, tools_string)
+            + instructions_string
+            + self.tail.replace(NAME_SLOT, name_string).replace(TOOLS_SLOT, tools_string)
+        )
+
+
+class AgentNetworkHoconWriter:
+    """
+    Writes the HOCON of an agent network one agent at a time, so that networks of any size are written in linear
+    time, and to a stream without holding the whole HOCON in memory.
+
+    Agents are dictionaries with "instructions", "down_chains" and "top_agent" ("true" or "false") keys. The top
+    agent, the agents with down chains and the other ones are written with the top, regular and leaf templates.
+    """
+
+    def __init__(
+        self,
+        header_start: str,
+        header_remainder: str,
+        top_agent_template: str,
+        regular_agent_template: str,
+        leaf_node_agent_template: str,
+    ):
+        """
+        :param header_start: The beginning of the HOCON, up to the name of the network.
+        :param header_remainder: The rest of the HOCON before the agents.
+        :param top_agent_template: The template of the top agent, with %s for its name, instructions and tools.
+        :param regular_agent_template: The template of the agents with tools, with %s for the same.
+        :param leaf_node_agent_template: The template of the agents without tools, with %s for their name
+                                         and instructions.
+        """
+        self.header_start = header_start
+        self.header_remainder = header_remainder
+        self.top_agent_template = AgentTemplate(top_agent_template)
+        self.regular_agent_template = AgentTemplate(regular_agent_template)
+        self.leaf_node_agent_template = AgentTemplate(leaf_node_agent_template)
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def render_agent(self, agent_name: str, agent: Dict[str, Any]) -> str:
+        """
+        :param agent_name: The name of the agent.
+        :param agent: The agent.
+        :return: The HOCON of the agent. Its tools are its down chains, without duplicates nor itself.
+        """
+        tools = []
+        for down_chain in agent.get("down_chains") or []:
+            if down_chain == agent_name:
+                self.logger.warning("Agent '%s' directly references itself in down_chains.", agent_name)
+            elif down_chain not in tools:
+                tools.append(down_chain)
+
+        if agent.get("top_agent") == "true":
+            template = self.top_agent_template
+        elif tools:
+            template = self.regular_agent_template
+        else:
+            template = self.leaf_node_agent_template
+        return template.render(agent_name, agent["instructions"], tools)
+
+    def iterate_chunks(self, agents: Agents, agent_network_name: str) -> Iterator[str]:
+        """
+        :param agents: The agents, as a dictionary keyed by agent name or (agent_name, agent) tuples.
+        :param agent_network_name: The name of the agent network.
+        :return: A generator of the successive parts of the HOCON: the header, each agent, and the footer.
+        """
+        items = agents.items() if isinstance(agents, dict) else agents
+        yield self.header_start + agent_network_name + self.header_remainder
+        for agent_name, agent in items:
+            yield self.render_agent(agent_name, agent)
+        yield HOCON_FOOTER
+
+    def to_string(self, agents: Agents, agent_network_name: str) -> str:
+        """
+        :param agents: The agents, as a dictionary keyed by agent name or (agent_name, agent) tuples.
+        :param agent_network_name: The name of the agent network.
+        :return: The HOCON of the agent network.
+        """
+        return "".join(self.iterate_chunks(agents, agent_network_name))
+
+    def write(self, stream: TextIO, agents: Agents, agent_network_name: str) -> int:
+        """
+        :param stream: The text stream to write to, e.g. an open file.
+        :param agents: The agents, as a dictionary keyed by agent name or (agent_name, agent) tuples.
+        :param agent_network_name: The name of the agent network.
+        :return: The number of characters written.
+        """
+        written = 0
+        for chunk in self.iterate_chunks(agents, agent_network_name):
+            stream.write(chunk)
+            written += len(chunk)
+        return written
@@ -0,0 +1,189 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-studio SDK Software in commercial settings.
+#
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+# Answer of a leading call that was cancelled, upon which its followers call the agent again
+LEADER_CANCELLED = object()
+
+
+class AgentResponseCache:
+    """
+    In-memory cache of agent responses, meant for agent networks that are used as pure lookups,
+    where the same inquiry yields an equivalent answer.
+
+    Entries expire after a time-to-live and the cache is bounded in size, evicting the least recently
+    used entries first. Identical calls that are in flight at the same time are coalesced, so that only
+    one of them actually reaches the agent and the others wait for its answer.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, ttl_seconds: float = 300.0, max_entries: int = 256):
+        """
+        :param ttl_seconds: Number of seconds a cached response stays valid.
+        :param max_entries: Maximum number of responses kept in the cache.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Tuple, Tuple[float, Any]] = OrderedDict()
+        self._in_flight: Dict[Tuple, Future] = {}
+        # Coded tools may be invoked from different threads and event loops, so guard with a thread lock
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(
+        agent_name: str, inquiry: str, sly_data: Dict[str, Any], sly_data_keys: Optional[List[str]] = None
+    ) -> Tuple:
+        """
+        Builds the cache key for an agent call.
+
+        :param agent_name: The name of the agent that answers the inquiry.
+        :param inquiry: The inquiry sent to the agent. Case and whitespace are normalized.
+        :param sly_data: The sly_data of the call.
+        :param sly_data_keys: The sly_data keys whose values influence the answer, if any.
+        :return: A hashable key.
+        """
+        normalized_inquiry = " ".join(inquiry.split()).casefold()
+        sly_data_values = []
+        for sly_data_key in sorted(sly_data_keys or []):
+            value = json.dumps(sly_data.get(sly_data_key), sort_keys=True, default=str)
+            sly_data_values.append((sly_data_key, value))
+        return agent_name, normalized_inquiry, tuple(sly_data_values)
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        """
+        :param key: The cache key, as returned by make_key().
+        :return: The cached response, or None if there is no valid entry for the key.
+        """
+        with self._lock:
+            return self._get_locked(key)
+
+    def put(self, key: Tuple, response: Any):
+        """
+        :param key: The cache key, as returned by make_key().
+        :param response: The response to cache.
+        """
+        with self._lock:
+            self._put_locked(key, response)
+
+    async def get_or_call(
+        self, key: Tuple, call: Callable[[], Awaitable[Any]], is_cacheable: Callable[[Any], bool] = None
+    ) -> Any:
+        """
+        Returns the cached response for the key, or calls the agent to get it.
+        If an identical call is already in flight, waits for its response instead of calling again,
+        unless that call is cancelled, in which case one of the waiting calls calls the agent instead.
+
+        :param key: The cache key, as returned by make_key().
+        :param call: A coroutine function actually calling the agent.
+        :param is_cacheable: Optional predicate telling whether a response can be cached.
+                By default, any response other than None is cached.
+        :return: The response.
+        """
+        while True:
+            with self._lock:
+                response = self._get_locked(key)
+                if response is not None:
+                    return response
+                in_flight = self._in_flight.get(key)
+                if in_flight is None:
+                    # This call becomes the leader for this key
+                    leader_future = Future()
+                    self._in_flight[key] = leader_future
+                    break
+                self.coalesced += 1
+
+            # Works across threads and event loops, unlike an asyncio future
+            response = await asyncio.wrap_future(in_flight)
+            if response is not LEADER_CANCELLED:
+                return response
+            # The cancellation only concerns the leading call, so this call tries again, possibly as the leader
+
+        try:
+            response = await call()
+        except asyncio.CancelledError:
+            with self._lock:
+                del self._in_flight[key]
+            leader_future.set_result(LEADER_CANCELLED)
+            raise
+        except BaseException as exception:
+            with self._lock:
+                del self._in_flight[key]
+            leader_future.set_exception(exception)
+            # Nobody else may be waiting: retrieve the exception so that it is not reported as unhandled
+            leader_future.exception()
+            raise
+
+        with self._lock:
+            del self._in_flight[key]
+            if response is not None and (is_cacheable is None or is_cacheable(response)):
+                self._put_locked(key, response)
+        leader_future.set_result(response)
+        return response
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        :return: A dictionary of the cache counters, including the hit rate.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        """Removes all the cached responses. Counters are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def _get_locked(self, key: Tuple) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, response = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return response
+
+    def _put_locked(self, key: Tuple, response: Any):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
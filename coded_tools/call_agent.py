@@ -1,7 +1,10 @@
+import asyncio
 import logging
 import os
+import time
 from typing import Any
 from typing import Dict
+from typing import List
 from typing import Tuple
 from typing import Union
 
@@ -10,12 +13,40 @@ from neuro_san.client.streaming_input_processor import StreamingInputProcessor
 from neuro_san.interfaces.agent_session import AgentSession
 from neuro_san.interfaces.coded_tool import CodedTool
 
+from coded_tools.agent_call_guard import CALL_DEADLINE_KEY
+from coded_tools.agent_call_guard import AgentCallGuard
+from coded_tools.agent_response_cache import AgentResponseCache
+from coded_tools.chat_context_compactor import NO_COMPACTION
+from coded_tools.chat_context_compactor import ChatContextCompactor
+
 CONNECTION_TYPE = "direct"
 HOST = "localhost"
 PORT = 30012
 LOCAL_EXTERNALS_DIRECT = False
 AGENT_THINKING_PATH = "/tmp/agent_thinking.txt"  # Or wherever you want
 
+# Overall time budget of a chain of nested agent calls starting here.
+# Nested calls get whatever remains of the budget of their caller.
+CALL_BUDGET_SECONDS = 5000.0
+# Fail fast on an agent after this many consecutive timeouts, and retry it after the cool down
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_RESET_TIMEOUT_SECONDS = 30.0
+# Shared by all CallAgent instances so that the circuit of each target agent is tracked across calls
+CALL_GUARD = AgentCallGuard(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT_SECONDS)
+
+# Opt-in compaction of the conversation kept in sly_data and sent to the called agent on every turn,
+# for long-lived sessions. Policies are "none", "sliding_window", "token_budget" or "rolling_summary".
+CHAT_CONTEXT_POLICY = NO_COMPACTION
+CHAT_CONTEXT_MAX_TOKENS = 8000
+CHAT_CONTEXT_COMPACTOR = ChatContextCompactor(policy=CHAT_CONTEXT_POLICY, max_tokens=CHAT_CONTEXT_MAX_TOKENS)
+
+# Opt-in cache of responses, for agent networks used as pure lookups (e.g. policy Q&A)
+USE_RESPONSE_CACHE = False
+RESPONSE_CACHE_TTL_SECONDS = 300.0
+RESPONSE_CACHE_MAX_ENTRIES = 256
+# Shared by all CallAgent instances so that repeated inquiries are answered from memory
+RESPONSE_CACHE = AgentResponseCache(RESPONSE_CACHE_TTL_SECONDS, RESPONSE_CACHE_MAX_ENTRIES)
+
 
 class CallAgent(CodedTool):
     """
@@ -44,6 +75,11 @@ class CallAgent(CodedTool):
 
                 Keys expected for this implementation are:
                     "selected_agent" the agent that answer the query
+                    "call_deadline" optional absolute deadline (seconds since the epoch) of the
+                        chain of agent calls this call is part of. It is passed down to the called agent.
+
+                When the response cache is used, the values of the sly_data keys listed in the
+                optional "response_cache_sly_data_keys" argument are part of the cache key.
 
         :return:
             In case of successful execution:
@@ -63,31 +99,105 @@ class CallAgent(CodedTool):
         print(f"agent_name: {agent_name}")
 
         # Optional args
+        use_response_cache: bool = args.get("use_response_cache", USE_RESPONSE_CACHE)
+        response_cache_sly_data_keys: List[str] = args.get("response_cache_sly_data_keys", [])
+        call_budget_seconds: float = args.get("call_budget_seconds", CALL_BUDGET_SECONDS)
+
+        logger = logging.getLogger(self.__class__.__name__)
+        logger.info(">>>>>>>>>>>>>>>>>>>CallAgent>>>>>>>>>>>>>>>>>>")
+        logger.info("inquiry: %s", str(inquiry))
+        logger.info("agent_name: %s", str(agent_name))
+
+        deadline: float = CALL_GUARD.get_deadline(sly_data, call_budget_seconds)
+
+        async def call_agent_once() -> Union[str]:
+            return await self.call_agent_with_deadline(args, sly_data, agent_name, inquiry, deadline)
+
+        if use_response_cache:
+            cache_key = RESPONSE_CACHE.make_key(agent_name, inquiry, sly_data, response_cache_sly_data_keys)
+            response = await RESPONSE_CACHE.get_or_call(cache_key, call_agent_once, is_cacheable_response)
+            logger.info("response cache: %s", str(RESPONSE_CACHE.get_metrics()))
+        else:
+            response = await call_agent_once()
+
+        logger.info(">>>>>>>>>>>>>>>>>>>DONE !!!>>>>>>>>>>>>>>>>>>")
+        return response
+
+    # pylint: disable=too-many-locals
+    async def call_agent_with_deadline(
+        self, args: Dict[str, Any], sly_data: Dict[str, Any], agent_name: str, inquiry: str, deadline: float
+    ) -> Union[str]:
+        """
+        Calls the agent within the time remaining until the deadline, unless its circuit is open.
+
+        :param args: The arguments of the coded tool, for the optional connection settings.
+        :param sly_data: The sly_data of the call, where the agent session is kept.
+        :param agent_name: The agent that answers the inquiry.
+        :param inquiry: The inquiry for the agent.
+        :param deadline: The absolute deadline of the call, in seconds since the epoch.
+        :return: The answer from the agent, or an error message.
+        """
         connection_type: str = args.get("connection_type", CONNECTION_TYPE)
         host: int = args.get("host", HOST)
         port: int = args.get("port", PORT)
         local_externals_direct: bool = args.get("local_external_direct", LOCAL_EXTERNALS_DIRECT)
         agent_thinking_path: str = args.get("agent_thinking_path", AGENT_THINKING_PATH)
-
         logger = logging.getLogger(self.__class__.__name__)
-        logger.info(">>>>>>>>>>>>>>>>>>>CallAgent>>>>>>>>>>>>>>>>>>")
-        logger.info("inquiry: %s", str(inquiry))
-        logger.info("agent_name: %s", str(agent_name))
+
+        remaining_seconds, error = CALL_GUARD.before_call(agent_name, deadline)
+        if error:
+            logger.info("call guard: %s", str(CALL_GUARD.get_metrics().get(agent_name)))
+            return error
 
         agent_session = sly_data.get("agent_session", None)
         agent_state_info = sly_data.get("agent_state_info", None)
-        if not agent_state_info or not agent_session:
-            agent_session, agent_state_info = set_up_agent(
-                agent_name, connection_type, host, port, local_externals_direct
+
+        def set_up_and_call_agent() -> Tuple[AgentSession, Union[str], Dict[str, Any]]:
+            session, state_info = agent_session, agent_state_info
+            if not state_info or not session:
+                session, state_info = set_up_agent(agent_name, connection_type, host, port, local_externals_direct)
+            # Every call passes its own deadline down, whether the session is new or kept from an earlier call
+            propagate_deadline(state_info, deadline, remaining_seconds)
+            response, state_info = call_agent(session, state_info, inquiry, agent_thinking_path)
+            return session, response, state_info
+
+        start_time = time.monotonic()
+        try:
+            # Setting up the session and calling the agent are blocking, so run them in a thread in order to
+            # bound their duration without blocking the event loop
+            agent_session, response, agent_state_info = await asyncio.wait_for(
+                asyncio.to_thread(set_up_and_call_agent), timeout=remaining_seconds
             )
-        response, agent_state_info = call_agent(agent_session, agent_state_info, inquiry, agent_thinking_path)
+        except asyncio.TimeoutError:
+            CALL_GUARD.record_timeout(agent_name, time.monotonic() - start_time)
+            logger.info("call guard: %s", str(CALL_GUARD.get_metrics().get(agent_name)))
+            # The session is still busy with the abandoned call, so a new one is needed next time
+            sly_data.pop("agent_session", None)
+            sly_data.pop("agent_state_info", None)
+            return f"Error: {agent_name} did not answer within {remaining_seconds:.1f} seconds."
+        except asyncio.CancelledError:
+            # A cancelled trial call must settle the circuit too, or it would stay half open and reject every
+            # later call. The session is still busy with the abandoned call, so a new one is needed next time.
+            CALL_GUARD.record_error(agent_name)
+            sly_data.pop("agent_session", None)
+            sly_data.pop("agent_state_info", None)
+            raise
+        except Exception:
+            CALL_GUARD.record_error(agent_name)
+            raise
+
+        CALL_GUARD.record_success(agent_name, time.monotonic() - start_time)
+        logger.info("call guard: %s", str(CALL_GUARD.get_metrics().get(agent_name)))
         sly_data["agent_session"] = agent_session
         sly_data["agent_state_info"] = agent_state_info
-
-        logger.info(">>>>>>>>>>>>>>>>>>>DONE !!!>>>>>>>>>>>>>>>>>>")
         return response
 
 
+def is_cacheable_response(response: Any) -> bool:
+    """Only actual answers are cached, not missing responses nor errors."""
+    return isinstance(response, str) and response.strip() != "" and not response.startswith("Error:")
+
+
 def set_up_agent(
     agent_name: str, connection_type: str, host: int, port: int, local_externals_direct: bool
 ) -> Tuple[AgentSession, Dict[str, Any]]:
@@ -102,7 +212,7 @@ def set_up_agent(
     agent_state_info = {
         "last_chat_response": None,
         "prompt": "Please enter your response ('quit' to terminate):\n",
-        "timeout": 5000.0,
+        "timeout": CALL_BUDGET_SECONDS,
         "num_input": 0,
         "user_input": None,
         "sly_data": None,
@@ -111,6 +221,21 @@ def set_up_agent(
     return agent_session, agent_state_info
 
 
+def propagate_deadline(agent_state_info: Dict[str, Any], deadline: float, remaining_seconds: float):
+    """
+    Passes the deadline of the call down to the called agent network, so that its own nested calls
+    only get what remains of the budget.
+
+    :param agent_state_info: The conversation state of the called agent.
+    :param deadline: The absolute deadline of the call, in seconds since the epoch.
+    :param remaining_seconds: The budget remaining until the deadline.
+    """
+    agent_state_info["timeout"] = remaining_seconds
+    agent_sly_data = agent_state_info.get("sly_data") or {}
+    agent_sly_data[CALL_DEADLINE_KEY] = deadline
+    agent_state_info["sly_data"] = agent_sly_data
+
+
 def call_agent(
     agent_session: AgentSession, agent_state_info: Dict[str, Any], user_input: str, agent_thinking_path: str
 ) -> Tuple[Union[str], Dict[str, Any]]:
@@ -142,6 +267,11 @@ def call_agent(
     )
     # Update the conversation state with this turn's input
     agent_state_info["user_input"] = user_input
+    tokens_saved = CHAT_CONTEXT_COMPACTOR.compact(agent_state_info)
+    if tokens_saved:
+        logging.getLogger("CallAgent").info(
+            "compacted chat context: %d tokens saved. %s", tokens_saved, str(CHAT_CONTEXT_COMPACTOR.get_metrics())
+        )
     agent_state_info = input_processor.process_once(agent_state_info)
     # Get the agent response for this turn
     last_chat_response = agent_state_info.get("last_chat_response")
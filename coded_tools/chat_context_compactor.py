@@ -0,0 +1,182 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-studio SDK Software in commercial settings.
+#
+import re
+from typing import Any
+from typing import Dict
+from typing import List
+
+NO_COMPACTION = "none"
+SLIDING_WINDOW = "sliding_window"
+TOKEN_BUDGET = "token_budget"
+ROLLING_SUMMARY = "rolling_summary"
+POLICIES = (NO_COMPACTION, SLIDING_WINDOW, TOKEN_BUDGET, ROLLING_SUMMARY)
+
+# Rough number of characters per token, good enough to budget prompts without a tokenizer
+CHARS_PER_TOKEN = 4
+SUMMARY_PREFIX = "Summary of the earlier conversation:"
+
+# Regex to find the end of the first sentence of a message
+SENTENCE_END_REGEX = r"(?<=[.!?])\s"
+
+
+class ChatContextCompactor:
+    """
+    Keeps the chat_context of long-lived agent conversations bounded.
+
+    The chat_context is what a client passes back to the agent network on every turn so that the
+    conversation continues, so its chat histories grow with every turn. This class compacts them
+    before each turn according to one of the following policies:
+        "none" keeps the whole conversation.
+        "sliding_window" keeps the exchanges among the last max_messages messages of each chat history.
+        "token_budget" drops the oldest exchanges until a chat history fits in max_tokens.
+        "rolling_summary" is like "token_budget", but folds the dropped messages into a short
+            extractive summary message kept at the start of the chat history.
+    An exchange is a human message with everything that answered it, tool calls and their results included,
+    so messages are only ever dropped by whole exchanges. System messages are always kept,
+    and so is the most recent exchange.
+    """
+
+    def __init__(
+        self,
+        policy: str = NO_COMPACTION,
+        max_messages: int = 20,
+        max_tokens: int = 4000,
+        summary_max_tokens: int = 500,
+    ):
+        """
+        :param policy: One of the policies above.
+        :param max_messages: Number of messages kept per chat history by the "sliding_window" policy.
+        :param max_tokens: Token budget of each chat history for the "token_budget" and "rolling_summary" policies.
+        :param summary_max_tokens: Token budget of the summary message of the "rolling_summary" policy.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown compaction policy: '{policy}'. Expected one of {POLICIES}.")
+        self.policy = policy
+        self.max_messages = max_messages
+        self.max_tokens = max_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self.compactions = 0
+        self.tokens_saved = 0
+
+    def compact(self, state_info: Dict[str, Any]) -> int:
+        """
+        Compacts the chat_context of a conversation state in place.
+
+        :param state_info: The conversation state passed to the StreamingInputProcessor.
+        :return: The estimated number of tokens saved on this turn.
+        """
+        chat_context = state_info.get("chat_context")
+        if self.policy == NO_COMPACTION or not chat_context:
+            return 0
+
+        saved = 0
+        compacted_any = False
+        for chat_history in chat_context.get("chat_histories", []):
+            messages = chat_history.get("messages", [])
+            compacted = self.compact_messages(messages)
+            if compacted != messages:
+                saved += estimate_tokens(messages) - estimate_tokens(compacted)
+                chat_history["messages"] = compacted
+                compacted_any = True
+
+        if compacted_any:
+            self.compactions += 1
+            self.tokens_saved += saved
+        return saved
+
+    def compact_messages(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        :param messages: The messages of a chat history, oldest first.
+        :return: The messages to keep, oldest first.
+        """
+        system_messages = [message for message in messages if message.get("type") == "SYSTEM"]
+        others = [message for message in messages if message.get("type") != "SYSTEM"]
+
+        if self.policy == SLIDING_WINDOW:
+            budget = self.max_messages
+            get_size = len
+        else:
+            budget = self.max_tokens - estimate_tokens(system_messages)
+            if self.policy == ROLLING_SUMMARY:
+                # Leave room for the summary so that the whole chat history stays within max_tokens
+                budget -= self.summary_max_tokens
+            get_size = estimate_tokens
+
+        kept_exchanges = []
+        used = 0
+        for exchange in reversed(get_exchanges(others)):
+            size = get_size(exchange)
+            if kept_exchanges and used + size > budget:
+                break
+            kept_exchanges.insert(0, exchange)
+            used += size
+
+        kept = [message for exchange in kept_exchanges for message in exchange]
+        dropped = others[: len(others) - len(kept)]
+        if self.policy == ROLLING_SUMMARY and dropped:
+            return system_messages + [self.summarize(dropped)] + kept
+        return system_messages + kept
+
+    def summarize(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Builds an extractive summary of messages without calling any LLM:
+        the first sentence of each message, most recent ones first, up to the summary budget.
+        A previous summary is folded into the new one.
+
+        :param messages: The messages to summarize, oldest first.
+        :return: A single message holding the summary.
+        """
+        budget_chars = self.summary_max_tokens * CHARS_PER_TOKEN
+        lines = []
+        used = len(SUMMARY_PREFIX)
+        for message in reversed(messages):
+            text = message.get("text", "") or ""
+            if text.startswith(SUMMARY_PREFIX):
+                # Keep the most recent part of the previous summary that still fits
+                previous_lines = text[len(SUMMARY_PREFIX) :].strip().split("\n")
+                candidates = list(reversed(previous_lines))
+            else:
+                first_sentence = re.split(SENTENCE_END_REGEX, text.strip(), maxsplit=1)[0]
+                candidates = [f"{message.get('type', 'AI')}: {first_sentence}"]
+            for line in candidates:
+                if not line or used + len(line) + 1 > budget_chars:
+                    continue
+                lines.insert(0, line)
+                used += len(line) + 1
+
+        return {"type": "AI", "text": SUMMARY_PREFIX + "\n" + "\n".join(lines)}
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        :return: A dictionary with the policy, number of compacted turns and estimated tokens saved.
+        """
+        return {"policy": self.policy, "compactions": self.compactions, "tokens_saved": self.tokens_saved}
+
+
+def get_exchanges(messages: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """
+    :param messages: The messages of a chat history, oldest first, without system messages.
+    :return: The messages grouped by exchange, each starting with a human message,
+            except for the messages before the first one, oldest first.
+    """
+    exchanges = []
+    for message in messages:
+        if not exchanges or message.get("type") == "HUMAN":
+            exchanges.append([])
+        exchanges[-1].append(message)
+    return exchanges
+
+
+def estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+    """
+    :param messages: A list of chat messages.
+    :return: An estimate of the number of tokens of their text.
+    """
+    return sum(len(message.get("text", "") or "") for message in messages) // CHARS_PER_TOKEN
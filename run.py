@@ -10,17 +10,368 @@
 import argparse
 import glob
 import os
+import queue
+import selectors
 import signal
 import socket
 import subprocess
 import sys
 import threading
 import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
+from typing import Callable
 from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
 
 from dotenv import load_dotenv
 
+# Readiness probes are retried with exponential backoff: first delay, growth factor and maximum delay, in seconds
+PROBE_INITIAL_DELAY_SECONDS = 0.05
+PROBE_BACKOFF_FACTOR = 2.0
+PROBE_MAX_DELAY_SECONDS = 2.0
+PROBE_REQUEST_TIMEOUT_SECONDS = 1.0
+# Answers 200 once the Neuro SAN server is ready to serve requests. The server answers /healthz the same way,
+# but /readyz is the probe meant to tell when it can take traffic, should the two ever differ.
+SERVER_READY_PATH = "/readyz"
+
+# The output of the processes is read in chunks of this size, and written to log files buffered by this size
+OUTPUT_CHUNK_BYTES = 64 * 1024
+# Log files are flushed at least this often, and the lines not shown on the console reported this often
+LOG_FLUSH_INTERVAL_SECONDS = 0.5
+DROPPED_LINES_REPORT_INTERVAL_SECONDS = 5.0
+# Output without a newline for longer than this, e.g. binary output, is logged as a line of its own
+MAX_LINE_BYTES = 64 * 1024
+# How long to wait for the output of stopped processes to be logged
+OUTPUT_CLOSE_TIMEOUT_SECONDS = 2.0
+
+
+class RotatingLogFile:
+    """Buffered log file, rotated to numbered backups when it grows past a maximum size."""
+
+    def __init__(self, path: str, max_bytes: int, backup_count: int):
+        """
+        Create the log file, or truncate it if it exists.
+        :param path: The path of the log file.
+        :param max_bytes: The size past which the file is rotated, 0 to never rotate it.
+        :param backup_count: The number of rotated files kept, from path.1, the most recent, to path.<backup_count>.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.size = 0
+        self.file = self.open()
+
+    def open(self):
+        """
+        Open the log file, truncated.
+        :return: The file, buffered.
+        """
+        return open(self.path, "wb", buffering=OUTPUT_CHUNK_BYTES)
+
+    def write(self, data: bytes):
+        """
+        Write to the log file, rotating it whenever the data would make it too large. Data larger than the room left,
+        such as a whole chunk of output, is split after its last line that fits, so only a single line larger than
+        max_bytes, at most MAX_LINE_BYTES, makes a file grow past it.
+        :param data: Whole lines.
+        """
+        while self.max_bytes and self.size + len(data) > self.max_bytes:
+            fitting_bytes = data.rfind(b"\n", 0, max(self.max_bytes - self.size, 0)) + 1
+            if fitting_bytes:
+                self.file.write(data[:fitting_bytes])
+                self.size += fitting_bytes
+                data = data[fitting_bytes:]
+            elif not self.size:
+                break
+            self.rotate()
+        self.file.write(data)
+        self.size += len(data)
+
+    def rotate(self):
+        """Rename the log file and its backups to the next backup numbers, dropping the oldest one."""
+        self.file.close()
+        for index in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{index}"):
+                os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+        if self.backup_count:
+            os.replace(self.path, f"{self.path}.1")
+        self.file = self.open()
+        self.size = 0
+
+    def flush(self):
+        """Write the buffered data to the log file."""
+        self.file.flush()
+
+    def close(self):
+        """Flush and close the log file."""
+        self.file.close()
+
+
+class OutputStream:
+    """The stdout or stderr of a process, with the counts of what it wrote."""
+
+    # pylint: disable=too-many-instance-attributes,too-few-public-methods
+    def __init__(self, name: str, stream_name: str, pipe, log: RotatingLogFile):
+        """
+        :param name: The name of the process, which prefixes its lines.
+        :param stream_name: "stdout" or "stderr".
+        :param pipe: The pipe the process writes to, in binary mode.
+        :param log: The log file of the process.
+        """
+        self.name = name
+        self.stream_name = stream_name
+        self.pipe = pipe
+        self.log = log
+        self.prefix = f"{name}: ".encode("utf-8")
+        # The end of the output read, after its last newline
+        self.partial_line = b""
+        self.bytes = 0
+        self.lines = 0
+        self.dropped_console_lines = 0
+
+
+class OutputMultiplexer:
+    """
+    Stream the output of all the processes to the console and to their log files from a single thread.
+
+    On POSIX systems, the thread waits on all the pipes at once with a selector. Pipes cannot be selected on Windows,
+    so a thread per pipe reads them there, and queues what it reads to the same thread.
+    Each chunk read is written to the log file of its process in one go, and the console written once per wake up,
+    optionally at most `console_max_lines_per_second` lines per second, the others only going to the log files.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, log_max_bytes: int, log_backup_count: int, console_max_lines_per_second: float):
+        """
+        :param log_max_bytes: The size past which log files are rotated, 0 to never rotate them.
+        :param log_backup_count: The number of rotated log files kept per process.
+        :param console_max_lines_per_second: The maximum number of lines written to the console per second,
+                                             0 for no limit.
+        """
+        self.log_max_bytes = log_max_bytes
+        self.log_backup_count = log_backup_count
+        self.console_max_lines_per_second = console_max_lines_per_second
+        self.all_streams: List[OutputStream] = []
+        self.logs: List[RotatingLogFile] = []
+        # Streams added and not yet read by the multiplexer thread, and the ones it reads
+        self.new_streams: List[OutputStream] = []
+        self.open_streams: List[OutputStream] = []
+        self.lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+        self.close_deadline: Optional[float] = None
+
+        self.selector = None if os.name == "nt" else selectors.DefaultSelector()
+        if self.selector:
+            # Written to wake the selector up when streams are added or the multiplexer is closed
+            self.wakeup_read, self.wakeup_write = os.pipe()
+            self.selector.register(self.wakeup_read, selectors.EVENT_READ, None)
+        else:
+            self.chunks: queue.Queue = queue.Queue()
+
+        self.console_lines: List[bytes] = []
+        self.console_allowance = console_max_lines_per_second
+        self.console_allowance_time = time.monotonic()
+        self.dropped_console_lines = 0
+
+    def add_process(self, process: subprocess.Popen, process_name: str, log_file: str):
+        """
+        Stream the stdout and stderr of a process.
+        :param process: The process, started with binary stdout and stderr pipes.
+        :param process_name: The name of the process, which prefixes its lines.
+        :param log_file: The path of the log file of the process, truncated.
+        """
+        log = RotatingLogFile(log_file, self.log_max_bytes, self.log_backup_count)
+        log.write(f"Starting {process_name}...\n".encode("utf-8"))
+        streams = [
+            OutputStream(process_name, "stdout", process.stdout, log),
+            OutputStream(process_name, "stderr", process.stderr, log),
+        ]
+        with self.lock:
+            self.logs.append(log)
+            self.all_streams.extend(streams)
+            self.new_streams.extend(streams)
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="OutputMultiplexer", daemon=True)
+            self.thread.start()
+        self.wake_up()
+
+    def wake_up(self):
+        """Interrupt the wait of the multiplexer thread for output."""
+        if self.selector:
+            os.write(self.wakeup_write, b"\0")
+        else:
+            self.chunks.put((None, b""))
+
+    def close(self):
+        """Stream what is left of the output of the processes, waiting for them to close their pipes, and flush it."""
+        if self.close_deadline is not None:
+            return
+        self.close_deadline = time.monotonic() + OUTPUT_CLOSE_TIMEOUT_SECONDS
+        if self.thread is not None:
+            self.wake_up()
+            self.thread.join(OUTPUT_CLOSE_TIMEOUT_SECONDS + LOG_FLUSH_INTERVAL_SECONDS)
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """
+        Get the counts of what each stream wrote.
+        :return: The name of the process, the stream, its bytes and lines, and its lines not shown on the console.
+        """
+        return [
+            {
+                "process": stream.name,
+                "stream": stream.stream_name,
+                "bytes": stream.bytes,
+                "lines": stream.lines,
+                "dropped_console_lines": stream.dropped_console_lines,
+            }
+            for stream in self.all_streams
+        ]
+
+    def run(self):
+        """Stream the output until the processes close all their pipes, or until closed and its timeout passes."""
+        last_flush = time.monotonic()
+        last_report = last_flush
+        while self.close_deadline is None or (self.open_streams and time.monotonic() < self.close_deadline):
+            self.start_new_streams()
+            for stream, chunk in self.read_chunks(LOG_FLUSH_INTERVAL_SECONDS):
+                if chunk:
+                    self.write_chunk(stream, chunk)
+                else:
+                    self.end_stream(stream)
+
+            now = time.monotonic()
+            if self.dropped_console_lines and now - last_report >= DROPPED_LINES_REPORT_INTERVAL_SECONDS:
+                self.console_lines.append(
+                    f"[{self.dropped_console_lines} lines over {self.console_max_lines_per_second} lines per second"
+                    f" not shown, see the log files]\n".encode("utf-8")
+                )
+                self.dropped_console_lines = 0
+                last_report = now
+            self.write_console()
+            if now - last_flush >= LOG_FLUSH_INTERVAL_SECONDS:
+                for log in self.logs:
+                    log.flush()
+                last_flush = now
+
+        for stream in self.open_streams:
+            self.write_lines(stream, [stream.partial_line] if stream.partial_line else [])
+        self.write_console()
+        for log in self.logs:
+            log.close()
+        if self.selector:
+            self.selector.close()
+            os.close(self.wakeup_read)
+            os.close(self.wakeup_write)
+
+    def start_new_streams(self):
+        """Start reading the streams added since the last call."""
+        with self.lock:
+            new_streams, self.new_streams = self.new_streams, []
+        for stream in new_streams:
+            self.open_streams.append(stream)
+            if self.selector:
+                self.selector.register(stream.pipe.fileno(), selectors.EVENT_READ, stream)
+            else:
+                threading.Thread(target=self.read_pipe, args=(stream,), daemon=True).start()
+
+    def read_pipe(self, stream: OutputStream):
+        """
+        Queue the output of a stream until its end, on Windows.
+        :param stream: The stream.
+        """
+        for chunk in iter(lambda: stream.pipe.read1(OUTPUT_CHUNK_BYTES), b""):
+            self.chunks.put((stream, chunk))
+        self.chunks.put((stream, b""))
+
+    def read_chunks(self, timeout: float) -> List[Tuple[OutputStream, bytes]]:
+        """
+        Wait for output from any of the streams, and read it.
+        :param timeout: The maximum seconds to wait.
+        :return: The streams that wrote, with what they wrote, empty when a stream ended.
+        """
+        if not self.selector:
+            chunks = []
+            try:
+                chunks.append(self.chunks.get(timeout=timeout))
+                while True:
+                    chunks.append(self.chunks.get_nowait())
+            except queue.Empty:
+                pass
+            return [(stream, chunk) for stream, chunk in chunks if stream is not None]
+
+        chunks = []
+        for key, _ in self.selector.select(timeout):
+            if key.data is None:
+                os.read(self.wakeup_read, OUTPUT_CHUNK_BYTES)
+            else:
+                chunks.append((key.data, os.read(key.fd, OUTPUT_CHUNK_BYTES)))
+        return chunks
+
+    def write_chunk(self, stream: OutputStream, chunk: bytes):
+        """
+        Write the complete lines of a chunk of output, keeping the partial line at its end for the next chunk.
+        :param stream: The stream the chunk was read from.
+        :param chunk: The chunk.
+        """
+        stream.bytes += len(chunk)
+        lines = (stream.partial_line + chunk).split(b"\n")
+        stream.partial_line = lines.pop()
+        if len(stream.partial_line) > MAX_LINE_BYTES:
+            lines.append(stream.partial_line)
+            stream.partial_line = b""
+        self.write_lines(stream, lines)
+
+    def write_lines(self, stream: OutputStream, lines: List[bytes]):
+        """
+        Write lines to the log file of their process, and to the console within the rate limit.
+        :param stream: The stream the lines were read from.
+        :param lines: The lines, without their newline.
+        """
+        if not lines:
+            return
+        formatted = [stream.prefix + line.rstrip(b"\r") + b"\n" for line in lines]
+        stream.lines += len(formatted)
+        stream.log.write(b"".join(formatted))
+
+        shown = len(formatted)
+        if self.console_max_lines_per_second:
+            # Token bucket: the allowance grows back at the rate limit, up to one second worth of lines
+            now = time.monotonic()
+            self.console_allowance = min(
+                self.console_max_lines_per_second,
+                self.console_allowance + (now - self.console_allowance_time) * self.console_max_lines_per_second,
+            )
+            self.console_allowance_time = now
+            shown = min(shown, int(self.console_allowance))
+            self.console_allowance -= shown
+        self.console_lines.extend(formatted[:shown])
+        stream.dropped_console_lines += len(formatted) - shown
+        self.dropped_console_lines += len(formatted) - shown
+
+    def end_stream(self, stream: OutputStream):
+        """
+        Stop reading a stream the process closed, writing its last line if it did not end with a newline.
+        :param stream: The stream.
+        """
+        self.write_lines(stream, [stream.partial_line] if stream.partial_line else [])
+        stream.partial_line = b""
+        if self.selector:
+            self.selector.unregister(stream.pipe.fileno())
+        stream.pipe.close()
+        self.open_streams.remove(stream)
+
+    def write_console(self):
+        """Write the lines shown on the console since the last call, at once."""
+        if self.console_lines:
+            sys.stdout.write(b"".join(self.console_lines).decode("utf-8", errors="replace"))
+            sys.stdout.flush()
+            self.console_lines = []
+
 
 class NeuroSanRunner:
     """Command-line tool to run the Neuro SAN server and web client."""
@@ -63,6 +414,10 @@ class NeuroSanRunner:
                 "AGENT_TOOLBOX_INFO_FILE", os.path.join(self.root_dir, "toolbox", "toolbox_info.hocon")
             ),
             "logs_dir": self.logs_dir,
+            "startup_timeout": float(os.getenv("STARTUP_TIMEOUT_SECONDS", "60")),
+            "log_max_bytes": int(os.getenv("LOG_MAX_BYTES", str(50 * 1024 * 1024))),
+            "log_backup_count": int(os.getenv("LOG_BACKUP_COUNT", "3")),
+            "console_max_lines_per_second": float(os.getenv("CONSOLE_MAX_LINES_PER_SECOND", "0")),
         }
 
         # Ensure logs directory exists
@@ -76,6 +431,12 @@ class NeuroSanRunner:
         self.server_process = None
         self.flask_webclient_process = None
         self.nsflow_process = None
+        # When each process was started, to measure its time to ready
+        self.start_times: Dict[str, float] = {}
+        # Streams the output of all the processes to the console and their log files
+        self.output_multiplexer = OutputMultiplexer(
+            self.args["log_max_bytes"], self.args["log_backup_count"], self.args["console_max_lines_per_second"]
+        )
 
     def load_env_variables(self):
         """Load .env file from project root and set variables."""
@@ -133,6 +494,31 @@ class NeuroSanRunner:
         parser.add_argument(
             "--use-flask-web-client", action="store_true", help="Use the flask based neuro-san-web-client"
         )
+        parser.add_argument(
+            "--startup-timeout",
+            type=float,
+            default=self.args["startup_timeout"],
+            help="Seconds to wait for all the processes to be ready before stopping them",
+        )
+        parser.add_argument(
+            "--log-max-bytes",
+            type=int,
+            default=self.args["log_max_bytes"],
+            help="Size in bytes past which the log files of the processes are rotated, 0 to never rotate them",
+        )
+        parser.add_argument(
+            "--log-backup-count",
+            type=int,
+            default=self.args["log_backup_count"],
+            help="Number of rotated log files kept per process",
+        )
+        parser.add_argument(
+            "--console-max-lines-per-second",
+            type=float,
+            default=self.args["console_max_lines_per_second"],
+            help="Maximum number of lines of process output shown on the console per second, 0 for no limit."
+            " The log files get all the lines",
+        )
 
         args, _ = parser.parse_known_args()
         explicitly_passed_args = {arg for arg in sys.argv[1:] if arg.startswith("--")}
@@ -218,43 +604,24 @@ class NeuroSanRunner:
                 if result.stderr:
                     print(result.stderr, file=sys.stderr)
 
-    @staticmethod
-    def stream_output(pipe, log_file, prefix):
-        """Stream subprocess output to console and log file in real-time."""
-        with open(log_file, "a", encoding="utf-8") as log:
-            for line in iter(pipe.readline, ""):
-                formatted_line = f"{prefix}: {line.strip()}"
-                print(formatted_line)  # Print to console
-                log.write(formatted_line + "\n")  # Write to log file
-        pipe.close()
-
     def start_process(self, command, process_name, log_file):
         """Start a subprocess and capture logs."""
         creation_flags = subprocess.CREATE_NEW_PROCESS_GROUP if self.is_windows else 0
 
-        # Initialize/clear the log file before starting
-        with open(log_file, "w", encoding="utf-8") as log:
-            log.write(f"Starting {process_name}...\n")
-
         # pylint: disable=consider-using-with
         process = subprocess.Popen(
             command,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1,
-            universal_newlines=True,
             start_new_session=not self.is_windows,
             creationflags=creation_flags,
         )
 
+        self.start_times[process_name] = time.monotonic()
         print(f"Started {process_name} with PID {process.pid}")
 
-        # Start streaming logs in separate threads
-        stdout_thread = threading.Thread(target=self.stream_output, args=(process.stdout, log_file, process_name))
-        stderr_thread = threading.Thread(target=self.stream_output, args=(process.stderr, log_file, process_name))
-        stdout_thread.start()
-        stderr_thread.start()
+        # Stream its output, which the log file starts with
+        self.output_multiplexer.add_process(process, process_name, log_file)
 
         return process
 
@@ -316,7 +683,11 @@ class NeuroSanRunner:
     def signal_handler(self, signum, frame):
         """Handle termination signals to cleanly exit."""
         print("\nTermination signal received. Stopping all processes...")
+        self.stop_processes()
+        sys.exit(0)
 
+    def stop_processes(self):
+        """Stop all the processes started."""
         if self.server_process:
             print(f"\nStopping SERVER (PID {self.server_process.pid})...")
             if self.is_windows:
@@ -338,7 +709,16 @@ class NeuroSanRunner:
             else:
                 os.killpg(os.getpgid(self.nsflow_process.pid), signal.SIGKILL)
 
-        sys.exit(0)
+        self.close_output()
+
+    def close_output(self):
+        """Log the rest of the output of the processes, and print how much each of their streams wrote."""
+        if self.output_multiplexer.close_deadline is not None:
+            return
+        self.output_multiplexer.close()
+        for stats in self.output_multiplexer.get_stats():
+            dropped = f", {stats['dropped_console_lines']} not shown" if stats["dropped_console_lines"] else ""
+            print(f"{stats['process']} {stats['stream']}: {stats['bytes']} bytes, {stats['lines']} lines{dropped}")
 
     def is_port_open(self, host: str, port: int, timeout=1.0) -> bool:
         """
@@ -354,6 +734,75 @@ class NeuroSanRunner:
             except (ConnectionRefusedError, TimeoutError, OSError):
                 return False
 
+    @staticmethod
+    def is_http_ready(url: str, require_success: bool = False) -> bool:
+        """
+        Check if an HTTP endpoint answers.
+        :param url: The URL of the endpoint.
+        :param require_success: True to only accept a 2xx answer, False to accept any answer but a server error.
+        :return: True if the endpoint answered as required, False otherwise.
+        """
+        try:
+            with urllib.request.urlopen(url, timeout=PROBE_REQUEST_TIMEOUT_SECONDS) as response:
+                return 200 <= response.status < 300 or not require_success
+        except urllib.error.HTTPError as e:
+            return e.code < 500 and not require_success
+        except (urllib.error.URLError, TimeoutError, OSError):
+            return False
+
+    def wait_until_ready(
+        self,
+        process_name: str,
+        process: subprocess.Popen,
+        probes: List[Callable[[], bool]],
+        deadline: float,
+        failed: threading.Event,
+    ) -> Optional[float]:
+        """
+        Poll the readiness probes of a process, with exponential backoff, until they all pass.
+        :param process_name: The name the process was started with.
+        :param process: The process.
+        :param probes: The checks that must all pass for the process to be ready, cheapest first.
+        :param deadline: The time.monotonic() after which to give up.
+        :param failed: Set when a process is not ready in time, so that the others stop waiting.
+        :return: The seconds from the start of the process until it was ready, or None if it was not ready in time.
+        """
+        delay = PROBE_INITIAL_DELAY_SECONDS
+        while not failed.is_set() and process.poll() is None:
+            if all(probe() for probe in probes):
+                return time.monotonic() - self.start_times[process_name]
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(delay, remaining))
+            delay = min(delay * PROBE_BACKOFF_FACTOR, PROBE_MAX_DELAY_SECONDS)
+        failed.set()
+        return None
+
+    def wait_for_readiness(self, components: List[Tuple[str, subprocess.Popen, List[Callable[[], bool]]]]):
+        """
+        Wait for all the processes started to be ready, in parallel, and print the time each took.
+        Stop them all and exit if any of them exits or is not ready within the startup timeout.
+        :param components: The name, process and readiness probes of each process started.
+        """
+        deadline = time.monotonic() + self.args["startup_timeout"]
+        failed = threading.Event()
+        with ThreadPoolExecutor(max_workers=max(len(components), 1)) as executor:
+            ready_times = list(
+                executor.map(lambda component: self.wait_until_ready(*component, deadline, failed), components)
+            )
+        for (process_name, process, _), ready_time in zip(components, ready_times):
+            if ready_time is not None:
+                print(f"{process_name} ready in {ready_time:.2f} seconds.")
+            elif process.poll() is not None:
+                print(f"{process_name} exited with code {process.returncode} before being ready.")
+            elif time.monotonic() >= deadline:
+                print(f"{process_name} was not ready after {self.args['startup_timeout']} seconds.")
+        if failed.is_set():
+            print(f"Stopping all processes, see the logs in {self.logs_dir}.")
+            self.stop_processes()
+            sys.exit(1)
+
     def _check_port_conflicts(self) -> list[str]:
         """Check if any of the ports are in use."""
         port_conflicts = []
@@ -400,20 +849,51 @@ class NeuroSanRunner:
             print("=" * 50 + "\nExiting due to port conflicts.\n")
             sys.exit(1)
 
-        # Start services only if ports are free
+        # Start services only if ports are free, the server first as it takes the longest to be ready,
+        # then wait for them all to be ready at the same time
+        components = []
+        if not client_only:
+            self.start_neuro_san()
+            server_host = self.args["server_host"]
+            ready_url = f"http://{server_host}:{self.args['server_http_port']}{SERVER_READY_PATH}"
+            components.append(
+                (
+                    "NeuroSan",
+                    self.server_process,
+                    [
+                        lambda: self.is_port_open(server_host, self.args["server_grpc_port"]),
+                        lambda: self.is_port_open(server_host, self.args["server_http_port"]),
+                        lambda: self.is_http_ready(ready_url, require_success=True),
+                    ],
+                )
+            )
+
         if not server_only:
             if use_flask:
                 if not no_html:
                     self.generate_html_files()
                 self.start_flask_web_client()
-                print("Flask web-client is now running.")
+                client_name, client_process = "FlaskWebClient", self.flask_webclient_process
+                client_host, client_port = "localhost", self.args["web_client_port"]
             else:
                 self.start_nsflow()
-                print("nsflow client is now running.")
+                client_name, client_process = "nsflow", self.nsflow_process
+                client_host, client_port = self.args["nsflow_host"], self.args["nsflow_port"]
+            components.append(
+                (
+                    client_name,
+                    client_process,
+                    [
+                        lambda: self.is_port_open(client_host, client_port),
+                        lambda: self.is_http_ready(f"http://{client_host}:{client_port}/"),
+                    ],
+                )
+            )
 
+        self.wait_for_readiness(components)
+        if not server_only:
+            print("Flask web-client is now running." if use_flask else "nsflow client is now running.")
         if not client_only:
-            self.start_neuro_san()
-            time.sleep(3)
             print("Neuro-San server is now running.")
 
     def run(self):
@@ -446,6 +926,7 @@ class NeuroSanRunner:
             self.server_process.wait()
         if self.flask_webclient_process:
             self.flask_webclient_process.wait()
+        self.close_output()
 
 
 if __name__ == "__main__":
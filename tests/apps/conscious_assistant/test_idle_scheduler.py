@@ -0,0 +1,101 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-studio SDK Software in commercial settings.
+#
+import asyncio
+import queue
+import time
+from unittest import TestCase
+from unittest.mock import patch
+
+from apps.conscious_assistant.idle_scheduler import IdleThoughtScheduler
+
+
+class TestIdleThoughtScheduler(TestCase):
+    """
+    Unit tests for the scheduling of the idle thoughts of the conscious assistant.
+    """
+
+    def test_silence_backs_off_up_to_the_maximum(self):
+        """
+        Tests that each turn without user input doubles the wait, up to the maximum interval.
+        """
+        scheduler = IdleThoughtScheduler(min_interval_seconds=0.01, max_interval_seconds=0.04)
+        user_input_queue = queue.Queue()
+
+        intervals = []
+        for _ in range(4):
+            self.assertIsNone(scheduler.wait_for_input(user_input_queue))
+            intervals.append(scheduler.interval_seconds)
+
+        self.assertEqual([0.02, 0.04, 0.04, 0.04], intervals)
+        self.assertEqual(4, scheduler.idle_turns)
+
+    def test_input_wakes_up_and_resets_the_wait(self):
+        """
+        Tests that user input is returned without waiting for the interval to elapse,
+        and that it resets the wait to the minimum interval.
+        """
+        scheduler = IdleThoughtScheduler(min_interval_seconds=0.01, max_interval_seconds=60.0, backoff=10.0)
+        user_input_queue = queue.Queue()
+        scheduler.wait_for_input(user_input_queue)
+        scheduler.wait_for_input(user_input_queue)
+        self.assertEqual(1.0, round(scheduler.interval_seconds, 6))
+
+        user_input_queue.put("hello")
+        started = time.monotonic()
+        self.assertEqual("hello", scheduler.wait_for_input(user_input_queue))
+
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(0.01, scheduler.interval_seconds)
+        self.assertEqual(1, scheduler.input_turns)
+
+    def test_async_wait_for_input(self):
+        """
+        Tests that the asyncio flavor backs off on silence and resets on input the same way.
+        """
+        scheduler = IdleThoughtScheduler(min_interval_seconds=0.01, max_interval_seconds=0.04)
+
+        async def converse():
+            user_input_queue = asyncio.Queue()
+            silences = [await scheduler.async_wait_for_input(user_input_queue) for _ in range(3)]
+            backed_off_interval = scheduler.interval_seconds
+            await user_input_queue.put("hello")
+            return silences, backed_off_interval, await scheduler.async_wait_for_input(user_input_queue)
+
+        silences, backed_off_interval, user_input = asyncio.run(converse())
+
+        self.assertEqual([None, None, None], silences)
+        self.assertEqual(0.04, backed_off_interval)
+        self.assertEqual("hello", user_input)
+        self.assertEqual(0.01, scheduler.interval_seconds)
+        self.assertEqual({"idle_turns": 3, "input_turns": 1}, self.subset(scheduler.get_metrics()))
+
+    @patch("apps.conscious_assistant.idle_scheduler.time")
+    def test_llm_calls_saved_per_hour(self, mock_time):
+        """
+        Tests that the calls saved are counted against thinking every min_interval_seconds.
+        """
+        mock_time.monotonic.return_value = 0.0
+        scheduler = IdleThoughtScheduler(min_interval_seconds=10.0)
+        scheduler.idle_turns = 40
+        scheduler.input_turns = 20
+        # An hour later, thinking every 10 seconds would have made 360 calls, of which 60 were made
+        mock_time.monotonic.return_value = 3600.0
+
+        metrics = scheduler.get_metrics()
+
+        self.assertEqual(60.0, metrics["llm_calls_per_hour"])
+        self.assertEqual(300.0, metrics["llm_calls_saved_per_hour"])
+
+    @staticmethod
+    def subset(metrics):
+        """
+        :return: The turn counts of the metrics, which do not depend on the time elapsed.
+        """
+        return {key: metrics[key] for key in ("idle_turns", "input_turns")}
@@ -0,0 +1,102 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-studio SDK Software in commercial settings.
+#
+from unittest import TestCase
+
+from apps.cruse.gui_context_diff import CHANGED_KEY
+from apps.cruse.gui_context_diff import REMOVED_KEY
+from apps.cruse.gui_context_diff import GuiContextTracker
+from apps.cruse.gui_context_diff import apply_gui_context_diff
+from apps.cruse.gui_context_diff import diff_gui_context
+from apps.cruse.gui_context_diff import get_gui_context_hash
+from apps.cruse.gui_context_diff import merge_gui_context
+
+
+class TestGuiContextDiff(TestCase):
+    """
+    Unit tests for the gui context diffs sent to the cruse agent.
+    """
+
+    def test_diff_round_trip(self):
+        """
+        Tests that applying the diff of two gui contexts to the first one gives the second one,
+        including nested fields, removed fields and fields named like the keys of a diff would be in plain words.
+        """
+        previous = {
+            "name": "Ada",
+            "changed": "yes",
+            "removed": ["a", "b"],
+            "address": {"city": "London", "zip": "N1"},
+            "notes": "old",
+        }
+        current = {
+            "name": "Ada",
+            "changed": "no",
+            "removed": ["a"],
+            "address": {"city": "Paris"},
+            "phone": "123",
+        }
+        diff = diff_gui_context(previous, current)
+        self.assertEqual(
+            diff,
+            {
+                CHANGED_KEY: {
+                    "changed": "no",
+                    "removed": ["a"],
+                    "address": {REMOVED_KEY: ["zip"], CHANGED_KEY: {"city": "Paris"}},
+                    "phone": "123",
+                },
+                REMOVED_KEY: ["notes"],
+            },
+        )
+        self.assertEqual(apply_gui_context_diff(previous, diff), current)
+        self.assertEqual(diff_gui_context(current, current), {})
+
+    def test_merge_gui_context(self):
+        """
+        Tests that later values of a burst win and nested dictionaries are merged.
+        """
+        merged = merge_gui_context({"a": 1, "b": {"c": 2, "d": 3}}, {"a": 4, "b": {"d": 5}})
+        self.assertEqual(merged, {"a": 4, "b": {"c": 2, "d": 5}})
+        self.assertEqual(merge_gui_context({"a": 1}, {}), {"a": 1})
+
+    def test_tracker_diffs_against_last_full_context(self):
+        """
+        Tests that changes are always relative to the last gui context sent in full,
+        so that the agent never has to chain changes across turns.
+        """
+        tracker = GuiContextTracker(full_every_n_turns=3)
+        first = {"form": "x" * 200, "step": 1}
+        first_hash = get_gui_context_hash(first)
+        self.assertIn(f"#{first_hash}:", tracker.render(first))
+
+        for step in (2, 3):
+            text = tracker.render(dict(first, step=step))
+            self.assertIn(f"changes since #{first_hash}", text)
+            self.assertIn(f"'{CHANGED_KEY}': {{'step': {step}}}", text)
+        self.assertEqual(tracker.render(first), f" [gui context unchanged since #{first_hash}]")
+
+        # Every full_every_n_turns turns, the full gui context is sent again and becomes the new reference
+        second = dict(first, step=4)
+        self.assertIn(f"#{get_gui_context_hash(second)}:", tracker.render(second))
+        self.assertIn(f"changes since #{get_gui_context_hash(second)}", tracker.render(dict(second, step=5)))
+
+        metrics = tracker.get_metrics()
+        self.assertGreater(metrics["tokens_saved"], 0)
+        self.assertEqual(tracker.render({}), "")
+
+    def test_tracker_reset(self):
+        """
+        Tests that the full gui context is sent again once the agent session is replaced.
+        """
+        tracker = GuiContextTracker()
+        gui_context = {"form": "x" * 200}
+        tracker.render(gui_context)
+        tracker.reset()
+        self.assertIn(f"#{get_gui_context_hash(gui_context)}:", tracker.render(gui_context))
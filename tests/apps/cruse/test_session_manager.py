@@ -0,0 +1,145 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-studio SDK Software in commercial settings.
+#
+import asyncio
+import threading
+from unittest import IsolatedAsyncioTestCase
+from unittest import TestCase
+from unittest.mock import patch
+
+from apps.cruse.session_manager import GUI_CONTEXT
+from apps.cruse.session_manager import USER_INPUT
+from apps.cruse.session_manager import AsyncCruseSessionManager
+from apps.cruse.session_manager import CruseSessionManager
+
+
+class TestCruseSessionManager(TestCase):
+    """
+    Unit tests for the cruse session manager running turns on worker threads.
+    """
+
+    @patch("apps.cruse.session_manager.tear_down_cruse_assistant")
+    @patch("apps.cruse.session_manager.set_up_cruse_assistant", return_value=("session", {}))
+    def test_burst_is_one_turn_and_errors_are_reported(self, _set_up, _tear_down):
+        """
+        Tests that events arriving together make a single turn, and that a failed turn is reported to its client.
+        """
+        turns = []
+        errors = []
+        done = threading.Event()
+
+        def run_turn(client, user_input, gui_context):
+            turns.append((client.sid, user_input, gui_context))
+            if user_input == "boom":
+                raise RuntimeError("agent down")
+            done.set()
+
+        def report_error(client, message):
+            errors.append((client.sid, message))
+            done.set()
+
+        manager = CruseSessionManager(run_turn, "agent", coalesce_seconds=0.05, report_error=report_error)
+        try:
+            manager.post_event("sid", USER_INPUT, "hello")
+            manager.post_event("sid", GUI_CONTEXT, {"name": "Ada"})
+            self.assertTrue(done.wait(5))
+            self.assertEqual([("sid", "hello", {"name": "Ada"})], turns)
+
+            done.clear()
+            manager.post_event("sid", USER_INPUT, "boom")
+            self.assertTrue(done.wait(5))
+            self.assertEqual([("sid", "Sorry, your request failed: agent down")], errors)
+        finally:
+            manager.close_all()
+
+    @patch("apps.cruse.session_manager.tear_down_cruse_assistant")
+    @patch("apps.cruse.session_manager.set_up_cruse_assistant", return_value=("session", {}))
+    def test_exit_in_a_burst_is_a_turn_of_its_own(self, set_up, tear_down):
+        """
+        Tests that an "exit" arriving with other inputs closes the agent session between them,
+        rather than being joined with them into a single input.
+        """
+        turns = []
+        done = threading.Event()
+
+        def run_turn(client, user_input, gui_context):
+            turns.append((client.sid, user_input, gui_context))
+            if user_input == "again":
+                done.set()
+
+        manager = CruseSessionManager(run_turn, "agent", coalesce_seconds=0.05)
+        try:
+            for user_input in ("hello", "exit", "again"):
+                manager.post_event("sid", USER_INPUT, user_input)
+            self.assertTrue(done.wait(5))
+            self.assertEqual([("sid", "hello", {}), ("sid", "again", {})], turns)
+            self.assertEqual(1, tear_down.call_count)
+            self.assertEqual(2, set_up.call_count)
+        finally:
+            manager.close_all()
+
+
+class TestAsyncCruseSessionManager(IsolatedAsyncioTestCase):
+    """
+    Unit tests for the cruse session manager running turns as tasks of the event loop.
+    """
+
+    @patch("apps.cruse.session_manager.set_up_async_cruse_assistant", return_value=("session", {}))
+    async def test_turns_run_concurrently_up_to_max_concurrency(self, _set_up):
+        """
+        Tests that the turns of different clients overlap on the event loop, no more than max_concurrency at a time,
+        while the burst of each client makes a single turn.
+        """
+        running = 0
+        most_running = 0
+        turns = []
+
+        async def run_turn(client, user_input, gui_context):
+            nonlocal running, most_running
+            running += 1
+            most_running = max(most_running, running)
+            await asyncio.sleep(0.05)
+            running -= 1
+            turns.append((client.sid, user_input, gui_context))
+
+        manager = AsyncCruseSessionManager(run_turn, "agent", max_concurrency=3, coalesce_seconds=0.01)
+        for index in range(6):
+            manager.post_event(f"sid{index}", USER_INPUT, f"hello {index}")
+            manager.post_event(f"sid{index}", GUI_CONTEXT, {"index": index})
+        while len(turns) < 6:
+            await asyncio.sleep(0.01)
+
+        self.assertEqual(3, most_running)
+        self.assertEqual(
+            sorted((f"sid{index}", f"hello {index}", {"index": index}) for index in range(6)), sorted(turns)
+        )
+        self.assertEqual(6, manager.get_metrics()["turns_processed"])
+
+    @patch("apps.cruse.session_manager.set_up_async_cruse_assistant", return_value=("session", {}))
+    async def test_failed_turn_is_reported(self, _set_up):
+        """
+        Tests that a failed turn is reported to its client, and that its agent session is dropped on disconnect.
+        """
+        errors = []
+
+        async def run_turn(*_):
+            raise RuntimeError("agent down")
+
+        async def report_error(client, message):
+            errors.append((client.sid, message))
+
+        manager = AsyncCruseSessionManager(run_turn, "agent", coalesce_seconds=0.01, report_error=report_error)
+        manager.post_event("sid", USER_INPUT, "hello")
+        while not errors:
+            await asyncio.sleep(0.01)
+
+        self.assertEqual([("sid", "Sorry, your request failed: agent down")], errors)
+        self.assertEqual(1, manager.get_metrics()["agent_sessions"])
+        manager.disconnect("sid")
+        self.assertEqual(0, manager.get_metrics()["clients"])
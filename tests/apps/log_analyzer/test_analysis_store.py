@@ -0,0 +1,85 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-studio SDK Software in commercial settings.
+#
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from apps.log_analyzer.analysis_store import AnalysisCheckpointStore
+
+
+class TestAnalysisCheckpointStore(TestCase):
+    """
+    Unit tests for the store of log entry analyses.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.db_path = os.path.join(self.directory.name, "checkpoints.sqlite")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_analyses_are_reused_by_the_next_run(self):
+        """
+        Tests that a stored analysis is reused after the store is opened again, and that namespaces are separate.
+        """
+        store = AnalysisCheckpointStore(self.db_path, "agents")
+        self.assertEqual("analysis of entry", store.get_or_analyze("entry", lambda text: f"analysis of {text}"))
+        store.close()
+
+        store = AnalysisCheckpointStore(self.db_path, "agents")
+        self.assertEqual("analysis of entry", store.get_or_analyze("entry", self.fail))
+        self.assertEqual({"hits": 1, "duplicates": 0, "misses": 0, "stored": 1}, store.get_metrics())
+        store.close()
+
+        store = AnalysisCheckpointStore(self.db_path, "other agents")
+        self.assertIsNone(store.get(store.get_entry_hash("entry")))
+        store.close()
+
+    def test_failed_analyses_are_not_stored(self):
+        """
+        Tests that errors reported by the analysis are analysed again by the next call.
+        """
+        store = AnalysisCheckpointStore(self.db_path)
+        self.assertEqual("Error: agent down", store.get_or_analyze("entry", lambda _: "Error: agent down"))
+        self.assertEqual("analysis", store.get_or_analyze("entry", lambda _: "analysis"))
+        self.assertEqual(2, store.get_metrics()["misses"])
+        store.close()
+
+    def test_concurrent_duplicates_are_analysed_once(self):
+        """
+        Tests that entries with the same content, analysed at the same time, share a single analysis.
+        """
+        store = AnalysisCheckpointStore(self.db_path)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def analyze(text):
+            calls.append(text)
+            started.set()
+            release.wait(5)
+            return f"analysis of {text}"
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            first = executor.submit(store.get_or_analyze, "entry", analyze)
+            started.wait(5)
+            duplicates = [executor.submit(store.get_or_analyze, "entry", analyze) for _ in range(3)]
+            release.set()
+            results = [first.result()] + [duplicate.result() for duplicate in duplicates]
+
+        self.assertEqual(["entry"], calls)
+        self.assertEqual(["analysis of entry"] * 4, results)
+        metrics = store.get_metrics()
+        self.assertEqual(1, metrics["misses"])
+        self.assertEqual(3, metrics["hits"] + metrics["duplicates"])
+        store.close()
@@ -0,0 +1,165 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-studio SDK Software in commercial settings.
+#
+import os
+import re
+import tempfile
+from unittest import TestCase
+
+from apps.log_analyzer.analysis_store import AnalysisCheckpointStore
+from apps.log_analyzer.entry_batching import BatchingMetrics
+from apps.log_analyzer.entry_batching import analyze_batches_in_parallel
+from apps.log_analyzer.entry_batching import batch_log_entries
+from apps.log_analyzer.entry_batching import split_batch_analysis
+from apps.log_analyzer.parallel_analysis import AnalysisSessionPool
+
+ENTRIES = [
+    ("a.txt", "Prompt A", "First"),
+    ("a.txt", "Prompt A", "Second"),
+    ("a.txt", "Prompt A", "Third"),
+    ("b.txt", "Prompt B", "Fourth"),
+]
+
+
+# pylint: disable=too-few-public-methods
+class FakeAnalysisAgent:
+    """
+    Answers batches with one delimited section per entry, or with prose when told to ignore the format.
+    """
+
+    def __init__(self, follow_format: bool = True):
+        self.follow_format = follow_format
+        self.inputs = []
+
+    def __call__(self, _session, thread, analysis_input):
+        self.inputs.append(analysis_input)
+        entries = re.findall(r"^=== ENTRY \d+ ===\n(.*)$", analysis_input, re.MULTILINE)
+        if not entries:
+            return f"analysis of {analysis_input.rsplit(' ', 1)[-1]}", thread
+        if not self.follow_format:
+            return "Entry 1 looks fine. Entry 2 is fine as well.", thread
+        sections = [f"=== ENTRY {number} ===\nanalysis of {entry}" for number, entry in enumerate(entries, start=1)]
+        return "\n\n".join(sections), thread
+
+
+class TestEntryBatching(TestCase):
+    """
+    Unit tests for analysing log entries in batches.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.db_path = os.path.join(self.directory.name, "checkpoints.sqlite")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    @staticmethod
+    def analyze(agent, entries, max_entries=10, checkpoint_store=None, metrics=None):
+        """
+        :return: The (log_file, analysis) tuples of the entries, analysed in batches by the agent.
+        """
+        pool = AnalysisSessionPool(2, lambda: ("session", {}), lambda _: None)
+        batches = batch_log_entries(entries, 1000, max_entries, checkpoint_store)
+        return list(analyze_batches_in_parallel(batches, agent, pool, 2, checkpoint_store, metrics))
+
+    def test_entries_are_batched_by_system_prompt_and_size(self):
+        """
+        Tests that consecutive entries sharing a system prompt are batched, up to the maximum number of entries
+        and tokens, and that an entry too large for any batch is sent alone.
+        """
+        batches = list(batch_log_entries(ENTRIES, 1000, 2))
+        self.assertEqual([2, 1, 1], [len(batch) for batch in batches])
+        self.assertEqual(["Prompt A", "Prompt A", "Prompt B"], [batch.system_prompt for batch in batches])
+
+        entries = [("a.txt", "Prompt", "x" * 40), ("a.txt", "Prompt", "y" * 400), ("a.txt", "Prompt", "z" * 40)]
+        self.assertEqual([1, 1, 1], [len(batch) for batch in batch_log_entries(entries, 50, 10)])
+
+    def test_analysis_input_delimits_the_entries(self):
+        """
+        Tests that a batch sends its system prompt once, with a delimiter line before each entry,
+        and that a single entry is sent as it would be without batching.
+        """
+        batch = next(batch_log_entries(ENTRIES, 1000, 10))
+        analysis_input = batch.get_analysis_input()
+        self.assertEqual(1, analysis_input.count("Prompt A"))
+        self.assertIn("=== ENTRY 1 ===\nFirst", analysis_input)
+        self.assertIn("=== ENTRY 3 ===\nThird", analysis_input)
+
+        batch = list(batch_log_entries(ENTRIES, 1000, 10))[1]
+        self.assertEqual("Prompt B Fourth", batch.get_analysis_input())
+
+    def test_response_is_split_on_delimiter_lines_only(self):
+        """
+        Tests that a response is split on its delimiter lines, ignoring prose that mentions entries, and that a
+        response without exactly one section per entry, in order, is not split.
+        """
+        analysis = "=== ENTRY 1 ===\nEntry 2 is referred to here.\n=== ENTRY 2 ===\nSecond\n"
+        self.assertEqual(["Entry 2 is referred to here.", "Second"], split_batch_analysis(analysis, 2))
+        self.assertEqual(["Whole"], split_batch_analysis("Whole", 1))
+
+        self.assertIsNone(split_batch_analysis("Entry 1: fine\nEntry 2: fine", 2))
+        self.assertIsNone(split_batch_analysis("=== ENTRY 1 ===\nFirst", 2))
+        self.assertIsNone(split_batch_analysis("=== ENTRY 2 ===\nSecond\n=== ENTRY 1 ===\nFirst", 2))
+        self.assertIsNone(split_batch_analysis("=== ENTRY 1 ===\nA\n=== ENTRY 1 ===\nB\n=== ENTRY 2 ===\nC", 2))
+        self.assertIsNone(split_batch_analysis("", 2))
+
+    def test_batch_analyses_are_split_in_order(self):
+        """
+        Tests that each entry gets its own section of the response to its batch, in the order of the entries.
+        """
+        agent = FakeAnalysisAgent()
+        metrics = BatchingMetrics()
+
+        results = self.analyze(agent, ENTRIES, metrics=metrics)
+
+        expected = [(log_file, f"analysis of {entry}") for log_file, _, entry in ENTRIES]
+        self.assertEqual(expected, results)
+        self.assertEqual(2, len(agent.inputs))
+        self.assertEqual({"entries": 4, "requests": 2, "fallbacks": 0}, self.subset(metrics.get_metrics()))
+
+    def test_response_that_cannot_be_split_falls_back_to_single_entries(self):
+        """
+        Tests that the entries of a batch whose response has no delimiter lines are analysed on their own.
+        """
+        agent = FakeAnalysisAgent(follow_format=False)
+        metrics = BatchingMetrics()
+
+        results = self.analyze(agent, ENTRIES[:2], metrics=metrics)
+
+        self.assertEqual([("a.txt", "analysis of First"), ("a.txt", "analysis of Second")], results)
+        self.assertEqual(3, len(agent.inputs))
+        self.assertEqual({"entries": 2, "requests": 3, "fallbacks": 1}, self.subset(metrics.get_metrics()))
+
+    def test_analyses_are_stored_per_entry(self):
+        """
+        Tests that the analysis of each entry is stored under that entry, so that a later run batching the entries
+        differently, or not at all, only sends the entries not analysed yet.
+        """
+        store = AnalysisCheckpointStore(self.db_path)
+        self.analyze(FakeAnalysisAgent(), ENTRIES[:2], checkpoint_store=store)
+        self.assertEqual("analysis of Second", store.get(store.get_entry_hash("Prompt A Second")))
+
+        agent = FakeAnalysisAgent()
+        results = self.analyze(agent, ENTRIES, max_entries=3, checkpoint_store=store)
+
+        self.assertEqual(
+            ["analysis of First", "analysis of Second", "analysis of Third", "analysis of Fourth"],
+            [analysis for _, analysis in results],
+        )
+        self.assertEqual(["Prompt A Third", "Prompt B Fourth"], agent.inputs)
+        self.assertEqual(2, store.get_metrics()["hits"])
+        store.close()
+
+    @staticmethod
+    def subset(metrics):
+        """
+        :return: The batching metrics that do not depend on the token estimates.
+        """
+        return {key: metrics[key] for key in ("entries", "requests", "fallbacks")}
@@ -0,0 +1,102 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-studio SDK Software in commercial settings.
+#
+from unittest import TestCase
+
+from apps.log_analyzer.entry_clustering import EntryClusterer
+from apps.log_analyzer.entry_clustering import analyze_clustered_entries
+from apps.log_analyzer.entry_clustering import normalize_log_entry
+
+WEATHER_ENTRY = (
+    "[HUMAN]:\nWhat is the weather going to be like in Paris over the next few days, and should I pack an umbrella "
+    "for my trip?\n[AGENT]:\nCalling tool get_weather with call id call_1a2b3c for the city of Paris and a forecast "
+    "of several days\n[AI]:\nIt will be sunny in Paris for most of the week, with a chance of showers on the last "
+    "day, so pack a small umbrella."
+)
+# The same exchange with another call id
+SAME_WEATHER_ENTRY = WEATHER_ENTRY.replace("call_1a2b3c", "call_9z8y7x")
+# The same exchange with a closing remark, whose signature differs by a few bits
+NEAR_WEATHER_ENTRY = WEATHER_ENTRY + " Enjoy your trip!"
+RESTAURANT_ENTRY = (
+    "[HUMAN]:\nBook a table for two at an Italian restaurant tonight\n[AI]:\nThe reservation is confirmed."
+)
+
+
+class TestEntryClustering(TestCase):
+    """
+    Unit tests for the clustering of near-duplicate log entries.
+    """
+
+    def test_volatile_tokens_are_normalized(self):
+        """
+        Tests that ids, timestamps and numbers are replaced by placeholders.
+        """
+        self.assertEqual(
+            "Calling get_weather with call id call_<id> at <timestamp>, <num> items, request <uuid>",
+            normalize_log_entry(
+                "Calling get_weather with call id call_8f3a2b1c at 2025-06-01T14:03:20Z, 12 items, "
+                "request 3f2a1b4c-1111-2222-3333-444455556666"
+            ),
+        )
+
+    def test_near_duplicates_share_a_cluster(self):
+        """
+        Tests that entries differing by their ids or by a few words share a cluster whose representative is the
+        first entry, while other entries and entries with other system prompts get their own clusters.
+        """
+        clusterer = EntryClusterer(max_distance=3)
+
+        self.assertEqual((0, True), clusterer.assign("Prompt", WEATHER_ENTRY))
+        self.assertEqual((0, False), clusterer.assign("Prompt", SAME_WEATHER_ENTRY))
+        self.assertEqual((0, False), clusterer.assign("Prompt", NEAR_WEATHER_ENTRY))
+        self.assertEqual((1, True), clusterer.assign("Prompt", RESTAURANT_ENTRY))
+        self.assertEqual((2, True), clusterer.assign("Other prompt", WEATHER_ENTRY))
+        self.assertEqual({"entries": 5, "clusters": 3, "entries_per_cluster": 1.67}, clusterer.get_metrics())
+
+    def test_zero_distance_only_clusters_equal_entries(self):
+        """
+        Tests that a maximum distance of 0 only clusters entries that are equal once normalized,
+        and that a distance the band index cannot guarantee to find is refused.
+        """
+        clusterer = EntryClusterer(max_distance=0)
+
+        self.assertEqual((0, True), clusterer.assign("Prompt", WEATHER_ENTRY))
+        self.assertEqual((0, False), clusterer.assign("Prompt", SAME_WEATHER_ENTRY))
+        self.assertEqual((1, True), clusterer.assign("Prompt", NEAR_WEATHER_ENTRY))
+        with self.assertRaises(ValueError):
+            EntryClusterer(max_distance=4)
+
+    def test_only_representatives_are_analysed(self):
+        """
+        Tests that only the representative of each cluster is analysed, and that every entry gets the analysis
+        of its cluster, in the order of the entries.
+        """
+        entries = [
+            ("a.txt", "Prompt", WEATHER_ENTRY),
+            ("a.txt", "Prompt", RESTAURANT_ENTRY),
+            ("b.txt", "Prompt", SAME_WEATHER_ENTRY),
+        ]
+        analysed = []
+
+        def analyze_entries(representatives):
+            for log_file, _, log_entry in representatives:
+                analysed.append(log_entry)
+                yield log_file, f"analysis {len(analysed)}"
+
+        results = list(analyze_clustered_entries(entries, analyze_entries, EntryClusterer()))
+
+        self.assertEqual([WEATHER_ENTRY, RESTAURANT_ENTRY], analysed)
+        self.assertEqual(
+            [
+                ("a.txt", "analysis 1"),
+                ("a.txt", "analysis 2"),
+                ("b.txt", "[same pattern as cluster 0] analysis 1"),
+            ],
+            results,
+        )
@@ -0,0 +1,112 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-studio SDK Software in commercial settings.
+#
+import json
+import os
+import tempfile
+import time
+from unittest import TestCase
+
+from apps.log_analyzer.log_follower import LogFollower
+
+SETTLE_SECONDS = 0.05
+
+
+class TestLogFollower(TestCase):
+    """
+    Unit tests for following the log files of a directory.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.file_path = os.path.join(self.directory.name, "agent.txt")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def append(self, text: str):
+        """
+        Appends text to the followed log file.
+        """
+        with open(self.file_path, "a", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_only_new_entries_are_returned(self):
+        """
+        Tests that entries already in the file when following starts are skipped, and that new ones are returned.
+        """
+        self.append("[SYSTEM]:\nPrompt\n[HUMAN]:\nOld question\n[AI]:\nOld answer\n")
+        follower = LogFollower(self.directory.name, settle_seconds=SETTLE_SECONDS)
+        self.assertEqual([], follower.poll())
+
+        self.append("[HUMAN]:\nNew question\n[AI]:\nNew answer\n[HUMAN]:\nNext question\n[AI]:\n")
+        entries = follower.poll()
+
+        self.assertEqual(1, len(entries))
+        log_file, analysis_input = entries[0]
+        self.assertEqual("agent.txt", log_file)
+        self.assertTrue(analysis_input.startswith("Prompt "))
+        self.assertIn("New question", analysis_input)
+        self.assertIn("New answer", analysis_input)
+
+    def test_reply_arriving_after_the_settle_interval(self):
+        """
+        Tests that a question whose answer is written after the file stopped growing for longer than the settle
+        interval is still analysed together with its answer.
+        """
+        self.append("[SYSTEM]:\nPrompt\n")
+        follower = LogFollower(self.directory.name, settle_seconds=SETTLE_SECONDS)
+        follower.poll()
+
+        self.append("[HUMAN]:\nA question that takes a while\n")
+        self.assertEqual([], follower.poll())
+        time.sleep(SETTLE_SECONDS * 2)
+        self.assertEqual([], follower.poll())
+        self.assertEqual([], follower.poll())
+
+        self.append("[AI]:\nThe late answer\n[HUMAN]:\nNext question\n[AI]:\nNext answer\n")
+        entries = follower.poll()
+
+        self.assertEqual(1, len(entries))
+        self.assertIn("A question that takes a while", entries[0][1])
+        self.assertIn("The late answer", entries[0][1])
+
+    def test_entry_ending_with_its_metadata_completes_once_settled(self):
+        """
+        Tests that an entry whose metadata was written is returned once the file stops growing,
+        without waiting for the next entry.
+        """
+        follower = LogFollower(self.directory.name, settle_seconds=SETTLE_SECONDS)
+        follower.poll()
+        metadata = json.dumps({"completion_tokens": 12, "prompt_tokens": 250, "total_tokens": 262})
+        self.append(f"[HUMAN]\nQuestion\n[AI]\nAnswer\n[AGENT]\n{metadata}\n")
+        self.assertEqual([], follower.poll())
+
+        time.sleep(SETTLE_SECONDS * 2)
+        entries = follower.poll()
+
+        self.assertEqual(1, len(entries))
+        self.assertIn(metadata, entries[0][1])
+        self.assertEqual([], follower.poll())
+
+    def test_truncated_file_is_read_again(self):
+        """
+        Tests that a file truncated while being followed is read again from its start.
+        """
+        follower = LogFollower(self.directory.name, settle_seconds=SETTLE_SECONDS)
+        self.append("[HUMAN]:\nFirst question\n[AI]:\nFirst answer\n[HUMAN]:\nSecond question\n")
+        follower.poll()
+
+        with open(self.file_path, "w", encoding="utf-8") as f:
+            f.write("[HUMAN]:\nQ\n[AI]:\nA\n[HUMAN]:\nNext question\n[AI]:\n")
+        entries = follower.poll()
+
+        self.assertEqual(1, len(entries))
+        self.assertIn("[HUMAN]:\n:\nQ\n[AI]:\n:\nA", entries[0][1])
+        self.assertEqual(1, follower.get_metrics()["rotations"])
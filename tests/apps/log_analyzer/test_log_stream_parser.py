@@ -0,0 +1,123 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-studio SDK Software in commercial settings.
+#
+import io
+import json
+from unittest import TestCase
+
+from apps.log_analyzer.log_analyzer import extract_conversation_entries
+from apps.log_analyzer.log_analyzer import extract_system_prompt
+from apps.log_analyzer.log_stream_parser import LogEntryStreamParser
+from apps.log_analyzer.log_stream_parser import read_chunks
+from apps.log_analyzer.log_stream_parser import stream_log_entries
+
+METADATA = json.dumps({"completion_tokens": 12, "prompt_tokens": 250, "total_tokens": 262})
+
+LOGS = {
+    "regular": (
+        "[SYSTEM]:\nYou answer questions about the weather.\n\n"
+        "[HUMAN]:\nWhat is the weather in Paris?\n\n"
+        "[AGENT]:\nCalling tool get_weather with call id call_1\n\n"
+        "[AI]:\nIt is sunny in Paris.\n\n"
+        f"[AGENT]:\n{METADATA}\n\n"
+        "[HUMAN]:\nAnd in London?\n\n"
+        "[AI]:\nIt rains in London.\n\n"
+        f"[AGENT]:\n{METADATA}\n\n"
+    ),
+    "no metadata after the answer": (
+        "[SYSTEM]:\nYou answer questions.\n"
+        "[HUMAN]:\nFirst question\n"
+        "[AI]:\nFirst answer\n"
+        "[AGENT]:\nNot metadata, so it does not belong to the first entry\n"
+        "[HUMAN]:\nSecond question\n"
+        "[AI]:\nSecond answer\n"
+    ),
+    "questions without answers": (
+        "[HUMAN]:\nA question that is never answered\n"
+        "[HUMAN]:\nAnother question\n"
+        "[AGENT]:\nSome tool output\n"
+        "[AI]:\nThe answer\n"
+        "[AGENT]:\nTrailing output\n"
+        "[HUMAN]:\nA last question, with nothing after it\n"
+    ),
+    "markers within lines and empty sections": (
+        "preamble without any marker\n"
+        "[SYSTEM]:\nLine one of the prompt\n[SYSTEM] continued prompt\n"
+        "[HUMAN]:\nQuestion mentioning [AI] in the middle of a line\n"
+        "[AGENT]:\n\n"
+        "[AI]: Answer on the marker line\n"
+        f"[AGENT]:\n{METADATA}\n"
+    ),
+    "entries before the system prompt": (
+        "[HUMAN]:\nEarly question\n"
+        "[AI]:\nEarly answer\n"
+        "[SYSTEM]:\nA prompt written late\n"
+        "[HUMAN]:\nLate question\n"
+        "[AI]:\nLate answer\n"
+    ),
+}
+
+
+class TestLogStreamParser(TestCase):
+    """
+    Unit tests for the streaming parser of agent thinking logs.
+    """
+
+    def test_same_entries_as_regular_expressions(self):
+        """
+        Tests that the streaming parser finds the same entries as extract_conversation_entries(), whether the log
+        is read in large chunks or line by line.
+        """
+        for name, content in LOGS.items():
+            expected = extract_conversation_entries(content)
+            with self.subTest(name):
+                entries = [entry for _, entry in stream_log_entries(io.StringIO(content))]
+                self.assertEqual(expected, entries)
+
+                lines = io.StringIO(content).readlines()
+                entries = [entry for _, entry in LogEntryStreamParser().parse(lines)]
+                self.assertEqual(expected, entries)
+
+                entries = [entry for _, entry in LogEntryStreamParser().parse(read_chunks(io.StringIO(content), 7))]
+                self.assertEqual(expected, entries)
+
+    def test_same_system_prompt_as_regular_expressions(self):
+        """
+        Tests that entries get the system prompt that extract_system_prompt() finds, when it comes first.
+        """
+        for name in ("regular", "no metadata after the answer", "markers within lines and empty sections"):
+            content = LOGS[name]
+            with self.subTest(name):
+                system_prompts = {system_prompt for system_prompt, _ in stream_log_entries(io.StringIO(content))}
+                self.assertEqual({extract_system_prompt(content)}, system_prompts)
+
+    def test_entry_gets_the_system_prompt_seen_before_it(self):
+        """
+        Tests the documented difference with the regular expressions: an entry before the system prompt gets none.
+        """
+        system_prompts = [
+            system_prompt
+            for system_prompt, _ in stream_log_entries(io.StringIO(LOGS["entries before the system prompt"]))
+        ]
+        self.assertEqual(["", "A prompt written late"], system_prompts)
+
+    def test_entries_are_yielded_once_complete(self):
+        """
+        Tests that feeding the log as it is written yields an entry once the section following its answer is
+        complete, which tells whether that section is its metadata, before the end of the log.
+        """
+        content = "[SYSTEM]:\nPrompt\n[HUMAN]:\nQuestion\n[AI]:\nAnswer\n[HUMAN]:\nNext question\n[AI]:\nNext answer\n"
+        expected = extract_conversation_entries(content)
+        lines = io.StringIO(content).readlines()
+        parser = LogEntryStreamParser()
+
+        self.assertEqual([], [entry for line in lines[:-2] for entry in parser.feed(line)])
+        self.assertEqual([("Prompt", expected[0])], parser.feed(lines[-2]))
+        self.assertEqual([], parser.feed(lines[-1]))
+        self.assertEqual([("Prompt", expected[1])], parser.finish())
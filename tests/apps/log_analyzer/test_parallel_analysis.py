@@ -0,0 +1,52 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-studio SDK Software in commercial settings.
+#
+from unittest import TestCase
+
+from apps.log_analyzer.parallel_analysis import AnalysisSessionPool
+from apps.log_analyzer.parallel_analysis import analyze_entries_in_parallel
+
+
+class TestParallelAnalysis(TestCase):
+    """
+    Unit tests for the parallel analysis of log entries.
+    """
+
+    def test_results_are_in_order(self):
+        """
+        Tests that the analyses are yielded in the order of the entries, each with its log file.
+        """
+        pool = AnalysisSessionPool(3, lambda: ("session", {}), lambda session: None)
+        entries = [(f"log{index}.txt", f"entry {index}") for index in range(20)]
+
+        analyses = list(
+            analyze_entries_in_parallel(entries, lambda session, thread, text: (text.upper(), thread), pool, 3)
+        )
+
+        self.assertEqual([(f"log{index}.txt", f"ENTRY {index}") for index in range(20)], analyses)
+
+    def test_failed_set_up_fails_its_entry_only(self):
+        """
+        Tests that a session that cannot be set up makes its entry fail with an error, and that the other entries
+        are still analysed on new sessions.
+        """
+        set_ups = []
+
+        def set_up():
+            set_ups.append(len(set_ups))
+            if len(set_ups) == 1:
+                raise ConnectionError("server down")
+            return "session", {}
+
+        pool = AnalysisSessionPool(1, set_up, lambda session: None)
+        entries = [("log.txt", "first"), ("log.txt", "second")]
+
+        analyses = list(analyze_entries_in_parallel(entries, lambda session, thread, text: (text, thread), pool, 1))
+
+        self.assertEqual([("log.txt", "Error: server down"), ("log.txt", "second")], analyses)
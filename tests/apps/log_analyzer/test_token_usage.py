@@ -0,0 +1,56 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-studio SDK Software in commercial settings.
+#
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from apps.log_analyzer.token_usage import UNDATED
+from apps.log_analyzer.token_usage import collect_token_usage
+
+
+def metadata(prompt_tokens: int) -> str:
+    """
+    :return: The token metadata an agent writes after its answer.
+    """
+    return json.dumps({"prompt_tokens": prompt_tokens, "completion_tokens": 10, "total_tokens": prompt_tokens + 10})
+
+
+class TestTokenUsage(TestCase):
+    """
+    Unit tests for the token usage analytics of the agent thinking logs.
+    """
+
+    def test_usage_per_agent_and_hour_of_the_sections(self):
+        """
+        Tests that token metadata sections are found in the logs, attributed to the agent of their file,
+        and bucketed by the time written in their header rather than by the modification time of their file.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "weather.announcer.txt"), "w", encoding="utf-8") as f:
+                f.write("Agent: weather.announcer\n")
+                f.write("\n[HUMAN] @ 2025-06-01 14:03:20:\nWhat is the weather?\n")
+                f.write("\n[AI] @ 2025-06-01 14:03:27:\nSunny\n")
+                f.write(f"\n[AGENT] @ 2025-06-01 14:03:27:\n{metadata(100)}\n")
+                f.write("\n[AGENT] @ 2025-06-01 15:10:00:\nCalling a tool, not metadata\n")
+                f.write(f"\n[AGENT] @ 2025-06-01 15:10:05:\n{metadata(300)}\n")
+            with open(os.path.join(directory, "weather.forecaster.txt"), "w", encoding="utf-8") as f:
+                f.write(f"[AGENT]:\n{metadata(50)}\n")
+
+            table = collect_token_usage(directory, bucket_seconds=3600)
+
+        self.assertEqual(3, len(table))
+        agents = {row["label"]: row for row in table.aggregate("agent")}
+        self.assertEqual(420.0, agents["announcer"]["total_tokens_sum"])
+        self.assertEqual(60.0, agents["forecaster"]["total_tokens_sum"])
+        networks = table.aggregate("network")
+        self.assertEqual([("weather", 3)], [(row["label"], row["rows"]) for row in networks])
+        buckets = {row["label"]: row["prompt_tokens_sum"] for row in table.aggregate("time_bucket")}
+        self.assertEqual({"2025-06-01T14:00": 100.0, "2025-06-01T15:00": 300.0, UNDATED: 50.0}, buckets)
@@ -0,0 +1,67 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-studio SDK Software in commercial settings.
+#
+import os
+import tempfile
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from coded_tools.agent_network_designer.get_agent_network_hocon import AGENT_NETWORK_NAME
+from coded_tools.agent_network_designer.get_agent_network_hocon import HOCON_WRITER
+from coded_tools.agent_network_designer.get_agent_network_hocon import GetAgentNetworkHocon
+
+AGENTS = {
+    "top": {"instructions": "Route the inquiries.", "down_chains": ["leaf"], "top_agent": "true"},
+    "leaf": {"instructions": "Answer the inquiries.", "down_chains": [], "top_agent": "false"},
+}
+
+
+class TestGetAgentNetworkHocon(IsolatedAsyncioTestCase):
+    """
+    Unit tests for writing a designed agent network to the registries.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.output_path = self.directory.name + os.sep
+        with open(self.output_path + "manifest.hocon", "w", encoding="utf-8") as manifest:
+            manifest.write('{\n    "hello_world.hocon": true,\n}\n')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    async def test_network_is_written_and_added_to_the_manifest_once(self):
+        """
+        Tests that the file is the same HOCON as the one returned, and that the network is added to the manifest
+        only once.
+        """
+        tool = GetAgentNetworkHocon()
+        args = {"agent_network_name": "designed_network"}
+        with patch("coded_tools.agent_network_designer.get_agent_network_hocon.OUTPUT_PATH", self.output_path):
+            await tool.async_invoke(args, {AGENT_NETWORK_NAME: AGENTS})
+            hocon_str = await tool.async_invoke(args, {AGENT_NETWORK_NAME: AGENTS})
+
+        self.assertEqual(HOCON_WRITER.to_string(AGENTS, "designed_network"), hocon_str)
+        with open(self.output_path + "designed_network.hocon", encoding="utf-8") as hocon:
+            self.assertEqual(hocon_str, hocon.read())
+        with open(self.output_path + "manifest.hocon", encoding="utf-8") as manifest:
+            self.assertEqual(1, manifest.read().count('"designed_network.hocon": true'))
+
+    async def test_empty_network_is_refused(self):
+        """
+        Tests that an empty network is reported as an error rather than written, and is rendered without agents.
+        """
+        tool = GetAgentNetworkHocon()
+        with patch("coded_tools.agent_network_designer.get_agent_network_hocon.OUTPUT_PATH", self.output_path):
+            result = await tool.async_invoke({"agent_network_name": "empty_network"}, {AGENT_NETWORK_NAME: {}})
+
+        self.assertTrue(result.startswith("Error:"))
+        self.assertFalse(os.path.exists(self.output_path + "empty_network.hocon"))
+        tool.agents = {}
+        self.assertEqual(HOCON_WRITER.to_string({}, "empty_network"), tool.get_agent_network_hocon("empty_network"))
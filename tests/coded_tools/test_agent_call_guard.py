@@ -0,0 +1,67 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-studio SDK Software in commercial settings.
+#
+import time
+from unittest import TestCase
+
+from coded_tools.agent_call_guard import CALL_DEADLINE_KEY
+from coded_tools.agent_call_guard import AgentCallGuard
+
+
+class TestAgentCallGuard(TestCase):
+    """
+    Unit tests for AgentCallGuard class.
+    """
+
+    def test_get_deadline_inherits_earlier_deadline(self):
+        """
+        Tests that a nested call never gets more time than what remains of its caller's budget.
+        """
+        inherited_deadline = time.time() + 10.0
+        deadline = AgentCallGuard.get_deadline({CALL_DEADLINE_KEY: inherited_deadline}, 5000.0)
+        self.assertEqual(deadline, inherited_deadline)
+        deadline = AgentCallGuard.get_deadline({}, 5.0)
+        self.assertLess(deadline, inherited_deadline)
+
+    def test_exhausted_deadline_fails_fast(self):
+        """
+        Tests that no call is made once the deadline has passed.
+        """
+        guard = AgentCallGuard()
+        _, error = guard.before_call("policy", time.time() - 1.0)
+        self.assertTrue(error.startswith("Error:"))
+        self.assertEqual(guard.get_metrics()["policy"]["deadline_exhausted"], 1)
+
+    def test_circuit_opens_after_repeated_timeouts(self):
+        """
+        Tests that the circuit opens after the failure threshold, lets a single trial call through
+        after the cool down, and closes again when the trial call succeeds.
+        """
+        guard = AgentCallGuard(failure_threshold=2, reset_timeout_seconds=0.05)
+        deadline = time.time() + 60.0
+        for _ in range(2):
+            _, error = guard.before_call("policy", deadline)
+            self.assertIsNone(error)
+            guard.record_timeout("policy", 1.0)
+
+        _, error = guard.before_call("policy", deadline)
+        self.assertIsNotNone(error)
+        self.assertEqual(guard.get_metrics()["policy"]["state"], "open")
+
+        time.sleep(0.1)
+        _, error = guard.before_call("policy", deadline)
+        self.assertIsNone(error)
+        _, error = guard.before_call("policy", deadline)
+        self.assertIsNotNone(error)
+        guard.record_success("policy", 0.5)
+
+        metrics = guard.get_metrics()["policy"]
+        self.assertEqual(metrics["state"], "closed")
+        self.assertEqual(metrics["times_opened"], 1)
+        self.assertEqual(metrics["rejected"], 2)
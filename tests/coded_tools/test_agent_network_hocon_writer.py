@@ -0,0 +1,59 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-studio SDK Software in commercial settings.
+#
+import io
+import json
+from unittest import TestCase
+
+from coded_tools.agent_network_hocon_writer import AgentNetworkHoconWriter
+
+TOP_AGENT_TEMPLATE = '{"name": "%s", "instructions": """\n%s\n""", "tools": [%s]},\n'
+REGULAR_AGENT_TEMPLATE = '{"name": "%s", "instructions": """\n%s\n""", "tools": [%s]},\n'
+LEAF_NODE_AGENT_TEMPLATE = '{"name": "%s", "instructions": """\n%s\n"""},\n'
+
+
+class TestAgentNetworkHoconWriter(TestCase):
+    """
+    Unit tests for AgentNetworkHoconWriter class.
+    """
+
+    def setUp(self):
+        self.writer = AgentNetworkHoconWriter(
+            '{"network": "', '", "tools": [\n', TOP_AGENT_TEMPLATE, REGULAR_AGENT_TEMPLATE, LEAF_NODE_AGENT_TEMPLATE
+        )
+
+    def test_write_matches_templates(self):
+        """
+        Tests that agents are written with their template, and that the stream gets the same HOCON as the string.
+        """
+        agents = {
+            "top": {"instructions": "Top.", "down_chains": ["leaf", "leaf", "top"], "top_agent": "true"},
+            "leaf": {"instructions": "Leaf.", "down_chains": [], "top_agent": "false"},
+        }
+        hocon = self.writer.to_string(agents, "net")
+        self.assertEqual(
+            hocon,
+            '{"network": "net", "tools": [\n'
+            '{"name": "top", "instructions": """\nTop.\n""", "tools": ["leaf"]},\n'
+            '{"name": "leaf", "instructions": """\nLeaf.\n"""},\n'
+            "]\n}\n",
+        )
+        stream = io.StringIO()
+        self.assertEqual(self.writer.write(stream, agents, "net"), len(hocon))
+        self.assertEqual(stream.getvalue(), hocon)
+
+    def test_escapes_triple_quotes_and_names(self):
+        """
+        Tests that instructions with triple quotes are written as an equivalent quoted string,
+        and that names are escaped within their double quotes.
+        """
+        agents = {'say "hi"': {"instructions": 'Use """ carefully.', "down_chains": [], "top_agent": "false"}}
+        hocon = self.writer.to_string(agents, "net")
+        self.assertIn('"name": "say \\"hi\\""', hocon)
+        self.assertIn('"instructions": ' + json.dumps('\nUse """ carefully.\n'), hocon)
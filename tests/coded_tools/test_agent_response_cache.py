@@ -0,0 +1,131 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-studio SDK Software in commercial settings.
+#
+import asyncio
+from unittest import TestCase
+
+from coded_tools.agent_response_cache import AgentResponseCache
+
+
+class TestAgentResponseCache(TestCase):
+    """
+    Unit tests for AgentResponseCache class.
+    """
+
+    def test_make_key_normalizes_inquiry(self):
+        """
+        Tests that inquiries differing only by case and whitespace share a key,
+        and that only the selected sly_data keys are part of the key.
+        """
+        sly_data = {"tier": "gold", "session_id": "1234"}
+        key_1 = AgentResponseCache.make_key("policy", "What is the  bag fee?", sly_data, ["tier"])
+        key_2 = AgentResponseCache.make_key("policy", " what is the bag fee? ", {"tier": "gold"}, ["tier"])
+        key_3 = AgentResponseCache.make_key("policy", "What is the bag fee?", {"tier": "silver"}, ["tier"])
+        self.assertEqual(key_1, key_2)
+        self.assertNotEqual(key_1, key_3)
+
+    def test_get_or_call_caches_responses(self):
+        """
+        Tests that a second identical call is answered from the cache.
+        """
+        cache = AgentResponseCache(ttl_seconds=60.0, max_entries=10)
+        calls = []
+
+        async def call():
+            calls.append(1)
+            return "answer"
+
+        key = cache.make_key("policy", "inquiry", {})
+        self.assertEqual(asyncio.run(cache.get_or_call(key, call)), "answer")
+        self.assertEqual(asyncio.run(cache.get_or_call(key, call)), "answer")
+        self.assertEqual(len(calls), 1)
+        metrics = cache.get_metrics()
+        self.assertEqual(metrics["hits"], 1)
+        self.assertEqual(metrics["misses"], 1)
+        self.assertEqual(metrics["hit_rate"], 0.5)
+
+    def test_ttl_and_size_bounds(self):
+        """
+        Tests that entries expire after the TTL and that the least recently used entry is evicted.
+        """
+        cache = AgentResponseCache(ttl_seconds=0.0, max_entries=10)
+        cache.put(("a",), "1")
+        self.assertIsNone(cache.get(("a",)))
+        self.assertEqual(cache.get_metrics()["expirations"], 1)
+
+        cache = AgentResponseCache(ttl_seconds=60.0, max_entries=2)
+        cache.put(("a",), "1")
+        cache.put(("b",), "2")
+        cache.get(("a",))
+        cache.put(("c",), "3")
+        self.assertEqual(cache.get(("a",)), "1")
+        self.assertIsNone(cache.get(("b",)))
+        self.assertEqual(cache.get_metrics()["evictions"], 1)
+
+    def test_concurrent_calls_are_coalesced(self):
+        """
+        Tests that identical calls in flight at the same time reach the agent only once.
+        """
+        cache = AgentResponseCache()
+        calls = []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        async def run_all():
+            key = cache.make_key("policy", "inquiry", {})
+            return await asyncio.gather(*[cache.get_or_call(key, call) for _ in range(5)])
+
+        self.assertEqual(asyncio.run(run_all()), ["answer"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.get_metrics()["coalesced"], 4)
+
+    def test_cancelled_leader_does_not_cancel_followers(self):
+        """
+        Tests that when the call actually reaching the agent is cancelled, the identical calls waiting for it
+        are not cancelled too, and that one of them calls the agent instead.
+        """
+        cache = AgentResponseCache()
+        calls = []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        async def cancel_leader():
+            key = cache.make_key("policy", "inquiry", {})
+            leader = asyncio.create_task(cache.get_or_call(key, call))
+            await asyncio.sleep(0.01)
+            followers = asyncio.gather(*[cache.get_or_call(key, call) for _ in range(3)])
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await leader
+            return await followers
+
+        self.assertEqual(asyncio.run(cancel_leader()), ["answer"] * 3)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(cache.get_metrics()["entries"], 1)
+
+    def test_uncacheable_responses_are_not_cached(self):
+        """
+        Tests that responses rejected by the predicate are returned but not cached.
+        """
+        cache = AgentResponseCache()
+
+        async def call():
+            return "Error: agent unavailable"
+
+        key = cache.make_key("policy", "inquiry", {})
+        response = asyncio.run(cache.get_or_call(key, call, lambda r: not r.startswith("Error:")))
+        self.assertEqual(response, "Error: agent unavailable")
+        self.assertEqual(cache.get_metrics()["entries"], 0)
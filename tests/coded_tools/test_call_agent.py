@@ -0,0 +1,130 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-studio SDK Software in commercial settings.
+#
+import asyncio
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import patch
+
+from coded_tools.agent_call_guard import CALL_DEADLINE_KEY
+from coded_tools.agent_call_guard import AgentCallGuard
+from coded_tools.call_agent import CallAgent
+
+
+class TestCallAgent(TestCase):
+    """
+    Unit tests for the call guarding of CallAgent.
+    """
+
+    def test_cancelled_trial_call_settles_circuit(self):
+        """
+        Tests that cancelling the trial call of a half open circuit re-opens it,
+        rather than leaving it half open and rejecting every later call.
+        """
+        guard = AgentCallGuard(failure_threshold=1, reset_timeout_seconds=0.0)
+        deadline = time.time() + 60.0
+        guard.before_call("policy", deadline)
+        guard.record_timeout("policy", 1.0)
+        self.assertEqual(guard.get_metrics()["policy"]["state"], "open")
+
+        call_started = threading.Event()
+
+        def slow_call(*_):
+            call_started.set()
+            time.sleep(0.2)
+            return "Too late", {}
+
+        async def cancel_trial_call():
+            sly_data = {}
+            task = asyncio.create_task(CallAgent().call_agent_with_deadline({}, sly_data, "policy", "hi", deadline))
+            await asyncio.to_thread(call_started.wait, 5.0)
+            self.assertEqual(guard.get_metrics()["policy"]["state"], "half_open")
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            self.assertNotIn("agent_session", sly_data)
+
+        with (
+            patch("coded_tools.call_agent.CALL_GUARD", guard),
+            patch("coded_tools.call_agent.set_up_agent", return_value=(object(), {})),
+            patch("coded_tools.call_agent.call_agent", side_effect=slow_call),
+        ):
+            asyncio.run(cancel_trial_call())
+
+        metrics = guard.get_metrics()["policy"]
+        self.assertEqual(metrics["state"], "open")
+        self.assertEqual(metrics["errors"], 1)
+        # The cool down is over, so the next call is a new trial call rather than being rejected
+        _, error = guard.before_call("policy", deadline)
+        self.assertIsNone(error)
+
+    def test_slow_session_set_up_is_bounded_by_the_deadline(self):
+        """
+        Tests that setting up the agent session counts against the deadline of the call, and does not block the
+        event loop meanwhile.
+        """
+        guard = AgentCallGuard(failure_threshold=3, reset_timeout_seconds=30.0)
+        ticks = []
+
+        def slow_set_up(*_):
+            time.sleep(0.5)
+            return object(), {}
+
+        async def tick():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        async def call_with_short_deadline():
+            ticker = asyncio.create_task(tick())
+            started = time.monotonic()
+            response = await CallAgent().call_agent_with_deadline({}, {}, "policy", "hi", time.time() + 0.1)
+            elapsed = time.monotonic() - started
+            ticker.cancel()
+            return response, elapsed
+
+        with (
+            patch("coded_tools.call_agent.CALL_GUARD", guard),
+            patch("coded_tools.call_agent.set_up_agent", side_effect=slow_set_up),
+            patch("coded_tools.call_agent.call_agent", return_value=("Too late", {})),
+        ):
+            response, elapsed = asyncio.run(call_with_short_deadline())
+
+        self.assertTrue(response.startswith("Error: policy did not answer"))
+        self.assertLess(elapsed, 0.4)
+        self.assertGreater(len(ticks), 3)
+        self.assertEqual(guard.get_metrics()["policy"]["timeouts"], 1)
+
+    def test_deadline_reaches_nested_calls(self):
+        """
+        Tests that each call passes its own deadline to the called agent network, whose nested calls then get
+        no more than what remains of it, including when the session is kept from an earlier call.
+        """
+        guard = AgentCallGuard(failure_threshold=3, reset_timeout_seconds=30.0)
+        nested_deadlines = []
+
+        def nested_call(_session, agent_state_info, *_):
+            # The called network reads the deadline of its own nested calls from the sly_data it is given
+            nested_deadlines.append(guard.get_deadline(agent_state_info["sly_data"], 5000.0))
+            return "Answer", agent_state_info
+
+        sly_data = {}
+        with (
+            patch("coded_tools.call_agent.CALL_GUARD", guard),
+            patch("coded_tools.call_agent.set_up_agent", return_value=(object(), {})) as set_up_agent,
+            patch("coded_tools.call_agent.call_agent", side_effect=nested_call),
+        ):
+            for budget in (60.0, 30.0):
+                sly_data[CALL_DEADLINE_KEY] = time.time() + budget
+                response = asyncio.run(CallAgent().async_invoke({"inquiry": "hi", "agent_name": "policy"}, sly_data))
+                self.assertEqual("Answer", response)
+                self.assertEqual(sly_data[CALL_DEADLINE_KEY], nested_deadlines[-1])
+
+        self.assertEqual(1, set_up_agent.call_count)
@@ -0,0 +1,116 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-studio SDK Software in commercial settings.
+#
+from unittest import TestCase
+
+from coded_tools.chat_context_compactor import NO_COMPACTION
+from coded_tools.chat_context_compactor import ROLLING_SUMMARY
+from coded_tools.chat_context_compactor import SLIDING_WINDOW
+from coded_tools.chat_context_compactor import SUMMARY_PREFIX
+from coded_tools.chat_context_compactor import TOKEN_BUDGET
+from coded_tools.chat_context_compactor import ChatContextCompactor
+from coded_tools.chat_context_compactor import estimate_tokens
+
+
+def make_state(num_turns: int) -> dict:
+    """Builds a conversation state with a system message and num_turns human/AI exchanges."""
+    messages = [{"type": "SYSTEM", "text": "You are a helpful assistant."}]
+    for turn in range(num_turns):
+        messages.append({"type": "HUMAN", "text": f"Question number {turn}. " + "x" * 400})
+        messages.append({"type": "AI", "text": f"Answer number {turn}. " + "y" * 400})
+    return {"chat_context": {"chat_histories": [{"origin": [], "messages": messages}]}}
+
+
+class TestChatContextCompactor(TestCase):
+    """
+    Unit tests for ChatContextCompactor class.
+    """
+
+    def test_sliding_window(self):
+        """
+        Tests that only the last messages and the system message are kept.
+        """
+        state = make_state(10)
+        compactor = ChatContextCompactor(policy=SLIDING_WINDOW, max_messages=4)
+        saved = compactor.compact(state)
+        messages = state["chat_context"]["chat_histories"][0]["messages"]
+        self.assertEqual(len(messages), 5)
+        self.assertEqual(messages[0]["type"], "SYSTEM")
+        self.assertTrue(messages[-1]["text"].startswith("Answer number 9."))
+        self.assertGreater(saved, 0)
+        self.assertEqual(compactor.get_metrics()["tokens_saved"], saved)
+
+    def test_token_budget(self):
+        """
+        Tests that the chat history fits in the token budget.
+        """
+        state = make_state(20)
+        compactor = ChatContextCompactor(policy=TOKEN_BUDGET, max_tokens=1000)
+        compactor.compact(state)
+        messages = state["chat_context"]["chat_histories"][0]["messages"]
+        self.assertLessEqual(estimate_tokens(messages), 1000)
+        self.assertTrue(messages[-1]["text"].startswith("Answer number 19."))
+
+    def test_rolling_summary(self):
+        """
+        Tests that dropped messages are folded into a bounded summary, turn after turn.
+        """
+        state = make_state(20)
+        compactor = ChatContextCompactor(policy=ROLLING_SUMMARY, max_tokens=1000, summary_max_tokens=200)
+        compactor.compact(state)
+        messages = state["chat_context"]["chat_histories"][0]["messages"]
+        self.assertTrue(messages[1]["text"].startswith(SUMMARY_PREFIX))
+        self.assertIn("Question number", messages[1]["text"])
+        self.assertLessEqual(estimate_tokens(messages), 1000)
+
+        # Another turn folds the previous summary into the new one
+        messages.extend(make_state(5)["chat_context"]["chat_histories"][0]["messages"][1:])
+        compactor.compact(state)
+        messages = state["chat_context"]["chat_histories"][0]["messages"]
+        summaries = [message for message in messages if message["text"].startswith(SUMMARY_PREFIX)]
+        self.assertEqual(len(summaries), 1)
+        self.assertLessEqual(estimate_tokens(summaries), 200)
+        self.assertEqual(compactor.get_metrics()["compactions"], 2)
+
+    def test_tool_calls_stay_with_their_results(self):
+        """
+        Tests that messages are dropped by whole exchanges, so a tool call is never kept without its result.
+        """
+        messages = [{"type": "SYSTEM", "text": "You are a helpful assistant."}]
+        for turn in range(10):
+            messages.append({"type": "HUMAN", "text": f"Question number {turn}. " + "x" * 200})
+            messages.append({"type": "AGENT", "text": f"Calling the lookup tool for {turn}."})
+            messages.append({"type": "AGENT_TOOL_RESULT", "text": "z" * 300})
+            messages.append({"type": "AI", "text": f"Answer number {turn}. " + "y" * 200})
+        state = {"chat_context": {"chat_histories": [{"origin": [], "messages": messages}]}}
+
+        for compactor in (
+            ChatContextCompactor(policy=TOKEN_BUDGET, max_tokens=700),
+            ChatContextCompactor(policy=SLIDING_WINDOW, max_messages=10),
+        ):
+            compactor.compact(state)
+            kept = state["chat_context"]["chat_histories"][0]["messages"]
+            self.assertEqual(kept[0]["type"], "SYSTEM")
+            self.assertEqual(kept[1]["type"], "HUMAN")
+            self.assertEqual((len(kept) - 1) % 4, 0)
+            self.assertTrue(kept[-1]["text"].startswith("Answer number 9."))
+
+    def test_no_chat_context(self):
+        """
+        Tests that a state without chat_context is left alone.
+        """
+        compactor = ChatContextCompactor()
+        self.assertEqual(compactor.compact({"chat_context": None}), 0)
+        # Compaction is opt-in
+        state = make_state(50)
+        self.assertEqual(compactor.policy, NO_COMPACTION)
+        self.assertEqual(compactor.compact(state), 0)
+        self.assertEqual(len(state["chat_context"]["chat_histories"][0]["messages"]), 101)
+        with self.assertRaises(ValueError):
+            ChatContextCompactor(policy="unknown")
@@ -0,0 +1,292 @@
+# Copyright (C) 2023-2025 Cognizant Digital Business, Evolutionary AI.
+# All Rights Reserved.
+# Issued under the Academic Public License.
+#
+# You can be released from the terms, and requirements of the Academic Public
+# License by purchasing a commercial license.
+# Purchase of a commercial license is mandatory for any use of the
+# neuro-san-studio SDK Software in commercial settings.
+#
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from run import NeuroSanRunner
+from run import OutputMultiplexer
+from run import RotatingLogFile
+
+
+# pylint: disable=too-few-public-methods
+class FakeProcess:
+    """
+    Stands for a started process, which exits with a code after polled a number of times, or never.
+    """
+
+    def __init__(self, polls_before_exit: int = None, returncode: int = 1):
+        self.polls_before_exit = polls_before_exit
+        self.returncode = None
+        self.exit_code = returncode
+
+    def poll(self):
+        """
+        :return: The exit code of the process, or None while it runs.
+        """
+        if self.polls_before_exit is not None:
+            if self.polls_before_exit <= 0:
+                self.returncode = self.exit_code
+            self.polls_before_exit -= 1
+        return self.returncode
+
+
+# pylint: disable=too-few-public-methods
+class FakeProbe:
+    """
+    Stands for a readiness probe, which passes after failing a number of times, or never.
+    """
+
+    def __init__(self, failures: int = None):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self) -> bool:
+        self.calls += 1
+        return self.failures is not None and self.calls > self.failures
+
+
+def create_runner(startup_timeout: float = 30.0) -> NeuroSanRunner:
+    """
+    :return: A runner with the state the readiness checks use, without parsing arguments or starting anything.
+    """
+    runner = NeuroSanRunner.__new__(NeuroSanRunner)
+    runner.args = {"startup_timeout": startup_timeout}
+    runner.logs_dir = "logs"
+    runner.start_times = {}
+    runner.stop_processes = Mock()
+    return runner
+
+
+class TestReadiness(TestCase):
+    """
+    Unit tests for waiting for the processes started by run.py to be ready.
+    """
+
+    def test_probes_are_retried_with_exponential_backoff(self):
+        """
+        Tests that failing probes are retried after delays growing up to the maximum delay,
+        and that the probes after a failing one are not run.
+        """
+        runner = create_runner()
+        runner.start_times["server"] = time.monotonic()
+        port_probe = FakeProbe(failures=8)
+        http_probe = FakeProbe(failures=0)
+        failed = threading.Event()
+
+        with patch("run.time.sleep") as sleep:
+            ready_time = runner.wait_until_ready(
+                "server", FakeProcess(), [port_probe, http_probe], time.monotonic() + 60.0, failed
+            )
+
+        self.assertIsNotNone(ready_time)
+        self.assertFalse(failed.is_set())
+        self.assertEqual(
+            [0.05, 0.1, 0.2, 0.4, 0.8, 1.6, 2.0, 2.0], [round(call.args[0], 6) for call in sleep.call_args_list]
+        )
+        self.assertEqual((9, 1), (port_probe.calls, http_probe.calls))
+
+    def test_overall_timeout(self):
+        """
+        Tests that a process whose probes never pass is given up on at the deadline, and the other processes told.
+        """
+        runner = create_runner()
+        failed = threading.Event()
+        started = time.monotonic()
+
+        ready_time = runner.wait_until_ready("server", FakeProcess(), [FakeProbe()], started + 0.3, failed)
+
+        self.assertIsNone(ready_time)
+        self.assertTrue(failed.is_set())
+        self.assertLess(time.monotonic() - started, 1.0)
+
+    def test_process_exiting_stops_the_wait(self):
+        """
+        Tests that the probes of a process that exited are not retried until the deadline.
+        """
+        runner = create_runner()
+        probe = FakeProbe()
+        failed = threading.Event()
+
+        with patch("run.time.sleep"):
+            ready_time = runner.wait_until_ready(
+                "server", FakeProcess(polls_before_exit=2), [probe], time.monotonic() + 60.0, failed
+            )
+
+        self.assertIsNone(ready_time)
+        self.assertTrue(failed.is_set())
+        self.assertEqual(2, probe.calls)
+
+    def test_all_processes_are_stopped_when_one_exits(self):
+        """
+        Tests that when a process exits before being ready, the others stop waiting long before the startup timeout,
+        and that all the processes are stopped.
+        """
+        runner = create_runner(startup_timeout=30.0)
+        components = [
+            ("server", FakeProcess(polls_before_exit=3), [FakeProbe()]),
+            ("client", FakeProcess(), [FakeProbe()]),
+        ]
+        started = time.monotonic()
+
+        with self.assertRaises(SystemExit) as context:
+            runner.wait_for_readiness(components)
+
+        self.assertEqual(1, context.exception.code)
+        self.assertLess(time.monotonic() - started, 5.0)
+        runner.stop_processes.assert_called_once_with()
+
+    def test_ready_processes_are_not_stopped(self):
+        """
+        Tests that nothing is stopped when all the processes are ready in time.
+        """
+        runner = create_runner()
+        runner.start_times.update({"server": time.monotonic(), "client": time.monotonic()})
+        components = [
+            ("server", FakeProcess(), [FakeProbe(failures=1)]),
+            ("client", FakeProcess(), [FakeProbe(failures=0)]),
+        ]
+
+        runner.wait_for_readiness(components)
+
+        runner.stop_processes.assert_not_called()
+
+
+class TestOutputMultiplexer(TestCase):
+    """
+    Unit tests for streaming the output of child processes to the console and to rotating log files.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.log_path = os.path.join(self.directory.name, "child.log")
+        self.console = io.StringIO()
+        console_patch = patch("run.sys.stdout", self.console)
+        console_patch.start()
+        self.addCleanup(console_patch.stop)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_child(
+        self, code: str, log_max_bytes: int = 0, console_max_lines_per_second: float = 0
+    ) -> OutputMultiplexer:
+        """
+        Streams the output of a Python child process until it exits.
+        :param code: The code the child runs.
+        :param log_max_bytes: The size past which the log file is rotated, 0 to never rotate it.
+        :param console_max_lines_per_second: The console rate limit, 0 for none.
+        :return: The multiplexer, closed.
+        """
+        multiplexer = OutputMultiplexer(log_max_bytes, 2, console_max_lines_per_second)
+        with subprocess.Popen([sys.executable, "-c", code], stdout=subprocess.PIPE, stderr=subprocess.PIPE) as process:
+            multiplexer.add_process(process, "child", self.log_path)
+            process.wait(10)
+            multiplexer.close()
+        return multiplexer
+
+    def read_log(self, suffix: str = "") -> str:
+        """
+        :return: The content of the log file, or of one of its backups.
+        """
+        with open(self.log_path + suffix, encoding="utf-8") as log:
+            return log.read()
+
+    def get_stats(self, multiplexer: OutputMultiplexer, stream_name: str):
+        """
+        :return: The counts of a stream of the child.
+        """
+        return next(stats for stats in multiplexer.get_stats() if stats["stream"] == stream_name)
+
+    def test_lines_split_across_chunks_are_joined(self):
+        """
+        Tests that a line written in several chunks is logged and shown once, whole, and that the last line of
+        a stream is written when the stream ends without a newline.
+        """
+        code = (
+            "import sys, time\n"
+            "sys.stdout.write('par'); sys.stdout.flush(); time.sleep(0.2)\n"
+            "sys.stdout.write('tial\\nlast line'); sys.stdout.flush()\n"
+            "sys.stderr.write('error\\n')"
+        )
+        multiplexer = self.run_child(code)
+
+        log = self.read_log()
+        self.assertTrue(log.startswith("Starting child...\n"))
+        self.assertIn("child: partial\n", log)
+        self.assertIn("child: last line\n", log)
+        self.assertIn("child: error\n", log)
+        self.assertIn("child: partial\n", self.console.getvalue())
+        self.assertEqual((2, 17), tuple(self.get_stats(multiplexer, "stdout")[key] for key in ("lines", "bytes")))
+
+    def test_console_rate_limit_counts_dropped_lines(self):
+        """
+        Tests that the lines over the console rate limit are only logged, and counted as not shown.
+        """
+        multiplexer = self.run_child("for i in range(200): print(f'line {i}')", console_max_lines_per_second=10)
+
+        stats = self.get_stats(multiplexer, "stdout")
+        shown = self.console.getvalue().count("child: line ")
+        self.assertEqual(200, stats["lines"])
+        self.assertEqual(200, shown + stats["dropped_console_lines"])
+        self.assertLess(shown, 50)
+        self.assertEqual(200, self.read_log().count("child: line "))
+
+    def test_log_is_rotated_to_numbered_backups(self):
+        """
+        Tests that the log file is rotated past its maximum size, even within a single chunk of output, that the
+        backups are renamed from newest to oldest, and that only the configured number of them is kept.
+        """
+        self.run_child("print('\\n'.join(f'line {i:04d}' for i in range(500)))", log_max_bytes=1000)
+
+        self.assertTrue(os.path.exists(self.log_path + ".2"))
+        self.assertFalse(os.path.exists(self.log_path + ".3"))
+        for suffix in ("", ".1", ".2"):
+            self.assertLessEqual(os.path.getsize(self.log_path + suffix), 1000)
+        self.assertTrue(self.read_log().endswith("child: line 0499\n"))
+        # The most recent backup ends right before the log file starts, and the older one right before it
+        oldest, newest, current = (self.read_log(suffix).splitlines() for suffix in (".2", ".1", ""))
+        self.assertEqual(int(newest[-1][-4:]) + 1, int(current[0][-4:]))
+        self.assertEqual(int(oldest[-1][-4:]) + 1, int(newest[0][-4:]))
+
+    def test_close_returns_within_its_timeout(self):
+        """
+        Tests that closing does not wait past its timeout for a process that keeps its pipes open.
+        """
+        multiplexer = OutputMultiplexer(0, 0, 0)
+        code = "import time; print('started', flush=True); time.sleep(30)"
+        with subprocess.Popen([sys.executable, "-c", code], stdout=subprocess.PIPE, stderr=subprocess.PIPE) as process:
+            try:
+                multiplexer.add_process(process, "child", self.log_path)
+                started = time.monotonic()
+                with patch("run.OUTPUT_CLOSE_TIMEOUT_SECONDS", 0.5):
+                    multiplexer.close()
+                self.assertLess(time.monotonic() - started, 2.0)
+            finally:
+                process.kill()
+
+    def test_large_write_is_split_at_line_boundaries(self):
+        """
+        Tests that a write larger than the room left in the log file is split after whole lines.
+        """
+        log = RotatingLogFile(self.log_path, 100, 5)
+        log.write(b"".join(f"line {i:02d}\n".encode("utf-8") for i in range(40)))
+        log.close()
+
+        sizes = [os.path.getsize(self.log_path + suffix) for suffix in ("", ".1", ".2", ".3")]
+        self.assertEqual([32, 96, 96, 96], sizes)
+        self.assertTrue(self.read_log(".1").startswith("line 24\n"))